@@ -13,15 +13,18 @@ type Item = {
 export default function App() {
   const [q, setQ] = useState('test')
   const [items, setItems] = useState<Item[]>([])
-  const [page, setPage] = useState(1)
   const [size, setSize] = useState(10)
+  const [cursor, setCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(false)
 
-  async function search() {
+  // Cursor pagination: the first request opens a cursor, "More" follows next_cursor
+  async function search(next?: string) {
     setLoading(true)
     try {
-      const r = await axios.post('/api/search/advanced', { query: q, page, size })
-      setItems(r.data.items || [])
+      const r = await axios.post('/api/search/advanced', { query: q, size, cursor: next ?? true })
+      const page: Item[] = r.data.items || []
+      setItems(prev => (next ? [...prev, ...page] : page))
+      setCursor(r.data.next_cursor || null)
     } catch (e) {
       console.error(e)
     } finally {
@@ -36,7 +39,7 @@ export default function App() {
       <h1>GlobalSearch (Web)</h1>
       <div style={{ display: 'flex', gap: 8, alignItems: 'center' }}>
         <input value={q} onChange={e => setQ(e.target.value)} placeholder='Search…' />
-        <button onClick={search} disabled={loading}>{loading ? 'Searching…' : 'Search'}</button>
+        <button onClick={() => search()} disabled={loading}>{loading ? 'Searching…' : 'Search'}</button>
       </div>
       <ul>
         {items.map((it, idx) => (
@@ -45,6 +48,7 @@ export default function App() {
           </li>
         ))}
       </ul>
+      {cursor && <button onClick={() => search(cursor)} disabled={loading}>More</button>}
     </div>
   )
 }
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request, WebSocket, WebSocketDisconnect
@@ -10,7 +10,8 @@ from pydantic import BaseModel
 
 from src.core.config import ConfigurationManager
 from src.core.models.configuration import ApplicationConfig
-from src.core.search import SearchManager
+from src.core.models.search import SearchResult
+from src.core.search import PrefixIndex, SearchManager, Vocabulary
 from cross_ide_path_utils import PathResolver
 
 
@@ -23,8 +24,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 cfg_manager = ConfigurationManager()
+# Auto-complete from the vocabulary persisted by IndexManager, if indexing has run (req 1.3)
+_vocabulary = Vocabulary.open(PathResolver().get_cache_path("vocabulary.json"))
 # Initialize SearchManager with loaded config (req 6.2)
-search_manager = SearchManager(config=cfg_manager.load())
+search_manager = SearchManager(config=cfg_manager.load(), autocomplete=PrefixIndex.from_vocabulary(_vocabulary))
 _ws_upload_clients: Dict[str, List[WebSocket]] = {}
 
 
@@ -34,6 +37,20 @@ class SearchRequest(BaseModel):
     topic: Optional[str] = None
 
 
+def _result_dict(r: SearchResult) -> Dict[str, Any]:
+    return {
+        "document_id": r.document_id,
+        "document_title": r.document_title,
+        "page_number": r.page_number,
+        "snippet": r.snippet,
+        "relevance_score": r.relevance_score,
+        "match_type": r.match_type.value,
+        "highlighted_text": r.highlighted_text,
+        "topic_path": r.topic_path,
+        "offset": r.offset,
+    }
+
+
 class SuggestResponse(BaseModel):
     term: str
     confidence: float
@@ -49,21 +66,7 @@ def api_search(req: SearchRequest) -> List[Dict[str, Any]]:
     if not req.query:
         raise HTTPException(status_code=400, detail="query must not be empty")
     res = search_manager.search(req.query, limit=req.limit, topic_filter=req.topic)
-    out: List[Dict[str, Any]] = []
-    for r in res:
-        out.append(
-            {
-                "document_id": r.document_id,
-                "document_title": r.document_title,
-                "page_number": r.page_number,
-                "snippet": r.snippet,
-                "relevance_score": r.relevance_score,
-                "match_type": r.match_type.value,
-                "highlighted_text": r.highlighted_text,
-                "topic_path": r.topic_path,
-            }
-        )
-    return out
+    return [_result_dict(r) for r in res]
 
 
 @app.get("/api/search/suggest")
@@ -78,6 +81,21 @@ def api_suggest(q: str, limit: int = 5) -> List[SuggestResponse]:
     return [SuggestResponse(term=s, confidence=0.0) for s in suggestions]
 
 
+@app.get("/api/search/cache/stats")
+def api_cache_stats() -> Dict[str, Any]:
+    stats = search_manager.cache_stats()
+    return {
+        "hits": stats.hits,
+        "misses": stats.misses,
+        "evictions": stats.evictions,
+        "expirations": stats.expirations,
+        "invalidations": stats.invalidations,
+        "entries": stats.entries,
+        "bytes": stats.bytes,
+        "hit_rate": stats.hit_rate,
+    }
+
+
 # ---------- Advanced search (pagination/sorting) ----------
 class AdvancedSearchRequest(BaseModel):
     query: str
@@ -85,6 +103,9 @@ class AdvancedSearchRequest(BaseModel):
     size: int = 10
     sort: str = "score"  # or 'name'
     topic: Optional[str] = None
+    # Opt-in cursor pagination (score sort only): `true` opens a cursor on the first
+    # page, later pages pass the previous `next_cursor`. Cursor pages report `total: null`
+    cursor: Union[bool, str, None] = None
 
 
 @app.post("/api/search/advanced")
@@ -93,8 +114,25 @@ def api_search_advanced(req: AdvancedSearchRequest) -> Dict[str, Any]:
         raise HTTPException(status_code=400, detail="query must not be empty")
     size = max(1, min(100, int(req.size)))
     page = max(1, int(req.page))
-    # Get a superset of results, then slice
-    sup = search_manager.search(req.query, limit=page * size, topic_filter=req.topic)
+    if req.cursor:
+        # Cursor pagination: every page costs one bounded request per leg
+        token = req.cursor if isinstance(req.cursor, str) else None
+        try:
+            result = search_manager.search_page(req.query, size=size, topic_filter=req.topic, cursor=token)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        return {
+            "total": None,
+            "page": page,
+            "size": size,
+            "items": [_result_dict(r) for r in result.results],
+            "next_cursor": result.next_cursor,
+            "partial": result.partial,
+            "timed_out_legs": result.timed_out_legs,
+        }
+    # Offset pagination (the default): fetch a superset and slice
+    outcome = search_manager.search_detailed(req.query, limit=page * size, topic_filter=req.topic)
+    sup = outcome.results
     if req.sort == "name":
         sup.sort(key=lambda r: (r.document_title or ""))
     else:
@@ -102,20 +140,15 @@ def api_search_advanced(req: AdvancedSearchRequest) -> Dict[str, Any]:
     start = (page - 1) * size
     items = sup[start:start + size]
     total = len(sup)
-    data = [
-        {
-            "document_id": r.document_id,
-            "document_title": r.document_title,
-            "page_number": r.page_number,
-            "snippet": r.snippet,
-            "relevance_score": r.relevance_score,
-            "match_type": r.match_type.value,
-            "highlighted_text": r.highlighted_text,
-            "topic_path": r.topic_path,
-        }
-        for r in items
-    ]
-    return {"total": total, "page": page, "size": size, "items": data}
+    return {
+        "total": total,
+        "page": page,
+        "size": size,
+        "items": [_result_dict(r) for r in items],
+        "next_cursor": None,
+        "partial": outcome.partial,
+        "timed_out_legs": outcome.timed_out_legs,
+    }
 
 
 # ---------- Document management ----------
@@ -66,6 +66,17 @@ def test_indexing(document_path: str) -> None:
         print(f"Error during indexing: {e}")
 
 
+def benchmark_extraction(folder: str, limit: int | None = None) -> None:
+    """Report pages/sec for each available PDF extraction backend."""
+    from src.core.documents.benchmark import benchmark_extraction as run, format_benchmark
+
+    if not Path(folder).is_dir():
+        print(f"Error: Folder not found: {folder}")
+        return
+    print(f"Benchmarking PDF extraction in: {folder}")
+    print(format_benchmark(run(Path(folder), limit=limit)))
+
+
 def health_check() -> None:
     """Check system health and service status."""
     print("Performing health check...")
@@ -111,6 +122,11 @@ def main():
     index_parser = subparsers.add_parser('index', help='Test document indexing')
     index_parser.add_argument('document', help='Path to document to index')
     
+    # Extraction benchmark command
+    bench_parser = subparsers.add_parser('bench-extract', help='Compare PDF extraction backends (pages/sec)')
+    bench_parser.add_argument('folder', help='Folder containing PDFs')
+    bench_parser.add_argument('--limit', type=int, default=None, help='Maximum number of files')
+    
     # Health command
     health_parser = subparsers.add_parser('health', help='Check system health')
     
@@ -128,6 +144,8 @@ def main():
         test_search(args.query, args.limit)
     elif args.command == 'index':
         test_indexing(args.document)
+    elif args.command == 'bench-extract':
+        benchmark_extraction(args.folder, args.limit)
     elif args.command == 'health':
         health_check()
 
@@ -1,7 +1,11 @@
 from .base import DocumentProcessor
+from .extraction_cache import ExtractionCache
 from .manager import DocumentManager
-from .models import DocumentContent, PageContent
+from .manifest import ManifestDiff, ManifestEntry, ManifestStore
+from .models import DocumentContent, PageContent, PageStream
+from .pool import ExtractionPool, ExtractionResult, PoolSettings
 from .pdf import PDFProcessor
+from .pdfium import PdfiumProcessor
 from .text import TextProcessor
 from .docx import DocxProcessor
 from .watcher import FileWatcher
@@ -9,9 +13,18 @@ from .watcher import FileWatcher
 __all__ = [
     "DocumentProcessor",
     "DocumentManager",
+    "ExtractionCache",
+    "ManifestDiff",
+    "ManifestEntry",
+    "ManifestStore",
     "DocumentContent",
     "PageContent",
+    "PageStream",
+    "ExtractionPool",
+    "ExtractionResult",
+    "PoolSettings",
     "PDFProcessor",
+    "PdfiumProcessor",
     "TextProcessor",
     "DocxProcessor",
     "FileWatcher",
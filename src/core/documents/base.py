@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
-from src.core.documents.models import DocumentContent
+from src.core.documents.models import DocumentContent, PageContent, PageStream
 
 
 class DocumentProcessor(ABC):
@@ -23,7 +23,25 @@ class DocumentProcessor(ABC):
     def supported_suffixes(self) -> Iterable[str]:  # e.g., (".pdf",)
         """Return iterable of supported lowercase file suffixes including dot."""
 
+    @property
+    def version(self) -> str:
+        """Extraction version; bump when output changes so manifests re-extract files."""
+        return "1"
+
     @abstractmethod
     def process(self, file_path: Path) -> DocumentContent:
         """Process a document and return unified content representation."""
 
+    def stream(self, file_path: Path) -> PageStream:
+        """Open a document for page-at-a-time reading.
+
+        The default extracts everything via `process`; processors for formats with
+        large documents override it to keep only the current page in memory.
+        """
+        doc = self.process(file_path)
+        header = DocumentContent(file_path=doc.file_path, title=doc.title, metadata=doc.metadata)
+        return PageStream(header=header, pages=iter(doc.pages), page_count=len(doc.pages))
+
+    def iter_pages(self, file_path: Path) -> Iterator[PageContent]:
+        """Yield the pages of a document one at a time (see `stream`)."""
+        return self.stream(file_path).pages
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional
+
+from src.core.documents.base import DocumentProcessor
+from src.core.exceptions.exceptions import DocumentProcessingError
+
+
+@dataclass(slots=True)
+class ExtractionBenchmark:
+    backend: str
+    files: int = 0
+    pages: int = 0
+    characters: int = 0
+    seconds: float = 0.0
+    failed: Dict[str, str] = field(default_factory=dict)  # path -> error
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.seconds if self.seconds > 0 else 0.0
+
+
+def pdf_backends() -> Dict[str, DocumentProcessor]:
+    """Every PDF extractor usable in this environment, keyed by backend name."""
+    from src.core.documents.pdf import PDFProcessor
+    from src.core.documents.pdfium import PdfiumProcessor, pdfium_available
+
+    backends: Dict[str, DocumentProcessor] = {"pdfplumber": PDFProcessor()}
+    if pdfium_available():
+        backends["pdfium"] = PdfiumProcessor()
+    return backends
+
+
+def benchmark_extraction(
+    folder: Path,
+    backends: Optional[Mapping[str, DocumentProcessor]] = None,
+    limit: Optional[int] = None,
+) -> List[ExtractionBenchmark]:
+    """Extract every PDF under `folder` with each backend and time it.
+
+    Pages are streamed and dropped as they come, so the numbers reflect extraction
+    cost rather than memory pressure. Backends run one after another over the same
+    files; run twice if a cold OS page cache would skew the first backend.
+    """
+    files = sorted(p for p in Path(folder).rglob("*") if p.is_file() and p.suffix.lower() == ".pdf")
+    if limit is not None:
+        files = files[: max(0, int(limit))]
+    results: List[ExtractionBenchmark] = []
+    for name, processor in (backends if backends is not None else pdf_backends()).items():
+        bench = ExtractionBenchmark(backend=name)
+        start = time.perf_counter()
+        for path in files:
+            try:
+                for page in processor.iter_pages(path):
+                    bench.pages += 1
+                    bench.characters += len(page.text)
+            except DocumentProcessingError as exc:
+                bench.failed[str(path)] = str(exc)
+                continue
+            bench.files += 1
+        bench.seconds = time.perf_counter() - start
+        results.append(bench)
+    return results
+
+
+def format_benchmark(results: List[ExtractionBenchmark]) -> str:
+    rows = [f"{'backend':<12} {'files':>6} {'pages':>7} {'seconds':>9} {'pages/s':>9} {'failed':>6}"]
+    for r in results:
+        rows.append(
+            f"{r.backend:<12} {r.files:>6} {r.pages:>7} {r.seconds:>9.2f} {r.pages_per_sec:>9.1f} {len(r.failed):>6}"
+        )
+    return "\n".join(rows)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from src.core.documents.hashing import FileStat, content_hash
+from src.core.documents.models import DocumentContent, PageContent, PageStream
+
+_MAGIC = b"GSX1"
+_HEADER = struct.Struct("<4sI")  # magic, header length
+_LOW_WATERMARK = 0.9  # evict down to this fraction of max_bytes
+
+
+def _zstd() -> Optional[Any]:
+    try:
+        import zstandard  # type: ignore
+
+        return zstandard
+    except Exception:
+        return None
+
+
+class ExtractionCache:
+    """Content-addressed on-disk cache of extracted text.
+
+    - Entries are keyed by the file's content hash plus the processor's
+      `name:version`, so renamed or copied files hit, edited files miss, and a
+      processor upgrade re-extracts. Pairing the cache with `ManifestStore`
+      entries (`get(path, entry.content_hash, entry.processor_version)`) rebuilds
+      documents without reading the original files at all.
+    - One blob per document: a JSON header (title, metadata, page offsets)
+      followed by each page compressed on its own, so pages can be streamed.
+      zstd is used when `zstandard` is installed, zlib otherwise; the codec is
+      recorded per blob.
+    - Blobs are written atomically; a hit refreshes the blob's mtime and the
+      least recently used blobs are evicted once the store exceeds `max_bytes`.
+    """
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = 2 * 1024**3, codec: str = "auto") -> None:
+        if codec not in ("auto", "zstd", "zlib"):
+            raise ValueError("codec must be one of: auto, zstd, zlib")
+        if root is None:
+            from cross_ide_path_utils import PathResolver
+
+            root = PathResolver().get_cache_path("extracted")
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = int(max_bytes)
+        if codec == "auto":
+            codec = "zstd" if _zstd() is not None else "zlib"
+        self._codec = codec
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # bytes on disk; computed on first write
+        self._hashes: Dict[str, Tuple[FileStat, str]] = {}  # path -> (stat, digest)
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    # ---------- Keys ----------
+    def hash_of(self, file_path: Path) -> str:
+        """Content hash of `file_path`, re-computed only when its size or mtime moved."""
+        stat = FileStat.of(file_path)
+        key = str(file_path)
+        known = self._hashes.get(key)
+        if known is not None and known[0] == stat:
+            return known[1]
+        digest = content_hash(file_path)
+        self._hashes[key] = (stat, digest)
+        return digest
+
+    def blob_path(self, digest: str, processor_version: str) -> Path:
+        name = hashlib.blake2b(f"{digest}|{processor_version}".encode("utf-8"), digest_size=16).hexdigest()
+        return self._root / name[:2] / f"{name}.gsx"
+
+    # ---------- Access ----------
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return self.blob_path(*key).exists()
+
+    def get(self, file_path: Path, digest: str, processor_version: str) -> Optional[DocumentContent]:
+        stream = self.stream(file_path, digest, processor_version)
+        return stream.collect() if stream is not None else None
+
+    def stream(self, file_path: Path, digest: str, processor_version: str) -> Optional[PageStream]:
+        """Cached document as a page stream, or `None` on a miss (or unreadable blob)."""
+        path = self.blob_path(digest, processor_version)
+        try:
+            f = path.open("rb")
+        except OSError:
+            return None
+        try:
+            magic, size = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError("not an extraction cache blob")
+            header = json.loads(f.read(size).decode("utf-8"))
+            decompress = self._decompressor(header["codec"])
+            os.utime(path)  # LRU recency
+        except (OSError, ValueError, KeyError, struct.error):
+            f.close()
+            self._discard(path)
+            return None
+        title = header["title"]
+        if title == header.get("stem"):
+            # Title was the processor's file-name fallback; follow the current name
+            title = Path(file_path).stem
+        doc = DocumentContent(file_path=Path(file_path), title=title, metadata=header.get("metadata") or {})
+        # Reads through the already-open handle, so a concurrent eviction cannot break it
+        pages = self._read_pages(f, _HEADER.size + size, header["pages"], decompress)
+        return PageStream(header=doc, pages=pages, page_count=len(header["pages"]))
+
+    def put(self, digest: str, processor_version: str, doc: DocumentContent) -> None:
+        self._write(digest, processor_version, doc, [self._compress(p.text) for p in doc.pages])
+
+    def record(self, digest: str, processor_version: str, stream: PageStream) -> PageStream:
+        """Wrap `stream` so the document is cached once its pages have all been read.
+
+        Only compressed page text is retained while the stream is consumed; an
+        abandoned or failing stream leaves no entry behind.
+        """
+
+        def pages() -> Iterator[PageContent]:
+            blobs: List[bytes] = []
+            for page in stream.pages:
+                blobs.append(self._compress(page.text))
+                yield page
+            self._write(digest, processor_version, stream.header, blobs)
+
+        return PageStream(header=stream.header, pages=pages(), page_count=stream.page_count)
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self._root.glob("*/*.gsx"))
+
+    # ---------- Internals ----------
+    def _compress(self, text: str) -> bytes:
+        data = text.encode("utf-8")
+        if self._codec == "zstd":
+            return _zstd().ZstdCompressor(level=3).compress(data)  # type: ignore[union-attr]
+        return zlib.compress(data, 6)
+
+    def _decompressor(self, codec: str) -> Any:
+        if codec == "zlib":
+            return zlib.decompress
+        lib = _zstd() if codec == "zstd" else None
+        if lib is None:
+            raise ValueError(f"codec not available: {codec}")
+        return lib.ZstdDecompressor().decompress
+
+    @staticmethod
+    def _read_pages(f: BinaryIO, base: int, offsets: List[List[int]], decompress: Any) -> Iterator[PageContent]:
+        with f:
+            for number, (start, length) in enumerate(offsets):
+                f.seek(base + start)
+                yield PageContent(page_number=number, text=decompress(f.read(length)).decode("utf-8"))
+
+    def _write(self, digest: str, processor_version: str, doc: DocumentContent, blobs: List[bytes]) -> None:
+        offsets: List[List[int]] = []
+        pos = 0
+        for blob in blobs:
+            offsets.append([pos, len(blob)])
+            pos += len(blob)
+        header = json.dumps(
+            {
+                "codec": self._codec,
+                "title": doc.title,
+                "stem": doc.file_path.stem,
+                "metadata": doc.metadata,
+                "processor_version": processor_version,
+                "pages": offsets,
+            },
+            default=str,
+        ).encode("utf-8")
+        target = self.blob_path(digest, processor_version)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with tmp.open("wb") as f:
+                f.write(_HEADER.pack(_MAGIC, len(header)))
+                f.write(header)
+                for blob in blobs:
+                    f.write(blob)
+            os.replace(tmp, target)
+        except OSError:
+            # A full or read-only cache must never fail extraction
+            self._discard(tmp)
+            return
+        self._account(_HEADER.size + len(header) + pos)
+
+    def _account(self, added: int) -> None:
+        with self._lock:
+            if self._size is None:
+                self._size = self.size_bytes()
+            else:
+                self._size += added
+            if self._size <= self._max_bytes:
+                return
+            self._size = self._evict(int(self._max_bytes * _LOW_WATERMARK))
+
+    def _evict(self, target: int) -> int:
+        """Delete least recently used blobs until the store is at most `target` bytes."""
+        blobs = []
+        for p in self._root.glob("*/*.gsx"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            blobs.append((st.st_mtime_ns, st.st_size, p))
+        blobs.sort()
+        total = sum(size for _, size, _ in blobs)
+        for _, size, p in blobs:
+            if total <= target:
+                break
+            self._discard(p)
+            total -= size
+        return total
+
+    @staticmethod
+    def _discard(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
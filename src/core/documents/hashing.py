@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+
+
+HASH_ALGORITHM = "blake2b-128"
+_READ_CHUNK = 1024 * 1024
+
+
+@dataclass(slots=True, frozen=True)
+class FileStat:
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def of(cls, path: Path) -> "FileStat":
+        st = Path(path).stat()
+        return cls(size=int(st.st_size), mtime_ns=int(st.st_mtime_ns))
+
+
+def content_hash(path: Path) -> str:
+    """Hex BLAKE2b-128 digest of a file's bytes, read in 1 MiB blocks.
+
+    BLAKE2b is faster than SHA-256 in CPython and 128 bits is ample for
+    change detection; the result is prefixed with the algorithm so a future
+    switch invalidates stored hashes instead of silently mismatching.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with Path(path).open("rb") as f:
+        for block in iter(lambda: f.read(_READ_CHUNK), b""):
+            h.update(block)
+    return f"{HASH_ALGORITHM}:{h.hexdigest()}"
@@ -1,19 +1,30 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from src.core.documents.base import DocumentProcessor
-from src.core.documents.models import DocumentContent
+from src.core.documents.extraction_cache import ExtractionCache
+from src.core.documents.models import DocumentContent, PageContent, PageStream
+from src.core.documents.pool import ExtractionPool, ExtractionResult, PoolSettings
 from src.core.exceptions.exceptions import DocumentProcessingError
 
 
 class DocumentManager:
-    """Registers processors and routes files to the appropriate one by suffix."""
+    """Registers processors and routes files to the appropriate one by suffix.
 
-    def __init__(self) -> None:
+    With an `ExtractionCache`, `process` and `stream` serve unchanged files from
+    previously extracted text and only run the processor on a cache miss.
+    """
+
+    def __init__(self, cache: Optional[ExtractionCache] = None) -> None:
         self._processors: List[DocumentProcessor] = []
         self._suffix_map: Dict[str, DocumentProcessor] = {}
+        self._cache = cache
+
+    @property
+    def cache(self) -> Optional[ExtractionCache]:
+        return self._cache
 
     def register(self, processor: DocumentProcessor) -> None:
         """Register a processor; first registration for a suffix wins (priority)."""
@@ -28,31 +39,95 @@ class DocumentManager:
         return self._suffix_map.get(suffix)
 
     def process(self, file_path: Path) -> DocumentContent:
-        proc = self.get_processor_for(file_path)
-        if proc is None:
-            raise DocumentProcessingError(f"No processor registered for: {file_path.suffix}")
+        proc = self._require_processor(file_path)
+        key = self._cache_key(proc, file_path)
+        if key is not None:
+            hit = self._cache.get(file_path, *key)  # type: ignore[union-attr]
+            if hit is not None:
+                return hit
+        try:
+            doc = proc.process(file_path)
+        except DocumentProcessingError:
+            raise
+        except Exception as exc:  # pragma: no cover - defensive path
+            raise DocumentProcessingError(str(exc)) from exc
+        if key is not None:
+            self._cache.put(*key, doc)  # type: ignore[union-attr]
+        return doc
+
+    def stream(self, file_path: Path) -> PageStream:
+        """Open a document for page-at-a-time extraction (see `DocumentProcessor.stream`)."""
+        proc = self._require_processor(file_path)
+        key = self._cache_key(proc, file_path)
+        if key is not None:
+            hit = self._cache.stream(file_path, *key)  # type: ignore[union-attr]
+            if hit is not None:
+                return hit
         try:
-            return proc.process(file_path)
+            stream = proc.stream(file_path)
         except DocumentProcessingError:
             raise
         except Exception as exc:  # pragma: no cover - defensive path
             raise DocumentProcessingError(str(exc)) from exc
+        if key is not None:
+            return self._cache.record(*key, stream)  # type: ignore[union-attr]
+        return stream
+
+    def iter_pages(self, file_path: Path) -> Iterator[PageContent]:
+        return self.stream(file_path).pages
+
+    def process_many(
+        self,
+        paths: Iterable[Path],
+        settings: Optional[PoolSettings] = None,
+        ordered: bool = True,
+    ) -> Iterator[ExtractionResult]:
+        """Extract many files on a process pool, streaming one result per path.
+
+        Failures (errors, timeouts, crashed workers) come back as results with
+        `error` set instead of raising, so one bad file cannot stop the batch.
+        `settings.workers == 1` still isolates extraction in a child process.
+        """
+        with ExtractionPool(self, settings) as pool:
+            yield from pool.imap(paths, ordered=ordered)
+
+    def from_cache(self, file_path: Path, content_hash: str, processor_version: str) -> Optional[DocumentContent]:
+        """Cached text for a file described by a manifest entry; never reads `file_path`."""
+        if self._cache is None:
+            return None
+        return self._cache.get(file_path, content_hash, processor_version)
+
+    def processor_version(self, file_path: Path) -> str:
+        """`name:version` of the processor handling `file_path` ("" if none)."""
+        proc = self.get_processor_for(file_path)
+        return f"{proc.name}:{proc.version}" if proc is not None else ""
 
     @property
     def registered_suffixes(self) -> List[str]:
         return sorted(self._suffix_map.keys())
 
     # -------- Auto-discovery --------
-    def auto_register_builtin(self) -> None:
+    def auto_register_builtin(self, pdf_backend: str = "auto", layout_patterns: Iterable[str] = ()) -> None:
         """Register built-in processors shipped in src/core/documents/.
 
         Import lazily to avoid hard deps at import time.
+
+        `pdf_backend` picks the PDF extractor: "pdfium" (fast, text only),
+        "pdfplumber" (layout aware) or "auto" (pdfium when pypdfium2 is installed).
+        With pdfium, files matching `layout_patterns` still go through pdfplumber.
         """
+        if pdf_backend not in ("auto", "pdfium", "pdfplumber"):
+            raise ValueError("pdf_backend must be one of: auto, pdfium, pdfplumber")
         # PDF
         try:
             from src.core.documents.pdf import PDFProcessor  # noqa: WPS433
+            from src.core.documents.pdfium import PdfiumProcessor, pdfium_available  # noqa: WPS433
 
-            self.register(PDFProcessor())
+            plumber = PDFProcessor()
+            if pdf_backend == "pdfium" or (pdf_backend == "auto" and pdfium_available()):
+                # Registered first, so it takes priority for ".pdf"
+                self.register(PdfiumProcessor(fallback=plumber, layout_patterns=tuple(layout_patterns)))
+            self.register(plumber)
         except Exception:
             pass
 
@@ -71,3 +146,19 @@ class DocumentManager:
             self.register(DocxProcessor())
         except Exception:
             pass
+
+    # ---- Internals ----
+    def _require_processor(self, file_path: Path) -> DocumentProcessor:
+        proc = self.get_processor_for(file_path)
+        if proc is None:
+            raise DocumentProcessingError(f"No processor registered for: {file_path.suffix}")
+        return proc
+
+    def _cache_key(self, proc: DocumentProcessor, file_path: Path) -> Optional[Tuple[str, str]]:
+        if self._cache is None:
+            return None
+        try:
+            digest = self._cache.hash_of(file_path)
+        except OSError:
+            return None  # let the processor report the unreadable file
+        return digest, f"{proc.name}:{proc.version}"
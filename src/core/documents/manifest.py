@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from src.core.documents.hashing import FileStat, content_hash
+
+
+@dataclass(slots=True, frozen=True)
+class ManifestEntry:
+    path: str
+    size: int
+    mtime_ns: int
+    content_hash: str
+    processor_version: str
+    model_name: str
+
+
+@dataclass(slots=True)
+class ManifestDiff:
+    """Outcome of comparing files on disk with the manifest.
+
+    - `changed`: fresh entries for new/modified files (or files whose processor or
+      model changed); record them with `ManifestStore.upsert` once indexed.
+    - `unchanged`: paths that can skip extraction and embedding entirely.
+    - `missing`: paths that could not be read (vanished or unreadable).
+    """
+
+    changed: List[ManifestEntry] = field(default_factory=list)
+    unchanged: List[Path] = field(default_factory=list)
+    missing: List[Path] = field(default_factory=list)
+
+
+class ManifestStore:
+    """SQLite table of what was indexed: path -> size, mtime, content hash, versions.
+
+    - `diff` loads the whole table once and stats every file; only files whose size
+      or mtime moved are hashed, so a re-run over an unchanged share costs one
+      `stat` per file. A file that was merely touched (same hash) is refreshed in
+      place and is not reported as changed.
+    - Writes are batched in one transaction; the connection is shared across
+      threads behind a lock and uses WAL so readers do not block the writer.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            processor_version TEXT NOT NULL,
+            model_name TEXT NOT NULL
+        )
+    """
+
+    def __init__(self, db_path: Union[Path, str] = ":memory:") -> None:
+        if str(db_path) != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if str(db_path) != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(self._SCHEMA)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---------- Access ----------
+    def get(self, path: Union[Path, str]) -> Optional[ManifestEntry]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM files WHERE path = ?", (str(path),)).fetchone()
+        return ManifestEntry(*row) if row else None
+
+    def entries(self) -> Dict[str, ManifestEntry]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM files").fetchall()
+        return {row[0]: ManifestEntry(*row) for row in rows}
+
+    def upsert(self, entries: Iterable[ManifestEntry]) -> None:
+        rows = [
+            (e.path, e.size, e.mtime_ns, e.content_hash, e.processor_version, e.model_name) for e in entries
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def remove(self, paths: Iterable[Union[Path, str]]) -> None:
+        keys = [(str(p),) for p in paths]
+        if not keys:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM files WHERE path = ?", keys)
+
+    # ---------- Change detection ----------
+    def diff(
+        self,
+        paths: Iterable[Path],
+        processor_version: Callable[[Path], str],
+        model_name: str = "",
+    ) -> ManifestDiff:
+        """Classify `paths` against the manifest (see class docstring)."""
+        known = self.entries()
+        out = ManifestDiff()
+        touched: List[ManifestEntry] = []
+        for path in paths:
+            key = str(path)
+            try:
+                stat = FileStat.of(path)
+            except OSError:
+                out.missing.append(path)
+                continue
+            version = processor_version(path)
+            prev = known.get(key)
+            same_pipeline = prev is not None and prev.processor_version == version and prev.model_name == model_name
+            if prev is not None and same_pipeline and prev.size == stat.size and prev.mtime_ns == stat.mtime_ns:
+                out.unchanged.append(path)
+                continue
+            try:
+                digest = content_hash(path)
+            except OSError:
+                out.missing.append(path)
+                continue
+            entry = ManifestEntry(key, stat.size, stat.mtime_ns, digest, version, model_name)
+            if prev is not None and same_pipeline and prev.content_hash == digest:
+                # Touched but not modified: remember the new mtime so the next run is stat-only
+                touched.append(entry)
+                out.unchanged.append(path)
+            else:
+                out.changed.append(entry)
+        self.upsert(touched)
+        return out
+
+    def stale_paths(self, live: Iterable[Union[Path, str]]) -> List[str]:
+        """Manifest paths not in `live` (e.g. files deleted since the last run)."""
+        keep = {str(p) for p in live}
+        return [p for p in self.entries() if p not in keep]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 
 
 @dataclass(slots=True)
@@ -32,3 +32,22 @@ class DocumentContent:
     def from_text(cls, file_path: Path, title: str, text: str) -> "DocumentContent":
         return cls(file_path=file_path, title=title, pages=[PageContent(page_number=0, text=text)])
 
+
+
+@dataclass(slots=True)
+class PageStream:
+    """A document whose pages are produced lazily, one at a time.
+
+    `header` carries the title and metadata with no pages; `page_count` is known
+    up front for formats that store it (PDF) and `None` otherwise. `pages` can be
+    consumed once.
+    """
+
+    header: DocumentContent
+    pages: Iterator[PageContent]
+    page_count: Optional[int] = None
+
+    def collect(self) -> DocumentContent:
+        """Materialise every remaining page into a regular `DocumentContent`."""
+        h = self.header
+        return DocumentContent(file_path=h.file_path, title=h.title, pages=list(self.pages), metadata=h.metadata)
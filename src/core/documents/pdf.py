@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable, Iterator, List
 
 from src.core.documents.base import DocumentProcessor
-from src.core.documents.models import DocumentContent, PageContent
+from src.core.documents.models import DocumentContent, PageContent, PageStream
 from src.core.exceptions.exceptions import DocumentProcessingError
 
 
@@ -20,29 +20,64 @@ class PDFProcessor(DocumentProcessor):
         return [".pdf"]
 
     def process(self, file_path: Path) -> DocumentContent:
+        return self.stream(file_path).collect()
+
+    def stream(self, file_path: Path) -> PageStream:
+        """Open the PDF and extract text lazily, one page per iteration step.
+
+        Each page's layout caches are flushed once its text is taken, so memory stays
+        bounded by the largest page rather than the whole document. The file is
+        closed when the page iterator is exhausted, closed or garbage-collected.
+        """
         try:
             # Import inside method to avoid hard dependency at module import time in tests
             import pdfplumber  # type: ignore
 
-            with pdfplumber.open(str(file_path)) as pdf:  # type: ignore[attr-defined]
-                title = getattr(getattr(pdf, "metadata", {}), "get", lambda *_: None)("Title")
-                if not title:
-                    # Attempt dict-style access if metadata is a dict
-                    meta = getattr(pdf, "metadata", {})
-                    if isinstance(meta, dict):
-                        title = meta.get("Title")
-                if not title:
-                    title = file_path.stem
-
-                pages = []
-                for idx, page in enumerate(getattr(pdf, "pages", []) or []):
+            pdf = pdfplumber.open(str(file_path))  # type: ignore[attr-defined]
+        except Exception as exc:
+            raise DocumentProcessingError(f"Failed to process PDF: {file_path} ({exc})") from exc
+        try:
+            pdf_pages = list(getattr(pdf, "pages", []) or [])
+            header = DocumentContent(file_path=file_path, title=self._title(pdf, file_path))
+        except Exception as exc:  # pragma: no cover - wrapped for robustness
+            self._close(pdf)
+            raise DocumentProcessingError(f"Failed to process PDF: {file_path} ({exc})") from exc
+        return PageStream(header=header, pages=self._pages(pdf, pdf_pages, file_path), page_count=len(pdf_pages))
+
+    # ---- Internals ----
+    def _pages(self, pdf: Any, pdf_pages: List[Any], file_path: Path) -> Iterator[PageContent]:
+        try:
+            for idx in range(len(pdf_pages)):
+                page = pdf_pages[idx]
+                pdf_pages[idx] = None  # drop our reference as we go
+                try:
                     # pdfplumber Page has extract_text(); default to empty string if None
                     text = page.extract_text() or ""
-                    pages.append(PageContent(page_number=idx, text=text))
+                except Exception as exc:
+                    raise DocumentProcessingError(f"Failed to process PDF: {file_path} ({exc})") from exc
+                finally:
+                    close = getattr(page, "close", None)
+                    if close is not None:
+                        close()  # flushes cached chars/layout objects for this page
+                yield PageContent(page_number=idx, text=text)
+        finally:
+            self._close(pdf)
 
-                return DocumentContent(file_path=file_path, title=title, pages=pages)
-        except DocumentProcessingError:
-            raise
-        except Exception as exc:  # pragma: no cover - wrapped for robustness
-            raise DocumentProcessingError(f"Failed to process PDF: {file_path} ({exc})") from exc
+    @staticmethod
+    def _title(pdf: Any, file_path: Path) -> str:
+        title = getattr(getattr(pdf, "metadata", {}), "get", lambda *_: None)("Title")
+        if not title:
+            # Attempt dict-style access if metadata is a dict
+            meta = getattr(pdf, "metadata", {})
+            if isinstance(meta, dict):
+                title = meta.get("Title")
+        return str(title) if title else file_path.stem
 
+    @staticmethod
+    def _close(pdf: Any) -> None:
+        # pdfplumber.PDF.close(); test doubles may only implement the context protocol
+        close = getattr(pdf, "close", None)
+        if close is not None:
+            close()
+        else:
+            pdf.__exit__(None, None, None)
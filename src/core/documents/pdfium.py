@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from src.core.documents.base import DocumentProcessor
+from src.core.documents.models import DocumentContent, PageContent, PageStream
+from src.core.exceptions.exceptions import DocumentProcessingError
+
+
+def pdfium_available() -> bool:
+    try:
+        import pypdfium2  # type: ignore  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+class PdfiumProcessor(DocumentProcessor):
+    """Fast text-only PDF processor backed by pypdfium2 (PDFium's native text layer).
+
+    - Several times faster than pdfplumber because it skips pdfminer's per-character
+      layout analysis; reading order follows the content stream.
+    - Files matching `layout_patterns` (fnmatch on the full path or the file name)
+      are delegated to `fallback`, normally the pdfplumber `PDFProcessor`, for
+      layout-sensitive material such as tables or multi-column scans.
+    - Files PDFium cannot open are retried with `fallback` before failing.
+    """
+
+    def __init__(
+        self,
+        fallback: Optional[DocumentProcessor] = None,
+        layout_patterns: Sequence[str] = (),
+    ) -> None:
+        self._fallback = fallback
+        self._layout_patterns = tuple(layout_patterns)
+
+    @property
+    def name(self) -> str:  # pragma: no cover - trivial
+        return "pdfium"
+
+    @property
+    def supported_suffixes(self) -> Iterable[str]:  # pragma: no cover - trivial
+        return [".pdf"]
+
+    def process(self, file_path: Path) -> DocumentContent:
+        return self.stream(file_path).collect()
+
+    def stream(self, file_path: Path) -> PageStream:
+        if self._fallback is not None and self._is_layout_sensitive(file_path):
+            return self._fallback.stream(file_path)
+        try:
+            # Import inside method to keep pypdfium2 an optional dependency
+            import pypdfium2 as pdfium  # type: ignore
+
+            pdf = pdfium.PdfDocument(str(file_path))
+        except Exception as exc:
+            if self._fallback is not None:
+                return self._fallback.stream(file_path)
+            raise DocumentProcessingError(f"Failed to process PDF: {file_path} ({exc})") from exc
+        try:
+            title = (pdf.get_metadata_dict() or {}).get("Title") or file_path.stem
+            header = DocumentContent(file_path=file_path, title=str(title))
+            count = len(pdf)
+        except Exception as exc:  # pragma: no cover - wrapped for robustness
+            pdf.close()
+            raise DocumentProcessingError(f"Failed to process PDF: {file_path} ({exc})") from exc
+        return PageStream(header=header, pages=self._pages(pdf, count, file_path), page_count=count)
+
+    # ---- Internals ----
+    def _is_layout_sensitive(self, file_path: Path) -> bool:
+        full, name = str(file_path), file_path.name
+        return any(fnmatch(full, pat) or fnmatch(name, pat) for pat in self._layout_patterns)
+
+    @staticmethod
+    def _pages(pdf: Any, count: int, file_path: Path) -> Iterator[PageContent]:
+        try:
+            for idx in range(count):
+                page = textpage = None
+                try:
+                    page = pdf[idx]
+                    textpage = page.get_textpage()
+                    text = textpage.get_text_range() or ""
+                except Exception as exc:
+                    raise DocumentProcessingError(f"Failed to process PDF: {file_path} ({exc})") from exc
+                finally:
+                    # Release native page handles right away instead of at GC time
+                    if textpage is not None:
+                        textpage.close()
+                    if page is not None:
+                        page.close()
+                # PDFium separates lines with CRLF; match pdfplumber's "\n"
+                yield PageContent(page_number=idx, text=text.replace("\r\n", "\n"))
+        finally:
+            pdf.close()
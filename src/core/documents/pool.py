@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.core.documents.models import DocumentContent
+
+if TYPE_CHECKING:  # pragma: no cover
+    from src.core.documents.manager import DocumentManager
+
+
+@dataclass(slots=True)
+class ExtractionResult:
+    path: Path
+    document: Optional[DocumentContent] = None
+    error: Optional[str] = None
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.document is not None
+
+
+@dataclass(slots=True)
+class PoolSettings:
+    workers: int = 0  # 0 = one per CPU
+    timeout_sec: float = 120.0  # per file; the worker is killed and replaced
+    max_memory_mb: int = 1024  # recycle a worker once its peak RSS exceeds this (0 = never)
+    max_tasks_per_worker: int = 0  # recycle after this many files (0 = never)
+
+
+def _peak_rss_mb() -> float:
+    try:
+        import resource
+
+        # ru_maxrss is KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    except Exception:
+        return 0.0
+
+
+def _worker_main(conn: Connection, manager: "DocumentManager") -> None:
+    """Extract one file per request until told to stop (a `None` request)."""
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if task is None:
+            return
+        index, path = task
+        try:
+            payload: Tuple[Any, ...] = (index, manager.process(path), None, _peak_rss_mb())
+        except Exception as exc:
+            payload = (index, None, f"{type(exc).__name__}: {exc}", _peak_rss_mb())
+        try:
+            conn.send(payload)
+        except Exception as exc:
+            # e.g. an unpicklable document: report instead of hanging the parent
+            conn.send((index, None, f"result not transferable: {exc}", _peak_rss_mb()))
+
+
+class _Worker:
+    __slots__ = ("process", "conn", "task", "deadline", "done")
+
+    def __init__(self, ctx: Any, manager: "DocumentManager") -> None:
+        parent, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, manager), daemon=True)
+        self.process.start()
+        child.close()
+        self.conn: Connection = parent
+        self.task: Optional[Tuple[int, Path]] = None
+        self.deadline = 0.0
+        self.done = 0
+
+    def assign(self, index: int, path: Path, timeout: float) -> None:
+        self.task = (index, path)
+        self.deadline = time.monotonic() + timeout
+        self.conn.send((index, path))
+
+    def retire(self) -> None:
+        try:
+            self.conn.send(None)
+        except Exception:
+            pass
+        self.process.join(timeout=1.0)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1.0)
+        self.conn.close()
+
+
+class ExtractionPool:
+    """Process pool for `DocumentManager.process` with failure isolation.
+
+    - Each worker handles one file at a time, so a file that exceeds
+      `timeout_sec` (or crashes its worker) is reported on its own and the worker
+      is replaced; the rest of the batch keeps flowing.
+    - Workers are recycled after `max_tasks_per_worker` files or once their peak
+      RSS passes `max_memory_mb`, bounding leaks in native PDF libraries.
+    - `imap` consumes its input lazily and streams results, in input order or as
+      they complete.
+    """
+
+    def __init__(
+        self,
+        manager: "DocumentManager",
+        settings: Optional[PoolSettings] = None,
+        mp_context: Optional[Any] = None,
+    ) -> None:
+        self._manager = manager
+        self._settings = settings or PoolSettings()
+        self._ctx = mp_context or mp.get_context()
+        n = self._settings.workers or os.cpu_count() or 1
+        self._size = max(1, int(n))
+        self._workers: List[_Worker] = []
+
+    def __enter__(self) -> "ExtractionPool":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for w in self._workers:
+            w.retire()
+        self._workers.clear()
+
+    def imap(self, paths: Iterable[Path], ordered: bool = True) -> Iterator[ExtractionResult]:
+        pending = enumerate(Path(p) for p in paths)
+        carry: Optional[Tuple[int, Path]] = None
+        exhausted = False
+        buffered: Dict[int, ExtractionResult] = {}
+        next_out = 0
+        while True:
+            # Keep every worker busy while input remains
+            while not exhausted:
+                if carry is None:
+                    carry = next(pending, None)
+                    if carry is None:
+                        exhausted = True
+                        break
+                worker = self._idle_worker()
+                if worker is None:
+                    break
+                worker.assign(carry[0], carry[1], self._settings.timeout_sec)
+                carry = None
+            busy = [w for w in self._workers if w.task is not None]
+            if not busy:
+                return
+            for index, result in self._collect(busy):
+                if not ordered:
+                    yield result
+                    continue
+                buffered[index] = result
+                while next_out in buffered:
+                    yield buffered.pop(next_out)
+                    next_out += 1
+
+    # ---- Internals ----
+    def _idle_worker(self) -> Optional[_Worker]:
+        for w in self._workers:
+            if w.task is None:
+                return w
+        if len(self._workers) < self._size:
+            w = _Worker(self._ctx, self._manager)
+            self._workers.append(w)
+            return w
+        return None
+
+    def _collect(self, busy: List[_Worker]) -> List[Tuple[int, ExtractionResult]]:
+        now = time.monotonic()
+        timeout = max(0.0, min(w.deadline for w in busy) - now)
+        ready = wait([w.conn for w in busy], timeout=timeout)
+        out: List[Tuple[int, ExtractionResult]] = []
+        for w in busy:
+            assert w.task is not None
+            index, path = w.task
+            if w.conn in ready:
+                try:
+                    _idx, doc, error, rss_mb = w.conn.recv()
+                except (EOFError, OSError):
+                    out.append((index, ExtractionResult(path, error="worker process died")))
+                    self._replace(w)
+                    continue
+                out.append((index, ExtractionResult(path, document=doc, error=error)))
+                w.task = None
+                w.done += 1
+                if self._should_recycle(w, rss_mb):
+                    self._replace(w, graceful=True)
+            elif time.monotonic() >= w.deadline:
+                out.append(
+                    (index, ExtractionResult(path, error=f"timed out after {self._settings.timeout_sec}s", timed_out=True))
+                )
+                self._replace(w)
+        return out
+
+    def _should_recycle(self, w: _Worker, rss_mb: float) -> bool:
+        s = self._settings
+        if s.max_tasks_per_worker and w.done >= s.max_tasks_per_worker:
+            return True
+        return bool(s.max_memory_mb) and rss_mb > s.max_memory_mb
+
+    def _replace(self, w: _Worker, graceful: bool = False) -> None:
+        # New workers are started lazily by `_idle_worker` when there is work
+        self._workers.remove(w)
+        if graceful:
+            w.retire()
+        else:
+            w.kill()
@@ -1,51 +1,395 @@
 from __future__ import annotations
 
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
 import threading
 import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Iterable, Optional, Set
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 from src.core.documents.manager import DocumentManager
+from src.core.events.bus import EventBus
+from src.core.events.events import FileChanged
 
 
+CREATED = "created"
+MODIFIED = "modified"
+DELETED = "deleted"
+MOVED = "moved"
+_RESCAN = "rescan"
+
+RawEvent = Tuple[str, Path, Optional[Path]]
+# (kind, path, source path for moves)
+
+
+def _iter_files(root: Path) -> Iterator[Tuple[Path, os.stat_result]]:
+    """Files under `root` with their stat, via `os.scandir` (one syscall per entry)."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(Path(entry.path))
+                        elif entry.is_file():
+                            yield Path(entry.path), entry.stat()
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+# ---------- Coalescing ----------
+@dataclass(slots=True)
+class _Pending:
+    kind: str
+    src: Optional[Path]
+    last: float
+
+
+class _Coalescer:
+    """Folds bursts of raw events per path into one event once the path goes quiet.
+
+    created+modified -> created, created+deleted -> nothing, modified+deleted ->
+    deleted, deleted+created -> modified, and chained moves collapse into one move.
+    """
+
+    def __init__(self, debounce_sec: float) -> None:
+        self._debounce = max(0.0, float(debounce_sec))
+        self._pending: Dict[Path, _Pending] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._pending)
+
+    def push(self, kind: str, path: Path, src: Optional[Path], now: float) -> None:
+        if kind == MOVED and src is not None:
+            before = self._pending.pop(src, None)
+            if before is not None and before.kind == CREATED:
+                self._pending[path] = _Pending(CREATED, None, now)
+            else:
+                origin = before.src if before is not None and before.kind == MOVED else src
+                self._pending[path] = _Pending(MOVED, origin, now)
+            return
+        prev = self._pending.get(path)
+        if prev is None:
+            self._pending[path] = _Pending(kind, None, now)
+        elif kind == DELETED and prev.kind == CREATED:
+            del self._pending[path]  # never existed as far as consumers are concerned
+        elif kind == DELETED and prev.kind == MOVED and prev.src is not None:
+            # Consumers still know the file under its old name
+            del self._pending[path]
+            self._pending[prev.src] = _Pending(DELETED, None, now)
+        elif kind == CREATED and prev.kind == DELETED:
+            self._pending[path] = _Pending(MODIFIED, None, now)  # replaced in place
+        elif kind == MODIFIED and prev.kind in (CREATED, MOVED):
+            prev.last = now
+        else:
+            self._pending[path] = _Pending(kind, None, now)
+
+    def pop_ready(self, now: float) -> List[FileChanged]:
+        ready = [p for p, st in self._pending.items() if now - st.last >= self._debounce]
+        out: List[FileChanged] = []
+        for path in sorted(ready):
+            st = self._pending.pop(path)
+            src = str(st.src) if st.src is not None else None
+            out.append(FileChanged(kind=st.kind, path=str(path), src_path=src))
+        return out
+
+
+# ---------- Backends ----------
+class _PollingBackend:
+    """Portable fallback: diff a (size, mtime) snapshot of supported files each interval.
+
+    The snapshot is replaced on every scan, so memory tracks the live tree rather
+    than everything ever seen.
+    """
+
+    def __init__(self, interval_sec: float, accept: Callable[[Path], bool]) -> None:
+        self._interval = interval_sec
+        self._accept = accept
+        self._roots: List[Path] = []
+        self._snapshot: Dict[Path, Tuple[int, int]] = {}
+
+    def add_root(self, root: Path) -> None:
+        self._roots.append(root)
+        self._snapshot.update(self._scan(root))
+
+    def poll(self, timeout: float) -> List[RawEvent]:
+        time.sleep(min(timeout, self._interval))
+        current: Dict[Path, Tuple[int, int]] = {}
+        for root in self._roots:
+            current.update(self._scan(root))
+        events: List[RawEvent] = []
+        for path, sig in current.items():
+            old = self._snapshot.get(path)
+            if old is None:
+                events.append((CREATED, path, None))
+            elif old != sig:
+                events.append((MODIFIED, path, None))
+        events.extend((DELETED, path, None) for path in self._snapshot.keys() - current.keys())
+        self._snapshot = current
+        return events
+
+    def _scan(self, root: Path) -> Dict[Path, Tuple[int, int]]:
+        return {p: (st.st_size, st.st_mtime_ns) for p, st in _iter_files(root) if self._accept(p)}
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifyBackend:
+    """Linux inotify through ctypes: the kernel reports changes, idle trees cost nothing.
+
+    Watches are added for every directory (inotify is not recursive), including
+    directories created or moved in later. Moves inside the tree are paired by
+    cookie; a move whose other half is outside the tree becomes created/deleted.
+    Files seen under the watches are remembered, so a directory deleted or moved out
+    reports each of its files as deleted and its watches are dropped. A queue
+    overflow asks the watcher to rescan.
+    """
+
+    _IN_CLOSE_WRITE = 0x8
+    _IN_MOVED_FROM = 0x40
+    _IN_MOVED_TO = 0x80
+    _IN_CREATE = 0x100
+    _IN_DELETE = 0x200
+    _IN_Q_OVERFLOW = 0x4000
+    _IN_IGNORED = 0x8000
+    _IN_ISDIR = 0x40000000
+    _MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+    _HEADER = struct.Struct("iIII")
+
+    def __init__(self) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._libc = libc
+        self._fd = fd
+        self._paths: Dict[int, Path] = {}
+        self._roots: List[Path] = []
+        self._files: Set[Path] = set()  # known files, to report a vanished directory's contents
+
+    def add_root(self, root: Path) -> None:
+        self._roots.append(root)
+        self._watch_tree(root)
+
+    def _watch_tree(self, root: Path) -> None:
+        self._watch(root)
+        for dirpath, _dirs, files in os.walk(root):
+            if Path(dirpath) != root:
+                self._watch(Path(dirpath))
+            self._files.update(Path(dirpath) / f for f in files)
+
+    def _watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), self._MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch({directory}): {os.strerror(err)}")
+        self._paths[wd] = directory
+
+    def poll(self, timeout: float) -> List[RawEvent]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        data = b""
+        while True:
+            try:
+                chunk = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            data += chunk
+        return self._parse(data)
+
+    def _parse(self, data: bytes) -> List[RawEvent]:
+        events: List[RawEvent] = []
+        moved_from: Dict[int, Tuple[Path, bool]] = {}
+        offset = 0
+        while offset + self._HEADER.size <= len(data):
+            wd, mask, cookie, length = self._HEADER.unpack_from(data, offset)
+            raw_name = data[offset + self._HEADER.size : offset + self._HEADER.size + length]
+            offset += self._HEADER.size + length
+            if mask & self._IN_Q_OVERFLOW:
+                self._files = {p for root in self._roots for p, _st in _iter_files(root)}
+                events.append((_RESCAN, Path(), None))
+                continue
+            if mask & self._IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            base = self._paths.get(wd)
+            if base is None:
+                continue
+            path = base / os.fsdecode(raw_name.rstrip(b"\0"))
+            is_dir = bool(mask & self._IN_ISDIR)
+            if mask & self._IN_MOVED_FROM:
+                moved_from[cookie] = (path, is_dir)
+            elif mask & self._IN_MOVED_TO:
+                src = moved_from.pop(cookie, None)
+                if is_dir:
+                    self._dir_arrived(path, src[0] if src else None, events)
+                elif src is not None:
+                    self._emit(events, MOVED, path, src[0])
+                else:
+                    self._emit(events, CREATED, path)
+            elif is_dir:
+                if mask & self._IN_CREATE:
+                    self._dir_arrived(path, None, events)
+                elif mask & self._IN_DELETE:
+                    self._dir_gone(path, events)
+            elif mask & self._IN_CREATE:
+                self._emit(events, CREATED, path)
+            elif mask & self._IN_CLOSE_WRITE:
+                self._emit(events, MODIFIED, path)
+            elif mask & self._IN_DELETE:
+                self._emit(events, DELETED, path)
+        for path, is_dir in moved_from.values():
+            # Moved out of the watched tree
+            if is_dir:
+                self._dir_gone(path, events)
+            else:
+                self._emit(events, DELETED, path)
+        return events
+
+    def _emit(self, events: List[RawEvent], kind: str, path: Path, src: Optional[Path] = None) -> None:
+        if kind == DELETED:
+            self._files.discard(path)
+        else:
+            self._files.add(path)
+            if src is not None:
+                self._files.discard(src)
+        events.append((kind, path, src))
+
+    def _dir_gone(self, path: Path, events: List[RawEvent]) -> None:
+        # Deleted or moved out: report the files it held and stop watching the subtree
+        for p in sorted(p for p in self._files if path in p.parents):
+            self._emit(events, DELETED, p)
+        for wd, old in list(self._paths.items()):
+            if old == path or path in old.parents:
+                del self._paths[wd]
+                self._libc.inotify_rm_watch(self._fd, wd)  # fails harmlessly if already gone
+
+    def _dir_arrived(self, path: Path, src: Optional[Path], events: List[RawEvent]) -> None:
+        if src is not None:
+            # Renamed inside the tree: existing watches keep working, only their paths move
+            for wd, old in list(self._paths.items()):
+                if old == src or src in old.parents:
+                    self._paths[wd] = path / old.relative_to(src)
+            for p, _st in _iter_files(path):
+                self._emit(events, MOVED, p, src / p.relative_to(path))
+            return
+        # New or moved-in directory: watch it, then report what is already inside
+        # (files may have been written before the watch existed)
+        try:
+            self._watch_tree(path)
+        except OSError:
+            return
+        for p, _st in _iter_files(path):
+            self._emit(events, CREATED, p)
+
+    def close(self) -> None:
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+# ---------- Watcher ----------
 class FileWatcher:
-    """Simple polling-based file watcher using pathlib for portability.
+    """Event-driven file watcher with debounced, coalesced change events.
 
-    Notifies a callback when new files are detected under watched directories
-    that are supported by the provided DocumentManager.
+    - Uses inotify on Linux (no work while the tree is idle) and falls back to
+      polling a `(size, mtime)` snapshot elsewhere or when inotify is unavailable
+      (`backend="auto" | "inotify" | "polling"`).
+    - Reports created/modified/deleted/moved events for files a registered processor
+      supports, once a path has been quiet for `debounce_sec`; the events are
+      published as `FileChanged` on the `EventBus` and passed to `start` callbacks.
+    - `start(on_created)` keeps its original meaning: called with the path of each
+      new file, including those already present when watching starts; pass
+      `report_existing=False` to report only files that appear afterwards.
     """
 
-    def __init__(self, manager: DocumentManager, interval_sec: float = 1.0) -> None:
+    IDLE_TIMEOUT_SEC = 0.5  # how often an idle inotify loop checks for stop()
+
+    def __init__(
+        self,
+        manager: DocumentManager,
+        interval_sec: float = 1.0,
+        debounce_sec: float = 0.2,
+        event_bus: Optional[EventBus] = None,
+        backend: str = "auto",
+        report_existing: bool = True,
+    ) -> None:
+        if backend not in ("auto", "inotify", "polling"):
+            raise ValueError("backend must be one of: auto, inotify, polling")
         self._manager = manager
         self._interval = max(0.1, float(interval_sec))
+        self._debounce = max(0.0, float(debounce_sec))
+        self._bus = event_bus
+        self._backend_name = backend
+        self._report_existing = report_existing
         self._dirs: Set[Path] = set()
-        self._seen: Set[Path] = set()
+        self._backend: Optional[_InotifyBackend | _PollingBackend] = None
+        self._coalescer = _Coalescer(self._debounce)
         self._thread: Optional[threading.Thread] = None
         self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> Optional[str]:
+        """Name of the active backend once started ("inotify" or "polling")."""
+        if self._backend is None:
+            return None
+        return "inotify" if isinstance(self._backend, _InotifyBackend) else "polling"
 
     def add_directory(self, directory: Path) -> None:
-        self._dirs.add(directory)
+        with self._lock:
+            self._dirs.add(directory)
+            if self._backend is not None:
+                self._add_root(self._backend, directory)
 
-    def start(self, on_created: Callable[[Path], None]) -> None:
+    def start(
+        self,
+        on_created: Optional[Callable[[Path], None]] = None,
+        on_event: Optional[Callable[[FileChanged], None]] = None,
+    ) -> None:
         if self._thread and self._thread.is_alive():
             return
         self._stop.clear()
+        with self._lock:
+            # Watches/baselines are taken before returning so no early change is missed
+            self._backend = self._create_backend()
+            for d in list(self._dirs):
+                self._add_root(self._backend, d)
 
         def _run() -> None:
             while not self._stop.is_set():
+                backend = self._backend  # may be swapped for polling by add_directory
+                if backend is None:
+                    return
+                timeout = self._debounce if self._coalescer else self._idle_timeout()
                 try:
-                    for d in list(self._dirs):
-                        for p in self._iter_files(d):
-                            if p not in self._seen and self._manager.get_processor_for(p) is not None:
-                                self._seen.add(p)
-                                try:
-                                    on_created(p)
-                                except Exception:
-                                    # Callback exceptions are swallowed to keep watcher alive
-                                    pass
+                    raw = backend.poll(max(0.01, timeout))
                 except Exception:
-                    pass
-                time.sleep(self._interval)
+                    raw = []
+                now = time.monotonic()
+                with self._lock:
+                    for kind, path, src in raw:
+                        self._push(kind, path, src, now)
+                    ready = self._coalescer.pop_ready(now)
+                for evt in ready:
+                    self._dispatch(evt, on_created, on_event)
 
         self._thread = threading.Thread(target=_run, name="file-watcher", daemon=True)
         self._thread.start()
@@ -55,10 +399,79 @@ class FileWatcher:
         if self._thread is not None:
             self._thread.join(timeout=2.0)
             self._thread = None
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
 
-    @staticmethod
-    def _iter_files(directory: Path) -> Iterable[Path]:
+    # ---- Internals ----
+    def _create_backend(self) -> _InotifyBackend | _PollingBackend:
+        if self._backend_name != "polling":
+            try:
+                return _InotifyBackend()
+            except (OSError, AttributeError):
+                if self._backend_name == "inotify":
+                    raise
+        return _PollingBackend(self._interval, self._accepts)
+
+    def _add_root(self, backend: _InotifyBackend | _PollingBackend, directory: Path) -> None:
         if not directory.exists():
-            return []
-        return (p for p in directory.rglob("*") if p.is_file())
+            return
+        try:
+            backend.add_root(directory)
+        except OSError:
+            # e.g. inotify watch limit reached: keep watching, just by polling
+            if isinstance(backend, _PollingBackend):
+                raise
+            backend.close()
+            self._backend = _PollingBackend(self._interval, self._accepts)
+            for d in self._dirs:
+                if d.exists():
+                    self._backend.add_root(d)
+            return
+        if self._report_existing:
+            now = time.monotonic()
+            for p, _st in _iter_files(directory):
+                self._push(CREATED, p, None, now)
+
+    def _idle_timeout(self) -> float:
+        return self.IDLE_TIMEOUT_SEC if isinstance(self._backend, _InotifyBackend) else self._interval
+
+    def _accepts(self, path: Path) -> bool:
+        return self._manager.get_processor_for(path) is not None
+
+    def _push(self, kind: str, path: Path, src: Optional[Path], now: float) -> None:
+        if kind == _RESCAN:
+            # Kernel queue overflowed: report everything as possibly modified
+            for d in self._dirs:
+                for p, _st in _iter_files(d):
+                    if self._accepts(p):
+                        self._coalescer.push(MODIFIED, p, None, now)
+            return
+        if kind == MOVED and src is not None:
+            src_ok, dst_ok = self._accepts(src), self._accepts(path)
+            if src_ok and dst_ok:
+                self._coalescer.push(MOVED, path, src, now)
+            elif src_ok:
+                self._coalescer.push(DELETED, src, None, now)
+            elif dst_ok:
+                self._coalescer.push(CREATED, path, None, now)
+            return
+        if self._accepts(path):
+            self._coalescer.push(kind, path, None, now)
 
+    def _dispatch(
+        self,
+        evt: FileChanged,
+        on_created: Optional[Callable[[Path], None]],
+        on_event: Optional[Callable[[FileChanged], None]],
+    ) -> None:
+        # Callback exceptions are swallowed to keep watcher alive
+        if self._bus is not None:
+            self._bus.publish(evt)
+        try:
+            if on_event is not None:
+                on_event(evt)
+            if on_created is not None and evt.kind == CREATED:
+                on_created(Path(evt.path))
+        except Exception:
+            pass
@@ -5,6 +5,8 @@ from .events import (
     DocumentOpened,
     WindowClosed,
     IndexingProgress,
+    IndexUpdated,
+    FileChanged,
 )
 
 __all__ = [
@@ -14,5 +16,7 @@ __all__ = [
     "DocumentOpened",
     "WindowClosed",
     "IndexingProgress",
+    "IndexUpdated",
+    "FileChanged",
 ]
 
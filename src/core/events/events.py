@@ -32,3 +32,15 @@ class IndexingProgress(AppEvent):
     processed: int
     failed: int = 0
 
+
+@dataclass(slots=True)
+class IndexUpdated(AppEvent):
+    index_name: str
+    documents: int
+
+
+@dataclass(slots=True)
+class FileChanged(AppEvent):
+    kind: str  # created | modified | deleted | moved
+    path: str
+    src_path: Optional[str] = None  # previous location for "moved"
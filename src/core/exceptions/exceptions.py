@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Dict
 
 
 class PDFSearchException(Exception):
@@ -18,3 +19,15 @@ class DocumentProcessingError(PDFSearchException):
 class SearchError(PDFSearchException):
     """Raised for search and query processing failures."""
 
+
+
+class BulkIndexError(PDFSearchException):
+    """Raised when Elasticsearch rejects records of a `_bulk` request.
+
+    `failed` maps each affected document id to the first error reported for it;
+    the other documents of the request were indexed.
+    """
+
+    def __init__(self, failed: Dict[str, str]) -> None:
+        super().__init__(f"Elasticsearch rejected {len(failed)} document(s)")
+        self.failed = failed
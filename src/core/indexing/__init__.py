@@ -1,3 +1,15 @@
-from .index_manager import IndexManager, IndexSettings
+from .chunking import Chunk, ChunkSettings, chunk_document, iter_chunks
+from .index_manager import IndexManager, IndexRunReport, IndexSettings
+from .reencoder import ReEncoder, ReEncodeSettings
 
-__all__ = ["IndexManager", "IndexSettings"]
+__all__ = [
+    "Chunk",
+    "ChunkSettings",
+    "IndexManager",
+    "IndexRunReport",
+    "IndexSettings",
+    "ReEncoder",
+    "ReEncodeSettings",
+    "chunk_document",
+    "iter_chunks",
+]
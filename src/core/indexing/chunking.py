@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterator, List
+
+from src.core.documents.models import DocumentContent, PageContent
+from src.core.performance.text_processing import split_tokens_ws
+
+
+@dataclass(slots=True)
+class ChunkSettings:
+    # all-MiniLM-L6-v2 truncates at 256 word pieces; ~160 words stays under that
+    max_tokens: int = 160
+    overlap_tokens: int = 32
+
+    def __post_init__(self) -> None:
+        if self.max_tokens <= 0:
+            raise ValueError("max_tokens must be > 0")
+        if not (0 <= self.overlap_tokens < self.max_tokens):
+            raise ValueError("overlap_tokens must be in [0, max_tokens)")
+
+
+@dataclass(slots=True)
+class Chunk:
+    document_id: str
+    page_number: int
+    chunk_index: int  # position within the page
+    text: str
+    token_start: int = 0
+
+    @property
+    def chunk_id(self) -> str:
+        return f"{self.document_id}#p{self.page_number}c{self.chunk_index}"
+
+
+def chunk_page(document_id: str, page: PageContent, settings: ChunkSettings) -> Iterator[Chunk]:
+    """Split one page into overlapping whitespace-token windows."""
+    tokens = split_tokens_ws(page.text.encode("utf-8"))
+    if not tokens:
+        return
+    stride = settings.max_tokens - settings.overlap_tokens
+    idx = 0
+    start = 0
+    while True:
+        window = tokens[start : start + settings.max_tokens]
+        yield Chunk(document_id, page.page_number, idx, " ".join(window), start)
+        if start + settings.max_tokens >= len(tokens):
+            return
+        start += stride
+        idx += 1
+
+
+def embedding_input(title: str, text: str) -> str:
+    """Text actually embedded for a chunk.
+
+    Titles prefix the chunk text so short chunks still carry document context.
+    """
+    return f"{title}\n{text}"
+
+
+def chunk_document(doc: DocumentContent, settings: ChunkSettings | None = None) -> List[Chunk]:
+    return list(iter_chunks(doc, settings))
+
+
+def iter_chunks(doc: DocumentContent, settings: ChunkSettings | None = None) -> Iterator[Chunk]:
+    """Chunk every page of a document in order.
+
+    A document without any text yields one empty chunk so it stays findable by title.
+    """
+    cfg = settings or ChunkSettings()
+    document_id = str(doc.file_path)
+    produced = False
+    for page in doc.pages:
+        for chunk in chunk_page(document_id, page, cfg):
+            produced = True
+            yield chunk
+    if not produced:
+        yield Chunk(document_id, 0, 0, "")
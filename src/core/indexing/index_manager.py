@@ -1,86 +1,450 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Container, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 import os
+import time
+from pathlib import Path
+import numpy as np
 from cross_ide_path_utils import PathResolver
-from src.core.documents.models import DocumentContent
+from src.core.documents.manager import DocumentManager
+from src.core.documents.manifest import ManifestEntry, ManifestStore
+from src.core.documents.models import DocumentContent, PageContent, PageStream
+from src.core.indexing.chunking import Chunk, ChunkSettings, chunk_page, embedding_input, iter_chunks
+from src.core.events.bus import EventBus
+from src.core.events.events import IndexUpdated
+from src.core.exceptions.exceptions import BulkIndexError, DocumentProcessingError
 from src.core.models.configuration import ApplicationConfig
+from src.core.search.local_index import LocalIndex
+from src.core.search.vector_store import EmbeddingStore
+from src.core.search.vocabulary import Vocabulary
 
 
 @dataclass(slots=True)
 class IndexSettings:
     index_name: str = "documents"
     embedding_dim: int = 384  # all-MiniLM-L6-v2
+    chunking: ChunkSettings = field(default_factory=ChunkSettings)
+
+
+@dataclass(slots=True)
+class IndexRunReport:
+    indexed: List[str] = field(default_factory=list)
+    skipped: int = 0  # unchanged per the manifest: neither extracted nor embedded
+    failed: Dict[str, str] = field(default_factory=dict)  # path -> error
+    removed: List[str] = field(default_factory=list)  # vanished files dropped from every index
 
 
 class IndexManager:
     """Elasticsearch indexing manager with semantic embeddings.
 
     - Lazily imports heavy deps (elasticsearch, sentence_transformers, joblib).
-    - Provides index creation with dense_vector mapping and bulk indexing.
+    - Provides index creation with dense_vector mapping and bulk indexing; bulk
+      indexing streams documents in batches of `indexing_batch_size` with one
+      `model.encode` call and one `_bulk` request per batch.
+    - Each document is split into page-level token windows (`ChunkSettings`) and
+      indexed as one record per chunk, carrying its page number and embedding.
+      Chunks are overwritten by id and stamped with an `index_generation`; chunks of
+      an earlier generation (a re-indexed document that shrank) are deleted only
+      after the new ones were accepted, and never for documents new to the index.
+    - Optionally mirrors every embedding into an `EmbeddingStore` so semantic search
+      can score against pre-computed vectors instead of re-encoding candidates.
+    - Optionally feeds page text into a `Vocabulary` used for spelling suggestions.
+    - `index_paths` consults a `ManifestStore` so unchanged files (same content,
+      processor version and model) skip extraction and embedding.
+    - Optionally mirrors chunk payloads (without embeddings) into a `LocalIndex`; with
+      `exact_search_backend="local"` Elasticsearch is not contacted at all.
     """
 
+    MODEL_NAME = "all-MiniLM-L6-v2"  # default; recorded in manifests, a change re-embeds everything
+
     def __init__(
         self,
         resolver: Optional[PathResolver] = None,
         es_client: Optional[Any] = None,
         settings: Optional[IndexSettings] = None,
         config: Optional[ApplicationConfig] = None,
+        vector_store: Optional[EmbeddingStore] = None,
+        event_bus: Optional[EventBus] = None,
+        vocabulary: Optional[Vocabulary] = None,
+        local_index: Optional[LocalIndex] = None,
     ) -> None:
         self._resolver = resolver or PathResolver()
         self._es = es_client  # Can be provided/mocked for tests
         self._settings = settings or IndexSettings()
         self._model: Optional[Any] = None
         self._config = config
+        self._store = vector_store
+        self._bus = event_bus
+        self._vocab = vocabulary
+        self._local = local_index
 
     # ---- Public API ----
+    @property
+    def model_name(self) -> str:
+        """Embedding model from `search_settings` (see `ReEncoder` for switching models)."""
+        if self._config is not None:
+            return self._config.search_settings.embedding_model
+        return self.MODEL_NAME
+
+    def use_vector_store(self, store: Optional[EmbeddingStore], model: Optional[Any] = None) -> None:
+        """Mirror future embeddings into `store`, encoding them with `model` if given."""
+        if model is not None:
+            self._model = model
+        self._store = store
+
     def ensure_index(self) -> None:
+        if not self._uses_es():
+            return
         es = self._get_es()
         idx = self._settings.index_name
         if not es.indices.exists(index=idx):  # type: ignore[attr-defined]
             es.indices.create(index=idx, body=self._index_schema())  # type: ignore[attr-defined]
 
-    def index_document(self, doc: DocumentContent) -> Dict[str, Any]:
-        es = self._get_es()
-        payload = self._to_document_payload(doc)
-        es.index(index=self._settings.index_name, document=payload)  # type: ignore[attr-defined]
-        return payload
+    def index_document(self, doc: DocumentContent) -> List[Dict[str, Any]]:
+        """Index one document; returns one payload per chunk."""
+        return self._index_batch([doc])
 
-    def bulk_index(self, docs: Sequence[DocumentContent], parallel: bool = False, n_jobs: int = 2) -> List[Dict[str, Any]]:
-        if not docs:
-            return []
+    def bulk_index(
+        self,
+        docs: Iterable[DocumentContent],
+        parallel: bool = False,
+        n_jobs: int = 2,
+        batch_size: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Index documents in batches: one encode and one `_bulk` request per batch.
+
+        Returns one payload per indexed chunk, in document order. Raises
+        `BulkIndexError` if Elasticsearch rejected any chunk.
+
+        `docs` may be any iterable (e.g. a generator over extracted files); only one
+        batch per worker is held in memory. With `parallel=True` batches are processed
+        on `n_jobs` threads.
+        """
+        size = int(batch_size or self._default_batch_size())
+        batches = self._batched(docs, size)
         if parallel:
             jobs = self._get_joblib()
-            processed: List[Dict[str, Any]] = jobs["Parallel"](n_jobs=n_jobs)(
-                jobs["delayed"](self.index_document)(d) for d in docs
+            processed: List[List[Dict[str, Any]]] = jobs["Parallel"](n_jobs=n_jobs, prefer="threads")(
+                jobs["delayed"](self._index_batch)(b) for b in batches
+            )
+            return [p for batch in processed for p in batch]
+        out: List[Dict[str, Any]] = []
+        for batch in batches:
+            out.extend(self._index_batch(batch))
+        return out
+
+    def index_paths(
+        self,
+        paths: Iterable[Path],
+        documents: DocumentManager,
+        manifest: Optional[ManifestStore] = None,
+        batch_size: Optional[int] = None,
+        stream_pages: int = 0,
+        prune: bool = False,
+    ) -> IndexRunReport:
+        """Extract and index the files among `paths` that changed since the last run.
+
+        Manifest entries are written only after their batch is indexed, so an
+        interrupted run re-does the unfinished files next time; documents
+        Elasticsearch rejected are reported as failed and retried next run too.
+
+        With `stream_pages > 0`, documents with more pages than that are read through
+        `DocumentManager.stream` and embedded and shipped `stream_pages` pages at a
+        time instead of being extracted whole.
+
+        Files among `paths` that no longer exist are deleted from every index and
+        from the manifest and listed in `report.removed`. With `prune=True`, `paths`
+        is taken as the whole corpus and manifest entries missing from it are
+        deleted the same way.
+        """
+        report = IndexRunReport()
+        fresh: Set[str] = set()
+        candidates = [Path(p) for p in paths if documents.get_processor_for(Path(p)) is not None]
+        if manifest is not None:
+            diff = manifest.diff(candidates, documents.processor_version, self.model_name)
+            todo: List[Optional[ManifestEntry]] = list(diff.changed)
+            todo_paths = [Path(e.path) for e in diff.changed]
+            # Never indexed before: nothing stale to delete after their bulk request
+            fresh.update(e.path for e in diff.changed if manifest.get(e.path) is None)
+            report.skipped = len(diff.unchanged)
+            vanished = [str(p) for p in diff.missing if not p.exists()]
+            report.failed.update({str(p): "unreadable" for p in diff.missing if p.exists()})
+            if prune:
+                vanished.extend(manifest.stale_paths(candidates))
+            report.removed = self._remove_paths(vanished, manifest)
+        else:
+            todo, todo_paths = [None] * len(candidates), candidates
+        size = int(batch_size or self._default_batch_size())
+        for start in range(0, len(todo_paths), max(1, size)):
+            docs: List[DocumentContent] = []
+            done: List[ManifestEntry] = []
+            for path, entry in zip(todo_paths[start : start + size], todo[start : start + size]):
+                try:
+                    if stream_pages > 0:
+                        stream = documents.stream(path)
+                        if stream.page_count is not None and stream.page_count > stream_pages:
+                            self._index_stream(stream, stream_pages, fresh=fresh)
+                            report.indexed.append(str(stream.header.file_path))
+                        else:
+                            docs.append(stream.collect())
+                    else:
+                        docs.append(documents.process(path))
+                except DocumentProcessingError as exc:
+                    report.failed[str(path)] = str(exc)
+                    continue
+                except BulkIndexError as exc:
+                    report.failed.update(exc.failed)
+                    continue
+                if entry is not None:
+                    done.append(entry)
+            rejected: Dict[str, str] = {}
+            try:
+                self._index_batch(docs, fresh=fresh)
+            except BulkIndexError as exc:
+                rejected = exc.failed
+                report.failed.update(rejected)
+            report.indexed.extend(str(d.file_path) for d in docs if str(d.file_path) not in rejected)
+            if manifest is not None:
+                manifest.upsert(e for e in done if e.path not in rejected)
+        return report
+
+    def _remove_paths(self, paths: Sequence[str], manifest: ManifestStore) -> List[str]:
+        size = max(1, self._default_batch_size())
+        for start in range(0, len(paths), size):
+            batch = paths[start : start + size]
+            self._remove_documents(batch)
+            manifest.remove(batch)
+        if self._local is not None and paths:
+            self._local.commit()
+        self._publish_updated(len(paths))
+        return list(paths)
+
+    def save_vector_store(self, directory: Optional[Path] = None) -> Optional[Path]:
+        """Persist the attached vector store (defaults to `cache/embeddings`)."""
+        if self._store is None:
+            return None
+        target = directory or self._resolver.get_cache_path("embeddings")
+        self._store.save(target)
+        return target
+
+    def save_vocabulary(self, path: Optional[Path] = None) -> Optional[Path]:
+        """Persist the attached vocabulary (defaults to `cache/vocabulary.json`)."""
+        if self._vocab is None:
+            return None
+        target = path or self._resolver.get_cache_path("vocabulary.json")
+        self._vocab.save(target)
+        return target
+
+    # ---- Batching ----
+    def _index_batch(self, docs: Sequence[DocumentContent], fresh: Container[str] = ()) -> List[Dict[str, Any]]:
+        if not docs:
+            return []
+        pairs = [(d, c) for d in docs for c in iter_chunks(d, self._settings.chunking)]
+        doc_ids = sorted({c.document_id for _, c in pairs})
+        self._drop_local(doc_ids)
+        generation = time.time_ns()
+        rejected: Dict[str, str] = {}
+        payloads = self._index_chunks(pairs, rejected=rejected, generation=generation)
+        self._purge_stale([d for d in doc_ids if d not in rejected and d not in fresh], generation)
+        for doc in docs:
+            self._add_vocabulary(str(doc.file_path), doc.title, doc.pages)
+        self._publish_updated(len(docs))
+        if rejected:
+            raise BulkIndexError(rejected)
+        return payloads
+
+    def _index_stream(self, stream: PageStream, pages_per_batch: int, fresh: Container[str] = ()) -> int:
+        """Index one document `pages_per_batch` pages at a time; returns the chunk count.
+
+        Only the current window of pages (and its chunks and vectors) is held in memory.
+        """
+        head = stream.header
+        doc_id = str(head.file_path)
+        page_count = int(stream.page_count or 0)
+        self._drop_local([doc_id])
+        self._add_vocabulary(doc_id, head.title, ())
+        generation = time.time_ns()
+        total = 0
+        rejected: Dict[str, str] = {}
+        pages = iter(stream.pages)
+        while True:
+            window = list(islice(pages, max(1, pages_per_batch)))
+            if not window:
+                break
+            part = DocumentContent(file_path=head.file_path, title=head.title, pages=window, metadata=head.metadata)
+            pairs = [(part, c) for page in window for c in chunk_page(doc_id, page, self._settings.chunking)]
+            total += len(self._index_chunks(pairs, page_count, rejected, generation))
+            self._add_vocabulary(doc_id, None, window)
+        if total == 0:
+            # Same placeholder as `iter_chunks`: keeps a text-less document findable by title
+            total = len(self._index_chunks([(head, Chunk(doc_id, 0, 0, ""))], page_count, rejected, generation))
+        if doc_id not in rejected and doc_id not in fresh:
+            self._purge_stale([doc_id], generation)
+        self._publish_updated(1)
+        if rejected:
+            raise BulkIndexError(rejected)
+        return total
+
+    def _index_chunks(
+        self,
+        pairs: Sequence[Tuple[DocumentContent, Chunk]],
+        page_count: Optional[int] = None,
+        rejected: Optional[Dict[str, str]] = None,
+        generation: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Embed chunks in one call and ship them to every attached backend.
+
+        Documents with chunks Elasticsearch rejected are added to `rejected`.
+        """
+        if not pairs:
+            return []
+        vectors = self._embed([embedding_input(d.title, c.text) for d, c in pairs])
+        payloads = [self._build_payload(d, c, v, page_count, generation) for (d, c), v in zip(pairs, vectors)]
+        operations: List[Dict[str, Any]] = []
+        for (_, chunk), payload in zip(pairs, payloads):
+            # Deterministic ids make re-indexing a document overwrite its chunks
+            operations.append({"index": {"_index": self._settings.index_name, "_id": chunk.chunk_id}})
+            operations.append(payload)
+        if self._uses_es():
+            resp = self._get_es().bulk(operations=operations)  # type: ignore[attr-defined]
+            if rejected is not None:
+                rejected.update(self._bulk_failures(resp, pairs))
+        if self._local is not None:
+            self._local.add((c.chunk_id, p) for (_, c), p in zip(pairs, payloads))
+            self._local.commit()
+        if self._store is not None:
+            keys = [(c.document_id, c.page_number, c.chunk_index) for _, c in pairs]
+            self._store.add_many(keys, vectors, [c.text for _, c in pairs])
+        return payloads
+
+    def _remove_documents(self, doc_ids: Iterable[str]) -> None:
+        """Drop every chunk of deleted documents from all backends."""
+        ids = sorted(set(doc_ids))
+        if not ids:
+            return
+        self._drop_local(ids)
+        self._delete_by_query({"terms": {"document_id": ids}})
+
+    def _drop_local(self, doc_ids: Sequence[str]) -> None:
+        """Forget `doc_ids` in the in-process backends (before re-indexing, or on deletion)."""
+        for doc_id in doc_ids:
+            if self._local is not None:
+                self._local.remove(doc_id)
+            if self._store is not None:
+                self._store.remove(doc_id)
+            if self._vocab is not None:
+                self._vocab.discard_document(doc_id)
+
+    def _purge_stale(self, doc_ids: Sequence[str], generation: int) -> None:
+        """Delete chunks of re-indexed `doc_ids` left over from an earlier generation."""
+        if doc_ids:
+            self._delete_by_query(
+                {
+                    "bool": {
+                        "filter": [{"terms": {"document_id": list(doc_ids)}}],
+                        "must_not": [{"term": {"index_generation": generation}}],
+                    }
+                }
             )
-            return list(processed)
-        return [self.index_document(d) for d in docs]
+
+    def _delete_by_query(self, query: Dict[str, Any]) -> None:
+        if self._uses_es():
+            self._get_es().delete_by_query(  # type: ignore[attr-defined]
+                index=self._settings.index_name,
+                query=query,
+                conflicts="proceed",
+                ignore_unavailable=True,
+            )
+
+    def _add_vocabulary(self, doc_id: str, title: Optional[str], pages: Iterable[PageContent]) -> None:
+        if self._vocab is None:
+            return
+        # Whole pages, not chunks: overlapping windows would double-count terms.
+        # Counted under the document id so re-indexing or removal can subtract them
+        if title:
+            self._vocab.add_text(title, document_id=doc_id)
+        for page in pages:
+            self._vocab.add_text(page.text, document_id=doc_id)
+
+    def _default_batch_size(self) -> int:
+        if self._config is not None:
+            return max(1, int(self._config.performance_settings.indexing_batch_size))
+        return 100
+
+    @staticmethod
+    def _batched(docs: Iterable[DocumentContent], size: int) -> Iterator[List[DocumentContent]]:
+        it = iter(docs)
+        while True:
+            batch = list(islice(it, max(1, size)))
+            if not batch:
+                return
+            yield batch
 
     # ---- Helpers ----
-    def _to_document_payload(self, doc: DocumentContent) -> Dict[str, Any]:
-        text = "\n".join(p.text for p in doc.pages)
-        embedding = self._embed([text])[0]
+    def _uses_es(self) -> bool:
+        return self._config is None or self._config.search_settings.exact_search_backend != "local"
+
+    @staticmethod
+    def _bulk_failures(resp: Any, pairs: Sequence[Tuple[DocumentContent, Chunk]]) -> Dict[str, str]:
+        """Document id -> first error for the items of a `_bulk` response that failed."""
+        # `_bulk` answers HTTP 200 even when items fail; only `errors` tells
+        if not resp or not resp.get("errors"):
+            return {}
+        doc_of = {c.chunk_id: c.document_id for _, c in pairs}
+        failed: Dict[str, str] = {}
+        for item in resp.get("items", []):
+            result = next(iter(item.values()), {})
+            if result.get("error") is None and int(result.get("status", 200)) < 300:
+                continue
+            doc_id = doc_of.get(result.get("_id"))
+            if doc_id is not None:
+                error = result.get("error") or {}
+                reason = error.get("reason", error) if isinstance(error, dict) else error
+                failed.setdefault(doc_id, f"Elasticsearch rejected chunk {result.get('_id')}: {reason}")
+        return failed
+
+    def _publish_updated(self, documents: int) -> None:
+        # Lets SearchManager drop cached results that may now be stale
+        if self._bus is not None and documents > 0:
+            self._bus.publish(IndexUpdated(index_name=self._settings.index_name, documents=documents))
+
+    @staticmethod
+    def _build_payload(
+        doc: DocumentContent,
+        chunk: Chunk,
+        embedding: np.ndarray,
+        page_count: Optional[int] = None,
+        generation: int = 0,
+    ) -> Dict[str, Any]:
         return {
+            "document_id": chunk.document_id,
             "title": doc.title,
             "file_path": str(doc.file_path),
-            "page_count": len(doc.pages),
-            "content": text,
+            "page_number": chunk.page_number,
+            "chunk_index": chunk.chunk_index,
+            "page_count": len(doc.pages) if page_count is None else page_count,
+            "content": chunk.text,
             "metadata": doc.metadata,
-            "embedding": embedding,
+            "index_generation": generation,
+            "embedding": embedding.tolist(),
         }
 
     def _index_schema(self) -> Dict[str, Any]:
         return {
             "mappings": {
                 "properties": {
+                    "document_id": {"type": "keyword"},
                     "title": {"type": "text"},
                     "file_path": {"type": "keyword"},
+                    "page_number": {"type": "integer"},
+                    "chunk_index": {"type": "integer"},
                     "page_count": {"type": "integer"},
                     "content": {"type": "text"},
                     "metadata": {"type": "object", "enabled": True},
+                    "index_generation": {"type": "long"},
                     "embedding": {
                         "type": "dense_vector",
                         "dims": int(self._settings.embedding_dim),
@@ -91,11 +455,12 @@ class IndexManager:
         }
 
     # ---- Embeddings ----
-    def _embed(self, texts: Sequence[str]) -> List[List[float]]:
+    def _embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode texts in one call; returns an (N, D) float32 matrix."""
         model = self._get_model()
         # normalize_embeddings yields unit vectors suitable for cosine similarity
         vecs = model.encode(list(texts), normalize_embeddings=True)
-        return [list(map(float, v)) for v in vecs]
+        return np.asarray(vecs, dtype=np.float32).reshape(len(texts), -1)
 
     # ---- Lazy deps ----
     def _get_es(self) -> Any:
@@ -118,7 +483,7 @@ class IndexManager:
         from sentence_transformers import SentenceTransformer  # type: ignore
 
         # Mandatory model name per requirements
-        self._model = SentenceTransformer("all-MiniLM-L6-v2")
+        self._model = SentenceTransformer(self.model_name)
         return self._model
 
     @staticmethod
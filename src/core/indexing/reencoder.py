@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from cross_ide_path_utils import PathResolver
+from src.core.documents.hashing import content_hash
+from src.core.documents.manager import DocumentManager
+from src.core.documents.manifest import ManifestEntry, ManifestStore
+from src.core.documents.models import DocumentContent
+from src.core.events.bus import EventBus
+from src.core.events.events import IndexUpdated
+from src.core.exceptions.exceptions import DocumentProcessingError
+from src.core.indexing.chunking import ChunkSettings, embedding_input, iter_chunks
+from src.core.models.configuration import ApplicationConfig
+from src.core.models.service import ReEncodingResult
+from src.core.search.segments import read_manifest
+from src.core.search.vector_store import EmbeddingStore
+
+
+ProgressCallback = Callable[[ReEncodingResult], None]
+SwapCallback = Callable[[EmbeddingStore, Any], None]
+
+
+@dataclass(slots=True)
+class ReEncodeSettings:
+    batch_size: int = 512  # chunks per `model.encode` call
+    checkpoint_interval_sec: float = 30.0  # shadow store save + progress file
+    keep_previous: bool = True  # keep the replaced store as `<dir>.previous`
+
+    def __post_init__(self) -> None:
+        if self.batch_size <= 0:
+            raise ValueError("batch_size must be > 0")
+
+
+@dataclass(slots=True)
+class _Pending:
+    """Chunks queued for the next encode call and the documents they complete."""
+
+    keys: List[Tuple[str, int, int]]
+    texts: List[str]
+    snippets: List[str]
+    completes: List[ManifestEntry]
+
+
+class ReEncoder:
+    """Re-embeds every indexed chunk with `search_settings.embedding_model`.
+
+    - Chunk texts are rebuilt from the `ExtractionCache` through manifest entries
+      (`DocumentManager.from_cache`), so original files are normally never opened.
+      A document missing from the cache (no cache, or an evicted blob) is extracted
+      again if its file still has the indexed content, and reported as failed
+      otherwise. While any current document has failed the store is not swapped:
+      the run returns an incomplete result, keeps the shadow for the next run and
+      leaves the live store in place.
+    - Vectors go to a shadow store next to the live one (`<dir>.reencode`); search
+      keeps serving the live store. Every `checkpoint_interval_sec` the shadow store
+      is saved (an append-only segment, see `EmbeddingStore.save`) together with
+      `reencode.json`, which lists finished documents by content hash, so a crashed
+      or cancelled run resumes where it stopped. Targeting a different model discards
+      the shadow and starts over.
+    - Documents added or changed while the job runs are picked up before it ends.
+      Once everything is encoded the shadow directory replaces the live one by
+      rename (the old one is kept as `<dir>.previous`), manifest entries are moved
+      to the new model, and `on_swap` receives the new store and model.
+    - `ReEncodingResult.estimated_time_remaining` is extrapolated from the
+      documents/second measured in the current run.
+
+    Only the local `EmbeddingStore` is re-encoded; vectors inside Elasticsearch
+    documents are refreshed by re-indexing.
+    """
+
+    CHECKPOINT_FILE = "reencode.json"
+
+    def __init__(
+        self,
+        manifest: ManifestStore,
+        documents: DocumentManager,
+        store_dir: Optional[Path] = None,
+        config: Optional[ApplicationConfig] = None,
+        model: Optional[Any] = None,
+        settings: Optional[ReEncodeSettings] = None,
+        chunking: Optional[ChunkSettings] = None,
+        event_bus: Optional[EventBus] = None,
+    ) -> None:
+        self._manifest = manifest
+        self._documents = documents
+        self._live = Path(store_dir) if store_dir is not None else PathResolver().get_cache_path("embeddings")
+        self._shadow = self._live.with_name(f"{self._live.name}.reencode")
+        self._previous = self._live.with_name(f"{self._live.name}.previous")
+        self._config = config or ApplicationConfig()
+        self._model = model
+        self._settings = settings or ReEncodeSettings()
+        self._chunking = chunking or ChunkSettings()
+        self._bus = event_bus
+        self._cancel = threading.Event()
+
+    @property
+    def new_model(self) -> str:
+        return self._config.search_settings.embedding_model
+
+    @property
+    def shadow_dir(self) -> Path:
+        return self._shadow
+
+    def cancel(self) -> None:
+        """Stop after the current batch; progress is checkpointed and `run` returns."""
+        self._cancel.set()
+
+    # ---------- Run ----------
+    def run(
+        self,
+        progress: Optional[ProgressCallback] = None,
+        on_swap: Optional[SwapCallback] = None,
+    ) -> ReEncodingResult:
+        self._cancel.clear()
+        new_model = self.new_model
+        self._recover_swap()
+        state = self._read_checkpoint(self._shadow)
+        if state is None or state.get("new_model") != new_model:
+            shutil.rmtree(self._shadow, ignore_errors=True)
+            state = None
+        entries = self._manifest.entries()
+        if state is None and entries and all(e.model_name == new_model for e in entries.values()):
+            # Nothing recorded with another model: already encoded with the target
+            return self._result(entries, {k: e.content_hash for k, e in entries.items()}, {}, "", 0, 0.0, True)
+
+        done: Dict[str, str] = dict(state["done"]) if state else {}
+        old_model = state["old_model"] if state else self._dominant_model(entries, new_model)
+        elapsed_before = float(state.get("elapsed_sec", 0.0)) if state else 0.0
+        failed: Dict[str, str] = {}  # retried on every run
+        shadow = EmbeddingStore.load(self._shadow) if read_manifest(self._shadow) is not None else None
+
+        started = last_checkpoint = time.monotonic()
+        processed = 0  # documents finished in this run, for the throughput estimate
+
+        def checkpoint(status: str = "running") -> None:
+            nonlocal last_checkpoint
+            if shadow is not None:
+                shadow.save(self._shadow)
+                shadow.wait_for_merges()
+            elapsed = elapsed_before + time.monotonic() - started
+            self._write_checkpoint(
+                {"state": status, "old_model": old_model, "new_model": new_model, "done": done, "elapsed_sec": elapsed}
+            )
+            last_checkpoint = time.monotonic()
+
+        def report(complete: bool = False) -> ReEncodingResult:
+            result = self._result(entries, done, failed, old_model, processed, time.monotonic() - started, complete)
+            if progress is not None:
+                progress(result)
+            return result
+
+        batch = _Pending([], [], [], [])
+
+        def flush() -> None:
+            nonlocal shadow, processed
+            if batch.keys:
+                vectors = self._encode(batch.texts)
+                if shadow is None:
+                    shadow = EmbeddingStore(dim=vectors.shape[1])
+                shadow.add_many(batch.keys, vectors, batch.snippets)
+            for entry in batch.completes:
+                done[entry.path] = entry.content_hash
+            processed += len(batch.completes)
+            batch.keys, batch.texts, batch.snippets, batch.completes = [], [], [], []
+            report()
+            if time.monotonic() - last_checkpoint >= self._settings.checkpoint_interval_sec:
+                checkpoint()
+
+        while True:
+            pending = [entries[k] for k in sorted(entries) if done.get(k) != entries[k].content_hash and k not in failed]
+            if not pending:
+                break
+            for entry in pending:
+                if self._cancel.is_set():
+                    flush()
+                    checkpoint()
+                    return report()
+                doc, error = self._load_text(entry)
+                if doc is None:
+                    failed[entry.path] = error
+                    continue
+                if shadow is not None:
+                    shadow.remove(str(doc.file_path))  # chunks of a previous version or partial run
+                for chunk in iter_chunks(doc, self._chunking):
+                    if len(batch.keys) >= self._settings.batch_size:
+                        flush()  # a long document may span several batches
+                    batch.keys.append((chunk.document_id, chunk.page_number, chunk.chunk_index))
+                    batch.texts.append(embedding_input(doc.title, chunk.text))
+                    batch.snippets.append(chunk.text)
+                batch.completes.append(entry)
+            flush()
+            # Pick up documents indexed or changed while this pass ran
+            entries = self._manifest.entries()
+
+        for path in [p for p in done if p not in entries]:
+            # Deleted since they were re-encoded
+            if shadow is not None:
+                shadow.remove(str(Path(path)))
+            del done[path]
+        if any(k in entries for k in failed):
+            # Swapping now would drop these documents' vectors from the live store
+            checkpoint()
+            return report()
+        if shadow is None:
+            shadow = EmbeddingStore(dim=self._encode([""]).shape[1])
+        checkpoint("ready")
+        self._swap()
+        self._finish(done, new_model)
+        store = EmbeddingStore.load(self._live)
+        if on_swap is not None:
+            on_swap(store, self._get_model())
+        if self._bus is not None:
+            self._bus.publish(IndexUpdated(index_name="embeddings", documents=len(done)))
+        return report(complete=True)
+
+    # ---------- Swap ----------
+    def _swap(self) -> None:
+        """Replace the live directory with the shadow one (two renames, resumable)."""
+        if self._shadow.exists():
+            if self._live.exists():
+                shutil.rmtree(self._previous, ignore_errors=True)
+                os.replace(self._live, self._previous)
+            os.replace(self._shadow, self._live)
+        if not self._settings.keep_previous:
+            shutil.rmtree(self._previous, ignore_errors=True)
+
+    def _finish(self, done: Dict[str, str], new_model: str) -> None:
+        # Only entries whose encoded content is still current move to the new model;
+        # anything re-indexed with the old model meanwhile is re-embedded later
+        current = self._manifest.entries()
+        self._manifest.upsert(
+            replace(e, model_name=new_model) for k, e in current.items() if done.get(k) == e.content_hash
+        )
+        (self._live / self.CHECKPOINT_FILE).unlink(missing_ok=True)
+
+    def _recover_swap(self) -> None:
+        """Complete a swap interrupted between the checkpoint and the manifest update."""
+        for directory in (self._shadow, self._live):
+            state = self._read_checkpoint(directory)
+            if state is not None and state.get("state") == "ready":
+                self._swap()
+                self._finish(dict(state["done"]), str(state["new_model"]))
+                return
+
+    # ---------- Helpers ----------
+    def _load_text(self, entry: ManifestEntry) -> Tuple[Optional[DocumentContent], str]:
+        """Document text for `entry`: cached, else re-extracted if the file is unchanged."""
+        path = Path(entry.path)
+        doc = self._documents.from_cache(path, entry.content_hash, entry.processor_version)
+        if doc is not None:
+            return doc, ""
+        try:
+            if content_hash(path) != entry.content_hash:
+                return None, "changed since it was indexed; re-index it first"
+            return self._documents.process(path), ""
+        except OSError:
+            return None, "extracted text not cached and file unreadable"
+        except DocumentProcessingError as exc:
+            return None, str(exc)
+
+    def _result(
+        self,
+        entries: Dict[str, ManifestEntry],
+        done: Dict[str, str],
+        failed: Dict[str, str],
+        old_model: str,
+        processed: int,
+        elapsed: float,
+        complete: bool,
+    ) -> ReEncodingResult:
+        encoded = sum(1 for k, e in entries.items() if done.get(k) == e.content_hash)
+        failures = sum(1 for k in failed if k in entries)
+        remaining = max(0, len(entries) - encoded - failures)
+        eta: Optional[int] = 0 if remaining == 0 else None
+        if remaining and processed and elapsed > 0:
+            eta = int(round(remaining / (processed / elapsed)))
+        return ReEncodingResult(
+            total_documents=len(entries),
+            re_encoded_documents=encoded,
+            failed_documents=failures,
+            old_model=old_model,
+            new_model=self.new_model,
+            is_complete=complete,
+            estimated_time_remaining=eta,
+        )
+
+    @staticmethod
+    def _dominant_model(entries: Dict[str, ManifestEntry], new_model: str) -> str:
+        counts = Counter(e.model_name for e in entries.values() if e.model_name != new_model)
+        return counts.most_common(1)[0][0] if counts else ""
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        vecs = self._get_model().encode(list(texts), normalize_embeddings=True)
+        return np.asarray(vecs, dtype=np.float32).reshape(len(texts), -1)
+
+    def _get_model(self) -> Any:
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer  # type: ignore
+
+            self._model = SentenceTransformer(self.new_model)
+        return self._model
+
+    def _read_checkpoint(self, directory: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads((directory / self.CHECKPOINT_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _write_checkpoint(self, state: Dict[str, Any]) -> None:
+        self._shadow.mkdir(parents=True, exist_ok=True)
+        target = self._shadow / self.CHECKPOINT_FILE
+        tmp = target.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, target)
@@ -8,6 +8,7 @@ from typing import List, Optional
 class SearchSettings:
     fuzzy_edit_distance: int = 2
     fuzzy_accuracy_target: float = 0.8
+    fuzzy_workers: int = -1  # rapidfuzz cdist threads; -1 = all cores
     semantic_similarity_threshold: float = 0.7
     search_timeout_seconds: int = 2
     core_search_timeout_ms: int = 500
@@ -20,6 +21,20 @@ class SearchSettings:
     custom_model_path: Optional[str] = None
     enable_topic_hierarchy: bool = True
     topic_hierarchy_depth: int = 3
+    # "auto": local vector store if populated, else Elasticsearch kNN, else client-side encode
+    semantic_retrieval: str = "auto"  # auto | elasticsearch | local
+    knn_num_candidates: int = 100
+    hybrid_search: bool = False  # BM25 + kNN in one Elasticsearch request
+    fusion_method: str = "rrf"  # rrf | minmax | zscore | max
+    rrf_k: int = 60
+    cursor_leg_window: int = 500  # candidates cached per non-exact leg for cursor paging
+    # "auto": Elasticsearch, falling back to the embedded local index when ES fails
+    exact_search_backend: str = "auto"  # auto | elasticsearch | local
+
+    @property
+    def embedding_model(self) -> str:
+        """Model used to embed chunks and queries: `custom_model_path` wins over the name."""
+        return self.custom_model_path or self.current_model_name
 
 
 @dataclass(slots=True)
@@ -58,4 +73,10 @@ class ApplicationConfig:
             raise ValueError("max_memory_usage_gb must be positive")
         if self.search_settings.fuzzy_edit_distance < 0:
             raise ValueError("fuzzy_edit_distance must be >= 0")
+        if self.search_settings.semantic_retrieval not in ("auto", "elasticsearch", "local"):
+            raise ValueError("semantic_retrieval must be one of: auto, elasticsearch, local")
+        if self.search_settings.fusion_method not in ("rrf", "minmax", "zscore", "max"):
+            raise ValueError("fusion_method must be one of: rrf, minmax, zscore, max")
+        if self.search_settings.exact_search_backend not in ("auto", "elasticsearch", "local"):
+            raise ValueError("exact_search_backend must be one of: auto, elasticsearch, local")
 
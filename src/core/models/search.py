@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
 
 class MatchType(str, Enum):
@@ -21,12 +21,15 @@ class SearchResult:
     match_type: MatchType
     highlighted_text: str
     topic_path: Optional[str] = None  # e.g., "algorithms/trees/binary_trees"
+    offset: Optional[int] = None  # character offset of `snippet` within the page text, when known
 
     def __post_init__(self) -> None:
         if self.page_number < 0:
             raise ValueError("page_number must be >= 0")
         if not (0.0 <= self.relevance_score <= 1.0):
             raise ValueError("relevance_score must be in [0.0, 1.0]")
+        if self.offset is not None and self.offset < 0:
+            raise ValueError("offset must be >= 0")
         if self.topic_path is not None:
             self._validate_topic_path(self.topic_path)
 
@@ -39,3 +42,14 @@ class SearchResult:
         if not segments:
             raise ValueError("topic_path must contain at least one segment")
 
+
+@dataclass(slots=True)
+class SearchOutcome:
+    """Fused results plus which search legs (exact/fuzzy/semantic) missed their deadline."""
+
+    results: List[SearchResult] = field(default_factory=list)
+    timed_out_legs: List[str] = field(default_factory=list)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.timed_out_legs)
@@ -2,13 +2,23 @@ from .numba_ops import (
     cosine_similarity_np,
     cosine_similarity_numba,
     batch_cosine_parallel,
+    cosine_scores,
+    top_k_cosine,
+    top_k_indices,
     gpu_available,
 )
+from .lru_cache import LRUCache
+from .result_cache import CacheStats, ResultCache
 
 __all__ = [
     "cosine_similarity_np",
     "cosine_similarity_numba",
     "batch_cosine_parallel",
+    "cosine_scores",
+    "top_k_cosine",
+    "top_k_indices",
     "gpu_available",
+    "LRUCache",
+    "CacheStats",
+    "ResultCache",
 ]
-
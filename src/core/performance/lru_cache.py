@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from collections import OrderedDict
-from typing import Generic, Iterable, Iterator, MutableMapping, Optional, Tuple, TypeVar
+from typing import Callable, Generic, Iterable, Iterator, MutableMapping, Optional, Tuple, TypeVar
 
 
 K = TypeVar("K")
@@ -11,14 +11,16 @@ V = TypeVar("V")
 class LRUCache(Generic[K, V]):
     """Simple LRU cache with fixed capacity and O(1) operations.
 
-    Evicts the least-recently-used item when capacity is exceeded.
+    Evicts the least-recently-used item when capacity is exceeded; `on_evict` is
+    called with each evicted item.
     """
 
-    def __init__(self, capacity: int = 50) -> None:
+    def __init__(self, capacity: int = 50, on_evict: Optional[Callable[[K, V], None]] = None) -> None:
         if capacity <= 0:
             raise ValueError("capacity must be > 0")
         self._cap = int(capacity)
         self._data: "OrderedDict[K, V]" = OrderedDict()
+        self._on_evict = on_evict
 
     def __contains__(self, key: K) -> bool:  # pragma: no cover - trivial
         return key in self._data
@@ -37,7 +39,19 @@ class LRUCache(Generic[K, V]):
             self._data.move_to_end(key)
         self._data[key] = value
         if len(self._data) > self._cap:
-            self._data.popitem(last=False)
+            self.pop_lru()
+
+    def pop(self, key: K) -> Optional[V]:
+        return self._data.pop(key, None)
+
+    def pop_lru(self) -> Optional[Tuple[K, V]]:
+        """Evict and return the least-recently-used item (None when empty)."""
+        if not self._data:
+            return None
+        key, value = self._data.popitem(last=False)
+        if self._on_evict is not None:
+            self._on_evict(key, value)
+        return key, value
 
     def items(self) -> Iterator[Tuple[K, V]]:  # pragma: no cover - utility
         return iter(self._data.items())
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
 
 try:  # Numba is mandatory per requirements, but guard import for tests
     from numba import njit
@@ -30,9 +32,9 @@ def _cosine_numba(a, b) -> float:  # type: ignore[no-redef]
 
 
 def cosine_similarity_numba(a: Iterable[float], b: Iterable[float]) -> float:
-    va = [float(x) for x in a]
-    vb = [float(x) for x in b]
-    if len(va) != len(vb):
+    va = _as_vector(a)
+    vb = _as_vector(b)
+    if va.shape != vb.shape:
         raise ValueError("vector shapes must match")
     return float(_cosine_numba(va, vb))
 
@@ -57,14 +59,78 @@ def cosine_similarity_np(a: Iterable[float], b: Iterable[float]) -> float:
 
 
 def batch_cosine_parallel(vectors: List[Iterable[float]], query: Iterable[float], n_jobs: int = 2) -> List[float]:
-    try:
-        from joblib import Parallel, delayed  # type: ignore
+    """Cosine of every vector against `query` in one vectorised pass.
+
+    `n_jobs` is kept for API compatibility; the BLAS matrix-vector product already
+    uses all cores, which beats one joblib task per vector by orders of magnitude.
+    """
+    if not vectors:
+        return []
+    mat = np.ascontiguousarray(np.asarray([list(v) for v in vectors], dtype=np.float32))
+    return cosine_scores(mat, query).tolist()
+
+
+def cosine_scores(matrix: np.ndarray, query: Sequence[float], normalized: bool = False) -> np.ndarray:
+    """Cosine similarity of each row of an (N, D) matrix against `query`.
+
+    With `normalized=True` rows and query are assumed unit length and the result is
+    a single BLAS matrix-vector product.
+    """
+    mat = _as_matrix(matrix)
+    q = np.asarray(query, dtype=np.float32).reshape(-1)
+    if mat.shape[1] != q.shape[0]:
+        raise ValueError("vector shapes must match")
+    scores = mat @ q
+    if normalized:
+        return scores
+    q_norm = float(np.linalg.norm(q))
+    if q_norm == 0.0:
+        return np.zeros(mat.shape[0], dtype=np.float32)
+    row_norms = np.sqrt(np.einsum("ij,ij->i", mat, mat))
+    row_norms[row_norms == 0.0] = np.inf  # zero rows score 0
+    return scores / (row_norms * q_norm)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the `k` largest scores, best first (argpartition + sort of k)."""
+    n = int(scores.shape[0])
+    k = min(int(k), n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(n)
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def top_k_cosine(
+    matrix: np.ndarray,
+    query: Sequence[float],
+    k: int,
+    normalized: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Batched top-k cosine search over a contiguous (N, D) float32 matrix.
+
+    Returns `(indices, scores)` as NumPy arrays ordered by descending score, without
+    creating per-row Python objects.
+    """
+    scores = cosine_scores(matrix, query, normalized=normalized)
+    idx = top_k_indices(scores, k)
+    return idx, scores[idx]
+
+
+def _as_vector(v: Iterable[float]) -> np.ndarray:
+    if not isinstance(v, (np.ndarray, list, tuple)):
+        v = list(v)
+    return np.ascontiguousarray(v, dtype=np.float64).reshape(-1)
+
 
-        q = list(query)
-        return list(Parallel(n_jobs=n_jobs)(delayed(cosine_similarity_numba)(v, q) for v in vectors))
-    except Exception:  # Fallback to sequential if joblib missing
-        q = list(query)
-        return [cosine_similarity_numba(v, q) for v in vectors]
+def _as_matrix(m: np.ndarray) -> np.ndarray:
+    mat = np.asarray(m, dtype=np.float32)
+    if mat.ndim != 2:
+        raise ValueError("matrix must be 2-D (N, D)")
+    return np.ascontiguousarray(mat)
 
 
 def gpu_available() -> bool:
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+from src.core.performance.lru_cache import LRUCache
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass(slots=True)
+class _Entry(Generic[V]):
+    value: V
+    expires_at: float
+    nbytes: int
+
+
+class ResultCache(Generic[K, V]):
+    """Thread-safe LRU cache bounded by entry count and approximate bytes, with TTL.
+
+    Built on `LRUCache`; entries past `ttl_seconds` are dropped on access and
+    `invalidate()` clears everything (e.g. after a reindex) and bumps `generation`;
+    a `put` stamped with an older generation (read before the computation that
+    produced the value) is dropped, so a slow pre-invalidation result cannot
+    repopulate the cache. `expire()` sweeps expired
+    entries without waiting for an access. `on_discard` is called, outside the lock,
+    for every entry dropped by eviction, expiry or invalidation (e.g. to release
+    resources a value holds). Counters are exposed via `stats()` for monitoring.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl_seconds: float = 0.0,
+        sizer: Optional[Callable[[V], int]] = None,
+        on_discard: Optional[Callable[[K, V], None]] = None,
+    ) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be > 0")
+        self._max_bytes = int(max_bytes)
+        self._ttl = max(0.0, float(ttl_seconds))
+        self._sizer = sizer or sys.getsizeof
+        self._lru: LRUCache[K, _Entry[V]] = LRUCache(max_entries, on_evict=self._on_evict)
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+        self._on_discard = on_discard
+        self._discarded: List[Tuple[K, V]] = []  # pending on_discard calls, guarded by _lock
+        self._generation = 0
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            if self._ttl > 0 and time.monotonic() >= entry.expires_at:
+                self._expire_entry(key, entry)
+                self._stats.misses += 1
+            else:
+                self._stats.hits += 1
+                return entry.value
+        self._notify()
+        return None
+
+    @property
+    def generation(self) -> int:
+        """Number of `invalidate()` calls so far; pass it back to `put`."""
+        return self._generation
+
+    def put(self, key: K, value: V, generation: Optional[int] = None) -> None:
+        nbytes = int(self._sizer(value))
+        if nbytes > self._max_bytes:
+            return  # Larger than the whole budget; never cache
+        expires_at = time.monotonic() + self._ttl if self._ttl > 0 else float("inf")
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return  # computed before an invalidation; may be stale
+            old = self._lru.pop(key)
+            if old is not None:
+                self._stats.bytes -= old.nbytes
+            self._lru.put(key, _Entry(value, expires_at, nbytes))
+            self._stats.bytes += nbytes
+            while self._stats.bytes > self._max_bytes and self._lru.pop_lru() is not None:
+                pass
+        self._notify()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            if self._on_discard is not None:
+                self._discarded.extend((k, e.value) for k, e in self._lru.items())
+            self._lru.clear()
+            self._stats.bytes = 0
+            self._stats.invalidations += 1
+            self._generation += 1
+        self._notify()
+
+    def expire(self) -> int:
+        """Drop every entry past its TTL now; returns how many were dropped."""
+        if self._ttl <= 0:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            stale = [(k, e) for k, e in self._lru.items() if now >= e.expires_at]
+            for key, entry in stale:
+                self._expire_entry(key, entry)
+        self._notify()
+        return len(stale)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            s = self._stats
+            return CacheStats(
+                hits=s.hits,
+                misses=s.misses,
+                evictions=s.evictions,
+                expirations=s.expirations,
+                invalidations=s.invalidations,
+                entries=len(self._lru),
+                bytes=s.bytes,
+            )
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def _on_evict(self, key: K, entry: _Entry[V]) -> None:
+        # Called by LRUCache under self._lock
+        self._stats.bytes -= entry.nbytes
+        self._stats.evictions += 1
+        if self._on_discard is not None:
+            self._discarded.append((key, entry.value))
+
+    def _expire_entry(self, key: K, entry: _Entry[V]) -> None:
+        # Caller holds self._lock
+        self._lru.pop(key)
+        self._stats.bytes -= entry.nbytes
+        self._stats.expirations += 1
+        if self._on_discard is not None:
+            self._discarded.append((key, entry.value))
+
+    def _notify(self) -> None:
+        if self._on_discard is None:
+            return
+        with self._lock:
+            dropped, self._discarded = self._discarded, []
+        for key, value in dropped:
+            self._on_discard(key, value)
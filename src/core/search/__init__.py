@@ -1,4 +1,31 @@
 from .manager import SearchManager
+from .autocomplete import PrefixIndex
+from .fusion import SearchRankWeights, fuse
+from .local_index import LocalIndex
+from .segments import TieredMergePolicy
+from .quantization import RecallReport, measure_recall
+from .pagination import SearchCursor, SearchPage
+from .ann import AnnConfig, AnnIndex, IVFFlatIndex, create_ann_index, load_ann_index
+from .vector_store import EmbeddingStore, VectorRecord
+from .vocabulary import Vocabulary
 
-__all__ = ["SearchManager"]
-
+__all__ = [
+    "SearchManager",
+    "PrefixIndex",
+    "SearchRankWeights",
+    "fuse",
+    "LocalIndex",
+    "TieredMergePolicy",
+    "SearchCursor",
+    "SearchPage",
+    "RecallReport",
+    "measure_recall",
+    "AnnConfig",
+    "AnnIndex",
+    "IVFFlatIndex",
+    "create_ann_index",
+    "load_ann_index",
+    "EmbeddingStore",
+    "VectorRecord",
+    "Vocabulary",
+]
@@ -0,0 +1,449 @@
+from __future__ import annotations
+
+import json
+import os
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.performance.numba_ops import top_k_indices
+
+
+LabelScorer = Callable[[np.ndarray, np.ndarray], np.ndarray]
+# (candidate labels, unit query) -> scores; lets an index rank without its own vectors
+
+
+@dataclass(slots=True)
+class AnnConfig:
+    backend: str = "auto"  # auto | ivf | hnswlib | faiss
+    nlist: Optional[int] = None  # IVF lists; defaults to ~4*sqrt(N)
+    nprobe: int = 8  # IVF lists probed per query (recall vs latency)
+    train_iterations: int = 10
+    max_train_points: int = 100_000
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64  # HNSW candidate list size (recall vs latency)
+    seed: int = 0
+
+
+class AnnIndex(ABC):
+    """Approximate nearest-neighbour index over unit vectors keyed by integer labels.
+
+    Scores are inner products, i.e. cosine similarity for normalised vectors. The
+    `effort` search argument is the backend's recall/latency knob (IVF `nprobe`,
+    HNSW `ef`); `None` uses the configured default.
+    """
+
+    backend: str = ""
+    _META_FILE = "ann.json"
+
+    def __init__(self, dim: int, config: Optional[AnnConfig] = None) -> None:
+        if dim <= 0:
+            raise ValueError("dim must be > 0")
+        self.dim = int(dim)
+        self.config = config or AnnConfig()
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of live vectors."""
+
+    @abstractmethod
+    def build(self, labels: Sequence[int], vectors: np.ndarray) -> None:
+        """(Re)build the index from scratch."""
+
+    @abstractmethod
+    def add(self, labels: Sequence[int], vectors: np.ndarray) -> None:
+        """Insert or replace vectors for the given labels."""
+
+    @abstractmethod
+    def remove(self, labels: Sequence[int]) -> None:
+        """Remove labels; unknown labels are ignored."""
+
+    @abstractmethod
+    def search(self, query: Sequence[float], k: int, effort: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return `(labels, scores)` ordered by descending score."""
+
+    @property
+    def has_vectors(self) -> bool:
+        """False when the index holds no vectors of its own and needs a scorer or a rebuild."""
+        return True
+
+    def use_scorer(self, scorer: Optional[LabelScorer]) -> bool:
+        """Score candidates with `scorer` instead of stored vectors; True if supported.
+
+        A backend that takes the scorer drops its vector copies. Clearing it again
+        leaves the index without vectors (`has_vectors` is False) until `build`.
+        Backends whose library owns the vectors (hnswlib, faiss) ignore it.
+        """
+        return False
+
+    # ---------- Persistence ----------
+    def save(self, directory: Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self._save_data(directory)
+        meta = {"backend": self.backend, "dim": self.dim, "config": asdict(self.config)}
+        tmp = directory / (self._META_FILE + ".tmp")
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, directory / self._META_FILE)
+
+    @abstractmethod
+    def _save_data(self, directory: Path) -> None:
+        """Write backend-specific files into `directory`."""
+
+    @abstractmethod
+    def _load_data(self, directory: Path) -> None:
+        """Restore backend-specific files from `directory`."""
+
+
+class _InvertedList:
+    """Growable contiguous block of vectors and their labels for one IVF cell.
+
+    Without vectors (`keep_vectors=False`) only the labels are kept.
+    """
+
+    def __init__(self, dim: int, keep_vectors: bool = True) -> None:
+        self.matrix: Optional[np.ndarray] = np.zeros((4, dim), dtype=np.float32) if keep_vectors else None
+        self.labels = np.zeros(4, dtype=np.int64)
+        self.size = 0
+
+    def append(self, label: int, vec: Optional[np.ndarray]) -> int:
+        if self.size == self.labels.shape[0]:
+            cap = self.size * 2
+            if self.matrix is not None:
+                self.matrix = np.resize(self.matrix, (cap, self.matrix.shape[1]))
+            self.labels = np.resize(self.labels, cap)
+        pos = self.size
+        if self.matrix is not None:
+            self.matrix[pos] = vec
+        self.labels[pos] = label
+        self.size += 1
+        return pos
+
+    def pop(self, pos: int) -> Optional[int]:
+        """Remove `pos` by swapping the last entry in; returns the moved label."""
+        last = self.size - 1
+        moved: Optional[int] = None
+        if pos != last:
+            if self.matrix is not None:
+                self.matrix[pos] = self.matrix[last]
+            self.labels[pos] = self.labels[last]
+            moved = int(self.labels[pos])
+        self.size -= 1
+        return moved
+
+
+class IVFFlatIndex(AnnIndex):
+    """Pure NumPy IVF-flat index: spherical k-means cells + exact scoring inside probed cells.
+
+    Until `build` trains the centroids every vector sits in a single cell, so search is
+    exact brute force. With a scorer (`use_scorer`, e.g. a quantised store's codes) the
+    cells keep only labels, so the index holds no second float copy of the rows.
+    """
+
+    backend = "ivf"
+
+    def __init__(self, dim: int, config: Optional[AnnConfig] = None) -> None:
+        super().__init__(dim, config)
+        self._centroids = np.zeros((1, self.dim), dtype=np.float32)
+        self._lists: List[_InvertedList] = [_InvertedList(self.dim)]
+        self._where: Dict[int, Tuple[int, int]] = {}  # label -> (list, position)
+        self._scorer: Optional[LabelScorer] = None
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    @property
+    def is_trained(self) -> bool:
+        return len(self._lists) > 1
+
+    @property
+    def has_vectors(self) -> bool:
+        return self._lists[0].matrix is not None
+
+    def use_scorer(self, scorer: Optional[LabelScorer]) -> bool:
+        self._scorer = scorer
+        if scorer is not None:
+            for lst in self._lists:
+                lst.matrix = None
+        return True
+
+    def build(self, labels: Sequence[int], vectors: np.ndarray) -> None:
+        mat = _as_unit_matrix(vectors, self.dim)
+        n = mat.shape[0]
+        nlist = self.config.nlist or int(4 * np.sqrt(max(1, n)))
+        nlist = max(1, min(int(nlist), n))
+        self._centroids = self._train(mat, nlist) if n else np.zeros((1, self.dim), dtype=np.float32)
+        self._lists = [_InvertedList(self.dim, self._scorer is None) for _ in range(self._centroids.shape[0])]
+        self._where.clear()
+        self.add(labels, mat)
+
+    def add(self, labels: Sequence[int], vectors: np.ndarray) -> None:
+        mat = _as_unit_matrix(vectors, self.dim)
+        if len(labels) != mat.shape[0]:
+            raise ValueError("labels and vectors must have the same length")
+        self.remove(labels)
+        cells = _assign(mat, self._centroids) if self.is_trained else np.zeros(len(labels), dtype=np.int64)
+        for label, cell, vec in zip(labels, cells.tolist(), mat):
+            pos = self._lists[cell].append(int(label), vec)
+            self._where[int(label)] = (cell, pos)
+
+    def remove(self, labels: Sequence[int]) -> None:
+        for label in labels:
+            loc = self._where.pop(int(label), None)
+            if loc is None:
+                continue
+            cell, pos = loc
+            moved = self._lists[cell].pop(pos)
+            if moved is not None:
+                self._where[moved] = (cell, pos)
+
+    def search(self, query: Sequence[float], k: int, effort: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        if not self._where or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        q = _as_unit_matrix(np.asarray(query, dtype=np.float32).reshape(1, -1), self.dim)[0]
+        nprobe = max(1, int(effort if effort is not None else self.config.nprobe))
+        cells = top_k_indices(self._centroids @ q, nprobe).tolist()
+        cand_labels = np.concatenate([self._lists[c].labels[: self._lists[c].size] for c in cells])
+        if cand_labels.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if self._scorer is not None:
+            scores = np.asarray(self._scorer(cand_labels, q), dtype=np.float32)
+        elif self.has_vectors:
+            scores = np.concatenate([self._lists[c].matrix[: self._lists[c].size] for c in cells]) @ q
+        else:
+            raise RuntimeError("IVF index has no vectors; attach a scorer or rebuild it")
+        top = top_k_indices(scores, k)
+        return cand_labels[top], scores[top]
+
+    # ---------- Training ----------
+    def _train(self, mat: np.ndarray, nlist: int) -> np.ndarray:
+        rng = np.random.default_rng(self.config.seed)
+        n = mat.shape[0]
+        sample = mat
+        if n > self.config.max_train_points:
+            sample = mat[rng.choice(n, self.config.max_train_points, replace=False)]
+        cent = sample[rng.choice(sample.shape[0], nlist, replace=False)].copy()
+        for _ in range(max(1, self.config.train_iterations)):
+            assign = _assign(sample, cent)
+            sums = np.zeros_like(cent)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=nlist)
+            empty = counts == 0
+            if empty.any():
+                # Re-seed empty cells from random points
+                sums[empty] = sample[rng.choice(sample.shape[0], int(empty.sum()))]
+            cent = _as_unit_matrix(sums, self.dim)
+        return cent
+
+    # ---------- Persistence ----------
+    def _save_data(self, directory: Path) -> None:
+        arrays = {
+            "centroids": self._centroids,
+            "sizes": np.array([lst.size for lst in self._lists], dtype=np.int64),
+            "labels": np.concatenate([lst.labels[: lst.size] for lst in self._lists]),
+        }
+        if self.has_vectors:
+            arrays["vectors"] = np.concatenate([lst.matrix[: lst.size] for lst in self._lists])
+        tmp = directory / "ivf.npz.tmp"
+        with tmp.open("wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, directory / "ivf.npz")
+
+    def _load_data(self, directory: Path) -> None:
+        with np.load(directory / "ivf.npz") as data:
+            self._centroids = data["centroids"].astype(np.float32)
+            sizes = data["sizes"]
+            # Saved without vectors when it scored through a quantised store
+            vectors = data["vectors"] if "vectors" in data.files else None
+            labels = data["labels"]
+        keep = vectors is not None and self._scorer is None
+        self._lists = [_InvertedList(self.dim, keep) for _ in range(self._centroids.shape[0])]
+        self._where.clear()
+        offset = 0
+        for cell, size in enumerate(sizes.tolist()):
+            for j in range(offset, offset + size):
+                pos = self._lists[cell].append(int(labels[j]), vectors[j] if keep else None)
+                self._where[int(labels[j])] = (cell, pos)
+            offset += size
+
+
+class HnswlibIndex(AnnIndex):
+    """HNSW graph index backed by the optional `hnswlib` package."""
+
+    backend = "hnswlib"
+
+    def __init__(self, dim: int, config: Optional[AnnConfig] = None) -> None:
+        super().__init__(dim, config)
+        import hnswlib  # type: ignore
+
+        self._lib = hnswlib
+        self._index: Any = None
+        self._labels: set[int] = set()
+        self._reset(1024)
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def build(self, labels: Sequence[int], vectors: np.ndarray) -> None:
+        self._reset(max(1024, len(labels)))
+        self._labels.clear()
+        self.add(labels, vectors)
+
+    def add(self, labels: Sequence[int], vectors: np.ndarray) -> None:
+        mat = _as_unit_matrix(vectors, self.dim)
+        if not len(labels):
+            return
+        needed = self._index.get_current_count() + len(labels)
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+        ids = np.asarray(labels, dtype=np.int64)
+        # Re-adding a known (even deleted) label updates it in place and unmarks it
+        self._index.add_items(mat, ids)
+        self._labels.update(ids.tolist())
+
+    def remove(self, labels: Sequence[int]) -> None:
+        for label in labels:
+            if int(label) in self._labels:
+                self._index.mark_deleted(int(label))
+                self._labels.discard(int(label))
+
+    def search(self, query: Sequence[float], k: int, effort: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(int(k), len(self._labels))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        self._index.set_ef(max(k, int(effort if effort is not None else self.config.hnsw_ef_search)))
+        q = _as_unit_matrix(np.asarray(query, dtype=np.float32).reshape(1, -1), self.dim)
+        labels, dists = self._index.knn_query(q, k=k)
+        # hnswlib "ip" space returns 1 - inner product
+        return labels[0].astype(np.int64), (1.0 - dists[0]).astype(np.float32)
+
+    def _reset(self, capacity: int) -> None:
+        self._index = self._lib.Index(space="ip", dim=self.dim)
+        self._index.init_index(
+            max_elements=int(capacity),
+            ef_construction=self.config.hnsw_ef_construction,
+            M=self.config.hnsw_m,
+            random_seed=self.config.seed,
+        )
+
+    def _save_data(self, directory: Path) -> None:
+        self._index.save_index(str(directory / "hnsw.bin"))
+        (directory / "hnsw_labels.json").write_text(json.dumps(sorted(self._labels)), encoding="utf-8")
+
+    def _load_data(self, directory: Path) -> None:
+        self._labels = set(json.loads((directory / "hnsw_labels.json").read_text(encoding="utf-8")))
+        self._index = self._lib.Index(space="ip", dim=self.dim)
+        self._index.load_index(str(directory / "hnsw.bin"), max_elements=max(1024, len(self._labels)))
+
+
+class FaissIndex(AnnIndex):
+    """IVF-flat inner-product index backed by the optional `faiss-cpu` package."""
+
+    backend = "faiss"
+
+    def __init__(self, dim: int, config: Optional[AnnConfig] = None) -> None:
+        super().__init__(dim, config)
+        import faiss  # type: ignore
+
+        self._faiss = faiss
+        self._index: Any = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dim))
+        self._labels: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def build(self, labels: Sequence[int], vectors: np.ndarray) -> None:
+        mat = _as_unit_matrix(vectors, self.dim)
+        n = mat.shape[0]
+        nlist = max(1, min(int(self.config.nlist or 4 * np.sqrt(max(1, n))), n))
+        if n >= 2 * nlist and nlist > 1:
+            quantizer = self._faiss.IndexFlatIP(self.dim)
+            index = self._faiss.IndexIVFFlat(quantizer, self.dim, nlist, self._faiss.METRIC_INNER_PRODUCT)
+            index.train(mat)
+            self._index = index
+        else:
+            self._index = self._faiss.IndexIDMap2(self._faiss.IndexFlatIP(self.dim))
+        self._labels.clear()
+        self.add(labels, mat)
+
+    def add(self, labels: Sequence[int], vectors: np.ndarray) -> None:
+        mat = _as_unit_matrix(vectors, self.dim)
+        if not len(labels):
+            return
+        self.remove(labels)
+        ids = np.asarray(labels, dtype=np.int64)
+        self._index.add_with_ids(mat, ids)
+        self._labels.update(ids.tolist())
+
+    def remove(self, labels: Sequence[int]) -> None:
+        ids = np.asarray([int(x) for x in labels if int(x) in self._labels], dtype=np.int64)
+        if ids.size:
+            self._index.remove_ids(ids)
+            self._labels.difference_update(ids.tolist())
+
+    def search(self, query: Sequence[float], k: int, effort: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(int(k), len(self._labels))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if hasattr(self._index, "nprobe"):
+            self._index.nprobe = max(1, int(effort if effort is not None else self.config.nprobe))
+        q = _as_unit_matrix(np.asarray(query, dtype=np.float32).reshape(1, -1), self.dim)
+        scores, labels = self._index.search(q, k)
+        keep = labels[0] >= 0
+        return labels[0][keep].astype(np.int64), scores[0][keep].astype(np.float32)
+
+    def _save_data(self, directory: Path) -> None:
+        self._faiss.write_index(self._index, str(directory / "faiss.index"))
+        (directory / "faiss_labels.json").write_text(json.dumps(sorted(self._labels)), encoding="utf-8")
+
+    def _load_data(self, directory: Path) -> None:
+        self._index = self._faiss.read_index(str(directory / "faiss.index"))
+        self._labels = set(json.loads((directory / "faiss_labels.json").read_text(encoding="utf-8")))
+
+
+_BACKENDS: Dict[str, type] = {"ivf": IVFFlatIndex, "hnswlib": HnswlibIndex, "faiss": FaissIndex}
+
+
+def create_ann_index(dim: int, config: Optional[AnnConfig] = None) -> AnnIndex:
+    """Instantiate the configured backend; `auto` prefers faiss, then hnswlib, then NumPy IVF."""
+    cfg = config or AnnConfig()
+    if cfg.backend == "auto":
+        for name in ("faiss", "hnswlib"):
+            try:
+                return _BACKENDS[name](dim, cfg)
+            except ImportError:
+                continue
+        return IVFFlatIndex(dim, cfg)
+    cls = _BACKENDS.get(cfg.backend)
+    if cls is None:
+        raise ValueError(f"Unknown ANN backend: {cfg.backend}")
+    return cls(dim, cfg)
+
+
+def load_ann_index(directory: Path) -> AnnIndex:
+    directory = Path(directory)
+    meta = json.loads((directory / AnnIndex._META_FILE).read_text(encoding="utf-8"))
+    config = AnnConfig(**{k: v for k, v in meta.get("config", {}).items() if k in AnnConfig.__annotations__})
+    config.backend = str(meta["backend"])
+    index = create_ann_index(int(meta["dim"]), config)
+    index._load_data(directory)
+    return index
+
+
+def _as_unit_matrix(vectors: np.ndarray, dim: int) -> np.ndarray:
+    mat = np.ascontiguousarray(np.asarray(vectors, dtype=np.float32).reshape(-1, dim))
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return mat / norms
+
+
+def _assign(mat: np.ndarray, centroids: np.ndarray, block: int = 8192) -> np.ndarray:
+    """Nearest-centroid cell for every row, computed in blocks to bound memory."""
+    out = np.empty(mat.shape[0], dtype=np.int64)
+    for start in range(0, mat.shape[0], block):
+        out[start : start + block] = np.argmax(mat[start : start + block] @ centroids.T, axis=1)
+    return out
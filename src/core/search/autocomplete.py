@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import heapq
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+from src.core.search.vocabulary import Vocabulary, normalise_term
+
+
+class PrefixIndex:
+    """Frequency-weighted prefix completion over a sorted term array (req 1.3).
+
+    - Terms live in one sorted list; a prefix maps to a contiguous slice found with two
+      binary searches, and the `k` heaviest terms of that slice are returned.
+    - Prefixes up to `precompute_depth` characters (the ones whose slices are huge)
+      keep a cached top-`top_k` list, so the common keystrokes are O(prefix + k).
+    - `update` applies new absolute weights in place: cached lists are patched when a
+      term moves up and dropped only when a cached term loses weight. A handful of
+      new or removed terms is bisected in; larger batches (bulk builds) are merged
+      into the term list in one pass.
+    """
+
+    _BISECT_LIMIT = 32  # per update; beyond this the term list is merged in one pass
+
+    def __init__(self, top_k: int = 10, precompute_depth: int = 3) -> None:
+        self._top_k = max(1, int(top_k))
+        self._depth = max(0, int(precompute_depth))
+        self._terms: List[str] = []
+        self._weights: Dict[str, int] = {}
+        self._top: Dict[str, List[str]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    @classmethod
+    def from_vocabulary(cls, vocab: Vocabulary, top_k: int = 10, precompute_depth: int = 3) -> "PrefixIndex":
+        """Build from `vocab` and follow its frequency changes from then on."""
+        index = cls(top_k=top_k, precompute_depth=precompute_depth)
+        index.update({t: vocab.frequency(t) for t in vocab.terms()})
+        vocab.subscribe(index.update)
+        return index
+
+    # ---------- Mutation ----------
+    def update(self, weights: Mapping[str, int]) -> None:
+        """Set absolute weights; a weight <= 0 removes the term."""
+        with self._lock:
+            added: Set[str] = set()
+            removed: Set[str] = set()
+            for raw, weight in weights.items():
+                term = normalise_term(raw)
+                if not term:
+                    continue
+                old = self._weights.get(term)
+                if weight <= 0:
+                    if old is not None:
+                        del self._weights[term]
+                        if term in added:
+                            added.discard(term)  # added earlier in this update, never listed
+                        else:
+                            removed.add(term)
+                        self._drop_cached(term)
+                    continue
+                if old is None:
+                    if term in removed:
+                        removed.discard(term)  # removed earlier in this update, still listed
+                    else:
+                        added.add(term)
+                self._weights[term] = int(weight)
+                if old is not None and weight < old:
+                    self._drop_cached(term)
+                else:
+                    self._promote_cached(term)
+            self._apply_terms(added, removed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._terms.clear()
+            self._weights.clear()
+            self._top.clear()
+
+    # ---------- Query ----------
+    def complete(self, prefix: str, k: int = 5) -> List[Tuple[str, int]]:
+        """Return up to `k` `(term, weight)` completions, heaviest first."""
+        p = normalise_term(prefix)
+        if not p or k <= 0:
+            return []
+        with self._lock:
+            if len(p) <= self._depth and k <= self._top_k:
+                cached = self._top.get(p)
+                if cached is None:
+                    cached = self._scan(p, self._top_k)
+                    self._top[p] = cached
+                return [(t, self._weights[t]) for t in cached[:k]]
+            return [(t, self._weights[t]) for t in self._scan(p, k)]
+
+    def weight(self, term: str) -> int:
+        return self._weights.get(normalise_term(term), 0)
+
+    # ---------- Internals ----------
+    def _apply_terms(self, added: Set[str], removed: Set[str]) -> None:
+        if len(added) + len(removed) <= self._BISECT_LIMIT:
+            for term in removed:
+                del self._terms[bisect_left(self._terms, term)]
+            for term in added:
+                insort(self._terms, term)
+            return
+        kept = [t for t in self._terms if t not in removed] if removed else self._terms
+        self._terms = list(heapq.merge(kept, sorted(added)))
+
+    def _scan(self, prefix: str, k: int) -> List[str]:
+        lo = bisect_left(self._terms, prefix)
+        # Every string with this prefix sorts before prefix + U+10FFFF
+        hi = bisect_left(self._terms, prefix + "\U0010ffff", lo)
+        return heapq.nsmallest(k, self._terms[lo:hi], key=self._rank_key)
+
+    def _rank_key(self, term: str) -> Tuple[int, str]:
+        # Heaviest first, alphabetical among equal weights
+        return (-self._weights[term], term)
+
+    def _cached_prefixes(self, term: str) -> List[str]:
+        return [term[:n] for n in range(1, min(self._depth, len(term)) + 1)]
+
+    def _drop_cached(self, term: str) -> None:
+        for p in self._cached_prefixes(term):
+            cached = self._top.get(p)
+            if cached is not None and term in cached:
+                del self._top[p]
+
+    def _promote_cached(self, term: str) -> None:
+        key = self._rank_key(term)
+        for p in self._cached_prefixes(term):
+            cached: Optional[List[str]] = self._top.get(p)
+            if cached is None:
+                continue
+            if term in cached:
+                cached.remove(term)
+            elif len(cached) >= self._top_k and key >= self._rank_key(cached[-1]):
+                continue
+            # Cached lists are short (top_k), so a sorted re-insert is cheap
+            cached.append(term)
+            cached.sort(key=self._rank_key)
+            del cached[self._top_k :]
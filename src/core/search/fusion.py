@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass, replace
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from src.core.models.search import SearchResult
+
+
+FUSION_METHODS = ("rrf", "minmax", "zscore", "max")
+
+ResultKey = Tuple[str, int]
+# (document_id, page_number) identifying one fused hit
+
+
+@dataclass(slots=True)
+class SearchRankWeights:
+    exact: float = 1.0
+    fuzzy: float = 0.7
+    semantic: float = 0.9
+
+    def for_leg(self, leg: str) -> float:
+        # The hybrid leg carries BM25 + kNN scores and is weighted like exact
+        return {"exact": self.exact, "hybrid": self.exact, "fuzzy": self.fuzzy, "semantic": self.semantic}.get(
+            leg, 1.0
+        )
+
+
+@dataclass(slots=True)
+class _Accumulator:
+    score: float
+    best: SearchResult
+    best_contribution: float
+
+
+def fuse(
+    legs: Mapping[str, Sequence[SearchResult]],
+    weights: SearchRankWeights,
+    limit: int,
+    method: str = "rrf",
+    rrf_k: int = 60,
+) -> List[SearchResult]:
+    """Merge per-leg result lists into one ranking keyed by `(document_id, page)`.
+
+    Each leg list must be sorted by `relevance_score` descending (as the legs return
+    them); every list is walked once and the top `limit` come from a heap. Methods:
+
+    - `rrf`: sum of `weight / (rrf_k + rank)`, ignoring raw scores entirely.
+    - `minmax`: per-leg min-max normalised score times weight, summed.
+    - `zscore`: per-leg z-score squashed through a logistic, times weight, summed.
+    - `max`: highest `score * weight` per key (the historical behaviour).
+
+    Fused scores are rescaled into [0, 1]; each hit keeps the result (snippet, match
+    type) of the leg that contributed most to it.
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"unknown fusion method {method!r}; expected one of {FUSION_METHODS}")
+    if limit <= 0:
+        return []
+
+    acc: Dict[ResultKey, _Accumulator] = {}
+    total_weight = 0.0
+    for leg, results in legs.items():
+        if not results:
+            continue
+        weight = max(0.0, weights.for_leg(leg))
+        total_weight += weight
+        scorer = _leg_scorer(method, results, rrf_k)
+        seen: set[ResultKey] = set()
+        rank = 0
+        for r in results:
+            key = (r.document_id, r.page_number)
+            if key in seen:
+                continue  # later duplicates (e.g. other chunks of a page) rank lower
+            seen.add(key)
+            rank += 1
+            contribution = weight * scorer(rank, r.relevance_score)
+            cur = acc.get(key)
+            if cur is None:
+                acc[key] = _Accumulator(contribution, r, contribution)
+                continue
+            cur.score = max(cur.score, contribution) if method == "max" else cur.score + contribution
+            if contribution > cur.best_contribution:
+                cur.best, cur.best_contribution = r, contribution
+
+    if not acc:
+        return []
+    scale = _scale(method, total_weight, rrf_k)
+    top = heapq.nlargest(limit, acc.values(), key=lambda a: a.score)
+    return [replace(a.best, relevance_score=min(1.0, max(0.0, a.score * scale))) for a in top]
+
+
+def _leg_scorer(method: str, results: Sequence[SearchResult], rrf_k: int):
+    if method == "rrf":
+        return lambda rank, _score: 1.0 / (rrf_k + rank)
+    if method == "minmax":
+        # Lists are pre-sorted, so the extremes are the ends
+        hi, lo = results[0].relevance_score, results[-1].relevance_score
+        span = hi - lo
+        return lambda _rank, score: 1.0 if span <= 0 else (score - lo) / span
+    if method == "zscore":
+        n = len(results)
+        mean = sum(r.relevance_score for r in results) / n
+        std = math.sqrt(sum((r.relevance_score - mean) ** 2 for r in results) / n)
+        return lambda _rank, score: 0.5 if std <= 0 else 1.0 / (1.0 + math.exp(-(score - mean) / std))
+    return lambda _rank, score: score
+
+
+def _scale(method: str, total_weight: float, rrf_k: int) -> float:
+    """Factor mapping the largest achievable fused score to 1.0."""
+    if method == "max" or total_weight <= 0:
+        return 1.0
+    if method == "rrf":
+        return (rrf_k + 1) / total_weight
+    return 1.0 / total_weight
@@ -0,0 +1,751 @@
+from __future__ import annotations
+
+import json
+import math
+import re
+import shutil
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from src.core.search.segments import (
+    BackgroundMerger,
+    TieredMergePolicy,
+    load_tombstones,
+    read_manifest,
+    save_tombstones,
+    write_manifest,
+)
+
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+TEXT_FIELDS: Tuple[str, ...] = ("title", "content")
+KEYWORD_FIELDS: Tuple[str, ...] = ("document_id", "file_path", "metadata.topic_path")
+MAX_PREFIX_EXPANSIONS = 50  # same default as Elasticsearch bool_prefix / prefix rewrites
+
+Record = Tuple[str, Dict[str, Any]]
+# (_id, _source) as sent to Elasticsearch
+
+
+def analyze(text: str) -> List[str]:
+    """Lowercased word tokens; the local equivalent of the `standard` analyzer."""
+    return [m.group(0).lower() for m in _WORD_RE.finditer(text or "")]
+
+
+def keyword_value(source: Dict[str, Any], field: str) -> str:
+    """Resolve a dotted keyword field (`metadata.topic_path[.keyword]`) in a source dict."""
+    node: Any = source
+    for part in field.removesuffix(".keyword").split("."):
+        if not isinstance(node, dict):
+            return ""
+        node = node.get(part)
+    return "" if node is None else str(node)
+
+
+@dataclass(slots=True)
+class BM25Params:
+    k1: float = 1.2
+    b: float = 0.75
+
+
+class _FieldPostings:
+    """Posting lists of one text field inside a segment.
+
+    Doc ids are delta-encoded per term in the narrowest unsigned dtype that fits and
+    decoded with one `cumsum`; positions are kept for phrase/proximity matching.
+    """
+
+    __slots__ = ("terms", "term_index", "term_offsets", "doc_deltas", "tfs", "pos_offsets", "positions", "lengths")
+
+    def __init__(
+        self,
+        terms: List[str],
+        term_offsets: np.ndarray,
+        doc_deltas: np.ndarray,
+        tfs: np.ndarray,
+        pos_offsets: np.ndarray,
+        positions: np.ndarray,
+        lengths: np.ndarray,
+    ) -> None:
+        self.terms = terms  # sorted, so prefixes are bisect ranges
+        self.term_index = {t: i for i, t in enumerate(terms)}
+        self.term_offsets = term_offsets
+        self.doc_deltas = doc_deltas
+        self.tfs = tfs
+        self.pos_offsets = pos_offsets
+        self.positions = positions
+        self.lengths = lengths
+
+    @classmethod
+    def build(cls, texts: Sequence[str]) -> "_FieldPostings":
+        inverted: Dict[str, List[Tuple[int, List[int]]]] = {}
+        lengths = np.zeros(len(texts), dtype=np.uint32)
+        for doc_no, text in enumerate(texts):
+            tokens = analyze(text)
+            lengths[doc_no] = len(tokens)
+            seen: Dict[str, List[int]] = {}
+            for pos, tok in enumerate(tokens):
+                seen.setdefault(tok, []).append(pos)
+            for tok, plist in seen.items():
+                inverted.setdefault(tok, []).append((doc_no, plist))
+
+        terms = sorted(inverted)
+        term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        deltas: List[int] = []
+        tfs: List[int] = []
+        pos_offsets: List[int] = [0]
+        positions: List[int] = []
+        for i, term in enumerate(terms):
+            prev = 0
+            for doc_no, plist in inverted[term]:
+                deltas.append(doc_no - prev)
+                prev = doc_no
+                tfs.append(min(len(plist), 65535))
+                positions.extend(plist)
+                pos_offsets.append(len(positions))
+            term_offsets[i + 1] = len(deltas)
+        max_delta = max(deltas, default=0)
+        dtype = np.uint8 if max_delta < 2**8 else np.uint16 if max_delta < 2**16 else np.uint32
+        return cls(
+            terms,
+            term_offsets,
+            np.asarray(deltas, dtype=dtype),
+            np.asarray(tfs, dtype=np.uint16),
+            np.asarray(pos_offsets, dtype=np.int64),
+            np.asarray(positions, dtype=np.uint32),
+            lengths,
+        )
+
+    def postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray, int]]:
+        """Return (doc_ids, tfs, first posting index) for `term`, or None."""
+        i = self.term_index.get(term)
+        if i is None:
+            return None
+        lo, hi = int(self.term_offsets[i]), int(self.term_offsets[i + 1])
+        doc_ids = np.cumsum(self.doc_deltas[lo:hi], dtype=np.int64)
+        return doc_ids, np.asarray(self.tfs[lo:hi], dtype=np.float32), lo
+
+    def positions_at(self, posting: int) -> np.ndarray:
+        return self.positions[int(self.pos_offsets[posting]) : int(self.pos_offsets[posting + 1])]
+
+    def expand_prefix(self, prefix: str, limit: int = MAX_PREFIX_EXPANSIONS) -> List[str]:
+        lo = bisect_left(self.terms, prefix)
+        out: List[str] = []
+        for term in self.terms[lo : lo + limit]:
+            if not term.startswith(prefix):
+                break
+            out.append(term)
+        return out
+
+    # ---------- Persistence ----------
+    _ARRAYS = ("term_offsets", "doc_deltas", "tfs", "pos_offsets", "positions", "lengths")
+
+    def save(self, directory: Path, name: str) -> None:
+        (directory / f"{name}.terms.json").write_text(json.dumps(self.terms), encoding="utf-8")
+        for attr in self._ARRAYS:
+            np.save(directory / f"{name}.{attr}.npy", getattr(self, attr))
+
+    @classmethod
+    def load(cls, directory: Path, name: str, mmap: bool = True) -> "_FieldPostings":
+        terms = json.loads((directory / f"{name}.terms.json").read_text(encoding="utf-8"))
+        mode = "r" if mmap else None
+        arrays = [np.load(directory / f"{name}.{attr}.npy", mmap_mode=mode) for attr in cls._ARRAYS]
+        return cls(terms, *arrays)
+
+
+class Segment:
+    """Immutable, searchable set of records: text postings plus stored sources."""
+
+    _DOCS_FILE = "docs.json"
+
+    def __init__(self, records: List[Record], fields: Dict[str, _FieldPostings]) -> None:
+        self.ids = [rid for rid, _src in records]
+        self.sources = [src for _rid, src in records]
+        self.fields = fields
+        self.keywords = {
+            f: np.asarray([keyword_value(src, f) for src in self.sources], dtype=object) for f in KEYWORD_FIELDS
+        }
+        self.row_of = {rid: i for i, rid in enumerate(self.ids)}
+        self.rows_of_doc: Dict[str, List[int]] = {}
+        for i, src in enumerate(self.sources):
+            self.rows_of_doc.setdefault(str(src.get("document_id", "")), []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, records: List[Record]) -> "Segment":
+        fields = {f: _FieldPostings.build([str(src.get(f, "") or "") for _rid, src in records]) for f in TEXT_FIELDS}
+        return cls(records, fields)
+
+    def save(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        docs = [[rid, src] for rid, src in zip(self.ids, self.sources)]
+        (directory / self._DOCS_FILE).write_text(json.dumps(docs), encoding="utf-8")
+        for name, postings in self.fields.items():
+            postings.save(directory, name)
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "Segment":
+        docs = json.loads((directory / cls._DOCS_FILE).read_text(encoding="utf-8"))
+        fields = {f: _FieldPostings.load(directory, f, mmap=mmap) for f in TEXT_FIELDS}
+        return cls([(str(rid), src) for rid, src in docs], fields)
+
+
+@dataclass(slots=True, frozen=True)
+class _LiveSegment:
+    """A committed segment plus its tombstones; replaced (never mutated) on change."""
+
+    name: str
+    segment: Segment
+    deleted: np.ndarray
+    deleted_file: Optional[str] = None
+
+    @property
+    def live_count(self) -> int:
+        return len(self.segment) - int(self.deleted.sum())
+
+
+class _CorpusStats:
+    """Index-wide BM25 statistics, so a hit scores the same in whichever segment it lives."""
+
+    def __init__(self, segments: Sequence[_LiveSegment]) -> None:
+        self._segments = segments
+        self.doc_count = sum(s.live_count for s in segments)
+        self.avg_lengths: Dict[str, float] = {}
+        for field in TEXT_FIELDS:
+            total = sum(float(s.segment.fields[field].lengths[~s.deleted].sum()) for s in segments)
+            self.avg_lengths[field] = total / self.doc_count if self.doc_count else 0.0
+        self._df: Dict[Tuple[str, str], int] = {}
+
+    def df(self, field: str, term: str) -> int:
+        # Like Lucene, document frequency still counts tombstoned rows until a merge
+        key = (field, term)
+        cached = self._df.get(key)
+        if cached is None:
+            cached = 0
+            for s in self._segments:
+                postings = s.segment.fields[field]
+                i = postings.term_index.get(term)
+                if i is not None:
+                    cached += int(postings.term_offsets[i + 1] - postings.term_offsets[i])
+            self._df[key] = cached
+        return cached
+
+
+class _SegmentView:
+    """What query evaluation sees: one segment's data with the index-wide stats."""
+
+    __slots__ = ("fields", "keywords", "stats", "_n")
+
+    def __init__(self, segment: Segment, stats: _CorpusStats) -> None:
+        self.fields = segment.fields
+        self.keywords = segment.keywords
+        self.stats = stats
+        self._n = len(segment)
+
+    def __len__(self) -> int:
+        return self._n
+
+
+@dataclass(slots=True, frozen=True)
+class _Snapshot:
+    segments: Tuple[_LiveSegment, ...]
+    stats: _CorpusStats
+
+
+class LocalIndex:
+    """Embedded inverted index used as an Elasticsearch-free exact search backend.
+
+    - Text fields (`title`, `content`) are indexed with positions and scored with
+      BM25; keyword fields (`document_id`, `file_path`, `metadata.topic_path`) are
+      matched from stored values.
+    - `search` accepts the same keyword arguments as `Elasticsearch.search` for the
+      query DSL subset produced by `ExactSearchStrategy` and `SearchManager` (`bool`,
+      `multi_match` best_fields/phrase/bool_prefix, `match`, `match_phrase`, `prefix`,
+      `term`, `match_all`) and returns an ES-shaped response, so callers can swap it
+      in for the client.
+    - Changes are buffered until `commit()`, which writes only the buffered records as
+      a new immutable segment (NumPy arrays, memory-mapped on load) and records
+      replaced/removed rows of older segments in tombstone bitmaps, so a commit costs
+      O(batch) rather than O(corpus).
+    - A `TieredMergePolicy` compacts segments by size tier (inline after commits, or
+      on a `BackgroundMerger` thread), keeping query fan-out logarithmic in corpus size.
+    - Every commit/merge atomically switches the manifest; searches read an immutable
+      snapshot and never block on writers.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        params: Optional[BM25Params] = None,
+        merge_policy: Optional[TieredMergePolicy] = None,
+        background_merge: bool = False,
+    ) -> None:
+        self._dir = Path(directory) if directory is not None else None
+        self._params = params or BM25Params()
+        self._policy = merge_policy or TieredMergePolicy()
+        self._snap = _Snapshot((), _CorpusStats(()))
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._deleted_docs: Set[str] = set()
+        self._generation = 0
+        self._next_segment = 0
+        self._lock = threading.RLock()
+        self._merge_lock = threading.Lock()
+        self._merger = BackgroundMerger(self._merge_once, name="local-index-merger") if background_merge else None
+
+    def __len__(self) -> int:
+        return self._snap.stats.doc_count
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._snap.segments)
+
+    @classmethod
+    def open(
+        cls,
+        directory: Path,
+        params: Optional[BM25Params] = None,
+        merge_policy: Optional[TieredMergePolicy] = None,
+        background_merge: bool = False,
+    ) -> "LocalIndex":
+        """Load the committed generation in `directory` (empty index if none)."""
+        index = cls(directory, params, merge_policy, background_merge)
+        meta = read_manifest(Path(directory))
+        if meta is not None:
+            index._generation = int(meta["generation"])
+            index._next_segment = int(meta.get("next_segment", 0))
+            live: List[_LiveSegment] = []
+            for entry in meta.get("segments", []):
+                seg_dir = Path(directory) / entry["name"]
+                segment = Segment.load(seg_dir)
+                del_file = entry.get("deleted")
+                deleted = load_tombstones(seg_dir / del_file if del_file else None, len(segment))
+                live.append(_LiveSegment(entry["name"], segment, deleted, del_file))
+            index._snap = _Snapshot(tuple(live), _CorpusStats(live))
+        return index
+
+    def close(self) -> None:
+        if self._merger is not None:
+            self._merger.close()
+
+    # ---------- Mutation ----------
+    def add(self, records: Iterable[Record]) -> None:
+        """Buffer records for the next commit; an existing `_id` is replaced."""
+        with self._lock:
+            for rid, source in records:
+                src = {k: v for k, v in source.items() if k != "embedding"}
+                self._pending[str(rid)] = src
+
+    def remove(self, document_id: str) -> None:
+        """Drop every record of a document at the next commit; later `add`s survive."""
+        with self._lock:
+            self._deleted_docs.add(str(document_id))
+            self._pending = {
+                rid: src for rid, src in self._pending.items() if str(src.get("document_id")) != str(document_id)
+            }
+
+    def commit(self) -> None:
+        """Flush buffered changes as one new segment plus tombstones, then merge if due."""
+        with self._lock:
+            if not self._pending and not self._deleted_docs:
+                return
+            self._generation += 1
+            segments: List[_LiveSegment] = []
+            for live in self._snap.segments:
+                rows = [live.segment.row_of[rid] for rid in self._pending if rid in live.segment.row_of]
+                for doc_id in self._deleted_docs:
+                    rows.extend(live.segment.rows_of_doc.get(doc_id, ()))
+                if rows:
+                    deleted = live.deleted.copy()
+                    deleted[rows] = True
+                    live = self._tombstoned(live, deleted)
+                if live.live_count > 0:
+                    segments.append(live)
+            if self._pending:
+                segment = Segment.build(list(self._pending.items()))
+                name = self._new_segment_name()
+                if self._dir is not None:
+                    segment.save(self._dir / name)
+                segments.append(_LiveSegment(name, segment, np.zeros(len(segment), dtype=bool)))
+            self._publish(segments)
+            self._pending.clear()
+            self._deleted_docs.clear()
+        if self._merger is not None:
+            self._merger.request()
+        else:
+            while self._merge_once():
+                pass
+
+    def force_merge(self) -> None:
+        """Compact every segment into one, dropping all tombstoned rows."""
+        if self._merger is not None:
+            self._merger.wait_idle()
+        with self._merge_lock:
+            snap = self._snap
+            if len(snap.segments) > 1 or any(s.live_count < len(s.segment) for s in snap.segments):
+                self._merge(snap, list(range(len(snap.segments))))
+
+    def wait_for_merges(self, timeout: Optional[float] = None) -> bool:
+        return self._merger.wait_idle(timeout) if self._merger is not None else True
+
+    # ---------- Merging ----------
+    def _merge_once(self) -> bool:
+        with self._merge_lock:
+            snap = self._snap
+            picked = self._policy.select(
+                [s.live_count for s in snap.segments], [len(s.segment) for s in snap.segments]
+            )
+            if not picked:
+                return False
+            self._merge(snap, picked)
+            return True
+
+    def _merge(self, snap: _Snapshot, picked: List[int]) -> None:
+        sources = [snap.segments[i] for i in picked]
+        records: List[Record] = [
+            (src.segment.ids[r], src.segment.sources[r]) for src in sources for r in np.flatnonzero(~src.deleted).tolist()
+        ]
+        # The expensive part runs without the writer lock; commits keep flowing
+        merged = Segment.build(records)
+        with self._lock:
+            self._generation += 1
+            name = self._new_segment_name()
+            if self._dir is not None:
+                merged.save(self._dir / name)
+            current = {s.name: s for s in self._snap.segments}
+            deleted = np.zeros(len(merged), dtype=bool)
+            for src in sources:
+                now = current.get(src.name)
+                # Rows deleted by commits that landed while the merge was running
+                gone = np.flatnonzero(~src.deleted) if now is None else np.flatnonzero(now.deleted & ~src.deleted)
+                for r in gone.tolist():
+                    deleted[merged.row_of[src.segment.ids[r]]] = True
+            names = {src.name for src in sources}
+            segments = [s for s in self._snap.segments if s.name not in names]
+            if len(merged):
+                replacement = _LiveSegment(name, merged, np.zeros(len(merged), dtype=bool))
+                if deleted.any():
+                    replacement = self._tombstoned(replacement, deleted)
+                segments.append(replacement)
+            self._publish(segments)
+
+    # ---------- Query ----------
+    def search(
+        self,
+        index: Optional[str] = None,
+        size: int = 10,
+        query: Optional[Dict[str, Any]] = None,
+        highlight: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[Any]] = None,
+        search_after: Optional[List[Any]] = None,
+        knn: Optional[Dict[str, Any]] = None,
+        **_ignored: Any,
+    ) -> Dict[str, Any]:
+        """Elasticsearch-compatible search over the committed segments."""
+        if knn is not None:
+            raise ValueError("the local index does not support knn; use the vector store")
+        started = time.perf_counter()
+        snap = self._snap  # immutable; no lock needed to read it
+        q = query or {"match_all": {}}
+        size = max(0, int(size))
+        total = 0
+        max_score: Optional[float] = None
+        candidates: List[Tuple[float, str, Segment, int]] = []
+        for live in snap.segments:
+            mask, scores = self._eval(_SegmentView(live.segment, snap.stats), q)
+            hits_idx = np.flatnonzero(mask & ~live.deleted)
+            if not hits_idx.size:
+                continue
+            total += int(hits_idx.size)
+            seg_max = float(scores[hits_idx].max())
+            max_score = seg_max if max_score is None else max(max_score, seg_max)
+            if search_after is None and 0 < size < hits_idx.size:
+                # Keep everything tied with the size-th score so the tie-break stays exact
+                kth = np.partition(scores[hits_idx], hits_idx.size - size)[hits_idx.size - size]
+                hits_idx = hits_idx[scores[hits_idx] >= kth]
+            ids = live.segment.ids
+            candidates.extend((float(scores[d]), ids[d], live.segment, d) for d in hits_idx.tolist())
+
+        # Deterministic order: score desc, then _id asc (also the search_after key)
+        candidates.sort(key=lambda c: (-c[0], c[1]))
+        if search_after is not None and len(search_after) >= 2:
+            after = (-float(search_after[0]), str(search_after[1]))
+            candidates = [c for c in candidates if (-c[0], c[1]) > after]
+        candidates = candidates[:size]
+
+        highlighter = _Highlighter(self._collect_terms(q)) if highlight else None
+        hits: List[Dict[str, Any]] = []
+        for score, rid, segment, d in candidates:
+            hit: Dict[str, Any] = {"_id": rid, "_score": score, "_source": dict(segment.sources[d])}
+            if sort is not None:
+                hit["sort"] = [score, rid]
+            if highlighter is not None:
+                fragment = highlighter.fragment(str(segment.sources[d].get("content", "")))
+                if fragment:
+                    hit["highlight"] = {"content": [fragment]}
+            hits.append(hit)
+        return {
+            "took": int((time.perf_counter() - started) * 1000),
+            "hits": {"total": {"value": total, "relation": "eq"}, "max_score": max_score, "hits": hits},
+        }
+
+    # ---------- Evaluation ----------
+    def _eval(self, seg: _SegmentView, q: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(seg)
+        if len(q) != 1:
+            raise ValueError(f"expected exactly one query clause, got {list(q)}")
+        kind, body = next(iter(q.items()))
+        if kind == "match_all":
+            return np.ones(n, dtype=bool), np.ones(n, dtype=np.float32)
+        if kind == "bool":
+            return self._eval_bool(seg, body)
+        if kind == "multi_match":
+            return self._eval_multi_match(seg, body)
+        if kind in ("match", "match_phrase", "prefix", "term"):
+            field, spec = next(iter(body.items()))
+            if not isinstance(spec, dict):
+                spec = {"query" if kind.startswith("match") else "value": spec}
+            return self._eval_field(seg, kind, field, spec)
+        raise ValueError(f"unsupported query clause for local index: {kind}")
+
+    def _eval_bool(self, seg: _SegmentView, body: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(seg)
+        mask = np.ones(n, dtype=bool)
+        scores = np.zeros(n, dtype=np.float32)
+        for clause in self._as_list(body.get("must")):
+            m, s = self._eval(seg, clause)
+            mask &= m
+            scores += s
+        for clause in self._as_list(body.get("filter")):
+            mask &= self._eval(seg, clause)[0]
+        should = self._as_list(body.get("should"))
+        if should:
+            hits = np.zeros(n, dtype=np.int32)
+            for clause in should:
+                m, s = self._eval(seg, clause)
+                hits += m
+                scores += np.where(m, s, 0.0).astype(np.float32)
+            has_required = bool(body.get("must") or body.get("filter"))
+            min_match = int(body.get("minimum_should_match", 0 if has_required else 1))
+            mask &= hits >= min_match
+        for clause in self._as_list(body.get("must_not")):
+            mask &= ~self._eval(seg, clause)[0]
+        if not body.get("must") and not should:
+            scores[:] = 0.0  # filter/must_not only: constant score like ES
+        return mask, np.where(mask, scores, 0.0).astype(np.float32)
+
+    def _eval_multi_match(self, seg: _SegmentView, body: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(seg)
+        mask = np.zeros(n, dtype=bool)
+        best = np.zeros(n, dtype=np.float32)
+        mm_type = body.get("type", "best_fields")
+        kind = {"phrase": "match_phrase", "bool_prefix": "bool_prefix"}.get(mm_type, "match")
+        spec = {"query": body.get("query", ""), "slop": int(body.get("slop", 0))}
+        for raw in body.get("fields") or list(TEXT_FIELDS):
+            field, _, boost = str(raw).partition("^")
+            m, s = self._eval_field(seg, kind, field, spec)
+            mask |= m
+            # best_fields: a document scores by its best matching field
+            np.maximum(best, s * (float(boost) if boost else 1.0), out=best)
+        return mask, best
+
+    def _eval_field(
+        self, seg: _SegmentView, kind: str, field: str, spec: Dict[str, Any]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(seg)
+        base = field.removesuffix(".keyword")
+        if base in KEYWORD_FIELDS:
+            column = seg.keywords[base]
+            value = str(spec.get("value", spec.get("query", "")))
+            if kind == "prefix":
+                if spec.get("case_insensitive"):
+                    m = np.fromiter((v.lower().startswith(value.lower()) for v in column), bool, n)
+                else:
+                    m = np.fromiter((v.startswith(value) for v in column), bool, n)
+            else:
+                m = column == value
+            m = np.asarray(m, dtype=bool)
+            return m, m.astype(np.float32)
+        postings = seg.fields.get(base)
+        if postings is None:
+            return np.zeros(n, dtype=bool), np.zeros(n, dtype=np.float32)
+        if kind == "prefix":
+            return self._prefix(seg, postings, str(spec.get("value", "")).lower())
+        terms = analyze(str(spec.get("query", "")))
+        if kind == "bool_prefix" and terms:
+            mask, scores = self._match_any(seg, base, postings, terms[:-1])
+            pm, ps = self._prefix(seg, postings, terms[-1])
+            return mask | pm, scores + ps
+        if kind == "match_phrase" and len(terms) > 1:
+            return self._phrase(seg, base, postings, terms, int(spec.get("slop", 0)))
+        return self._match_any(seg, base, postings, terms)
+
+    def _bm25(self, seg: _SegmentView, field: str, postings: _FieldPostings, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        found = postings.postings(term)
+        if found is None:
+            return None
+        doc_ids, tfs, _first = found
+        n, df = max(seg.stats.doc_count, 1), seg.stats.df(field, term)
+        idf = math.log(1.0 + max(0.0, n - df + 0.5) / (df + 0.5))
+        k1, b = self._params.k1, self._params.b
+        avg = seg.stats.avg_lengths[field] or 1.0
+        lengths = np.asarray(postings.lengths[doc_ids], dtype=np.float32)
+        scores = idf * tfs * (k1 + 1.0) / (tfs + k1 * (1.0 - b + b * lengths / avg))
+        return doc_ids, scores.astype(np.float32)
+
+    def _match_any(
+        self, seg: _SegmentView, field: str, postings: _FieldPostings, terms: Sequence[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        mask = np.zeros(len(seg), dtype=bool)
+        scores = np.zeros(len(seg), dtype=np.float32)
+        for term in terms:
+            scored = self._bm25(seg, field, postings, term)
+            if scored is not None:
+                doc_ids, s = scored
+                mask[doc_ids] = True
+                scores[doc_ids] += s
+        return mask, scores
+
+    def _phrase(
+        self, seg: _SegmentView, field: str, postings: _FieldPostings, terms: Sequence[str], slop: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(seg)
+        mask = np.zeros(n, dtype=bool)
+        found = [postings.postings(t) for t in terms]
+        if any(f is None for f in found):
+            return mask, np.zeros(n, dtype=np.float32)
+        common = found[0][0]  # type: ignore[index]
+        for f in found[1:]:
+            common = np.intersect1d(common, f[0], assume_unique=True)  # type: ignore[index]
+        for doc in common.tolist():
+            plists = []
+            for doc_ids, _tfs, first in found:  # type: ignore[misc]
+                j = int(np.searchsorted(doc_ids, doc))
+                plists.append(postings.positions_at(first + j))
+            if self._positions_match(plists, slop):
+                mask[doc] = True
+        _m, scores = self._match_any(seg, field, postings, terms)
+        return mask, np.where(mask, scores, 0.0).astype(np.float32)
+
+    @staticmethod
+    def _positions_match(plists: List[np.ndarray], slop: int) -> bool:
+        # Term i must occur within `slop` positions of start + i
+        for start in plists[0].tolist():
+            ok = True
+            for i, plist in enumerate(plists[1:], start=1):
+                lo = int(np.searchsorted(plist, max(0, start + i - slop)))
+                if lo >= len(plist) or int(plist[lo]) > start + i + slop:
+                    ok = False
+                    break
+            if ok:
+                return True
+        return False
+
+    def _prefix(self, seg: _SegmentView, postings: _FieldPostings, prefix: str) -> Tuple[np.ndarray, np.ndarray]:
+        mask = np.zeros(len(seg), dtype=bool)
+        if prefix:
+            for term in postings.expand_prefix(prefix):
+                found = postings.postings(term)
+                if found is not None:
+                    mask[found[0]] = True
+        else:
+            mask[:] = True
+        # Prefix queries are constant-score in Elasticsearch
+        return mask, mask.astype(np.float32)
+
+    @staticmethod
+    def _as_list(value: Any) -> List[Dict[str, Any]]:
+        if value is None:
+            return []
+        return list(value) if isinstance(value, list) else [value]
+
+    def _collect_terms(self, q: Optional[Dict[str, Any]], negated: bool = False) -> List[Tuple[str, bool]]:
+        """Positive (term, is_prefix) pairs from a query, for highlighting."""
+        if not q or negated:
+            return []
+        out: List[Tuple[str, bool]] = []
+        kind, body = next(iter(q.items()))
+        if kind == "bool":
+            for key in ("must", "should", "filter"):
+                for clause in self._as_list(body.get(key)):
+                    out.extend(self._collect_terms(clause))
+        elif kind == "multi_match":
+            terms = analyze(str(body.get("query", "")))
+            is_prefix = body.get("type") == "bool_prefix"
+            out.extend((t, is_prefix and i == len(terms) - 1) for i, t in enumerate(terms))
+        elif kind in ("match", "match_phrase"):
+            _field, spec = next(iter(body.items()))
+            text = spec.get("query", "") if isinstance(spec, dict) else spec
+            out.extend((t, False) for t in analyze(str(text)))
+        elif kind == "prefix":
+            _field, spec = next(iter(body.items()))
+            value = spec.get("value", "") if isinstance(spec, dict) else spec
+            out.append((str(value).lower(), True))
+        return out
+
+    # ---------- Persistence ----------
+    def _new_segment_name(self) -> str:
+        self._next_segment += 1
+        return f"seg_{self._next_segment:06d}"
+
+    def _tombstoned(self, live: _LiveSegment, deleted: np.ndarray) -> _LiveSegment:
+        del_file = None
+        if self._dir is not None:
+            del_file = f"deleted_{self._generation:06d}.npy"
+            save_tombstones(self._dir / live.name / del_file, deleted)
+        return _LiveSegment(live.name, live.segment, deleted, del_file)
+
+    def _publish(self, segments: List[_LiveSegment]) -> None:
+        """Swap in a new snapshot and, when persistent, a new manifest (caller holds the lock)."""
+        self._snap = _Snapshot(tuple(segments), _CorpusStats(segments))
+        if self._dir is None:
+            return
+        write_manifest(
+            self._dir,
+            {
+                "generation": self._generation,
+                "next_segment": self._next_segment,
+                "segments": [{"name": s.name, "deleted": s.deleted_file} for s in segments],
+            },
+        )
+        self._cleanup(segments)
+
+    def _cleanup(self, segments: List[_LiveSegment]) -> None:
+        assert self._dir is not None
+        referenced = {s.name: s.deleted_file for s in segments}
+        for path in self._dir.glob("seg_*"):
+            if path.name not in referenced:
+                # Segment files are only read through memory maps taken at open time;
+                # removing the directory entry is safe on POSIX
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            for tomb in path.glob("deleted_*.npy"):
+                if tomb.name != referenced[path.name]:
+                    tomb.unlink(missing_ok=True)
+
+
+class _Highlighter:
+    """Builds one ES-style `<em>` fragment around the first matching term."""
+
+    FRAGMENT_CHARS = 200
+
+    def __init__(self, terms: List[Tuple[str, bool]]) -> None:
+        parts = sorted({re.escape(t) + (r"\w*" if is_prefix else "") for t, is_prefix in terms if t}, key=len, reverse=True)
+        self._re = re.compile(r"\b(" + "|".join(parts) + r")\b", re.IGNORECASE) if parts else None
+
+    def fragment(self, text: str) -> str:
+        if self._re is None:
+            return ""
+        first = self._re.search(text)
+        if first is None:
+            return ""
+        start = max(0, first.start() - self.FRAGMENT_CHARS // 3)
+        window = text[start : start + self.FRAGMENT_CHARS]
+        return self._re.sub(lambda m: f"<em>{m.group(0)}</em>", window)
@@ -1,32 +1,78 @@
 from __future__ import annotations
 
+import re
 import time
-from dataclasses import dataclass
-from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
+
+from src.core.events.bus import EventBus
+from src.core.events.events import IndexUpdated
 from src.core.models.configuration import ApplicationConfig
-from src.core.models.search import MatchType, SearchResult
+from src.core.models.search import MatchType, SearchOutcome, SearchResult
+from src.core.performance.numba_ops import top_k_cosine
+from src.core.performance.result_cache import CacheStats, ResultCache
+from src.core.search.autocomplete import PrefixIndex
+from src.core.search.fusion import SearchRankWeights, fuse
+from src.core.search.local_index import LocalIndex
+from src.core.search.pagination import PageSession, SearchCursor, SearchPage, select_page
+from src.core.search.strategies.exact import ExactSearchStrategy
+from src.core.search.vector_store import EmbeddingStore
 
 
 CandidateProvider = Callable[[str, int], Sequence[Tuple[str, str]]]
 # Returns sequence of (document_id, text) candidates for fuzzy/semantic search
 
+CacheKey = Tuple[str, int, Optional[str]]
+# (query, limit, topic_filter)
 
-@dataclass(slots=True)
-class SearchRankWeights:
-    exact: float = 1.0
-    fuzzy: float = 0.7
-    semantic: float = 0.9
+_TOKEN_RE = re.compile(r"\S+")
 
 
 class SearchManager:
     """Combines exact (Elasticsearch), fuzzy (rapidfuzz), and semantic (embeddings).
 
-    - Exact: uses Elasticsearch client if provided (lazy import otherwise).
+    - Exact: queries are compiled with the `ExactSearchStrategy` grammar (boolean
+      operators, phrases, proximity, prefixes, `field:` scoping); text it cannot parse
+      is sent as one plain `multi_match`.
+      Uses Elasticsearch client if provided (lazy import otherwise), or the
+      embedded `LocalIndex` per `exact_search_backend`; in `auto` mode the local index
+      answers whenever the Elasticsearch request fails. A lazily created client is
+      pinged before first use, and after a failure Elasticsearch is skipped for
+      `ES_RETRY_SECONDS`, so deployments without a cluster do not pay a connection
+      attempt per query.
     - Fuzzy: uses `rapidfuzz.fuzz.ratio` over candidate texts from provider.
-    - Semantic: uses sentence-transformers embeddings and cosine similarity.
+    - Semantic: uses sentence-transformers embeddings and cosine similarity, scoring
+      against a pre-computed `EmbeddingStore` when one is attached, otherwise sending a
+      `knn` query over the indexed `embedding` vectors to Elasticsearch (subject to the
+      same probe and back-off, falling back to the store). Only the query is encoded
+      client-side; re-encoding provider texts is the last resort.
+    - Hybrid (`hybrid_search`): BM25 and kNN are combined in one Elasticsearch request
+      that replaces the separate exact and semantic legs.
+
+    The legs run concurrently on a small thread pool. Exact and fuzzy legs are bounded
+    by `core_search_timeout_ms`, the semantic leg by `search_timeout_seconds`; legs that
+    miss their deadline are dropped and reported in `SearchOutcome.timed_out_legs`.
+
+    Per-leg lists are merged by `fusion.fuse` (`fusion_method`: RRF by default, or
+    min-max / z-score normalised scores) with `SearchRankWeights` per leg. Legs report
+    unweighted scores in [0, 1]; exact scores are relative to the response `max_score`.
+
+    Complete results are cached in a bounded `ResultCache` (entries, bytes, TTL) when
+    `cache_ttl_seconds > 0`; the cache is invalidated on `IndexUpdated` events.
     """
 
+    LEG_EXACT = "exact"
+    LEG_FUZZY = "fuzzy"
+    LEG_SEMANTIC = "semantic"
+    LEG_HYBRID = "hybrid"
+    INDEX_NAME = "documents"
+    PIT_KEEP_ALIVE = "5m"
+    SESSION_TTL_SECONDS = 300.0
+    ES_RETRY_SECONDS = 30.0  # auto mode: how long a failed Elasticsearch is skipped
+
     def __init__(
         self,
         config: Optional[ApplicationConfig] = None,
@@ -34,54 +80,248 @@ class SearchManager:
         candidate_provider: Optional[CandidateProvider] = None,
         weights: Optional[SearchRankWeights] = None,
         cache_ttl_seconds: float = 0.0,
+        vector_store: Optional[EmbeddingStore] = None,
+        cache_max_entries: int = 1024,
+        cache_max_bytes: int = 32 * 1024 * 1024,
+        event_bus: Optional[EventBus] = None,
+        autocomplete: Optional[PrefixIndex] = None,
+        local_index: Optional[LocalIndex] = None,
     ) -> None:
         self._cfg = config or ApplicationConfig()
         self._es = es_client
+        self._local = local_index
         self._provider = candidate_provider or (lambda q, n: ())
         self._weights = weights or SearchRankWeights()
         self._model: Optional[Any] = None
+        self._store = vector_store
+        self._exact = ExactSearchStrategy()
+        self._autocomplete = autocomplete
         self._ttl = max(0.0, float(cache_ttl_seconds))
-        self._cache: dict[tuple[str, int, Optional[str]], tuple[float, List[SearchResult]]] = {}
+        self._cache: ResultCache[CacheKey, List[SearchResult]] = ResultCache(
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes,
+            ttl_seconds=self._ttl,
+            sizer=self._results_nbytes,
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._es_probed = es_client is not None  # injected clients are trusted until they fail
+        self._es_down_until = 0.0
+        # Cursor sessions are snapshots, so they are not dropped on IndexUpdated
+        self._sessions: ResultCache[str, PageSession] = ResultCache(
+            max_entries=256,
+            max_bytes=cache_max_bytes,
+            ttl_seconds=self.SESSION_TTL_SECONDS,
+            sizer=lambda sess: sum(self._results_nbytes(r) for r in sess.legs.values()),
+            on_discard=lambda _sid, sess: self._close_pit(sess.pit_id),
+        )
+        if event_bus is not None:
+            event_bus.subscribe(IndexUpdated, lambda _evt: self.invalidate_cache())
 
     # ---- Public API ----
     def search(self, query: str, limit: int = 10, topic_filter: Optional[str] = None) -> List[SearchResult]:
-        key = (query, int(limit), topic_filter)
-        now = time.time()
-        if self._ttl > 0:
-            hit = self._cache.get(key)
-            if hit and now - hit[0] <= self._ttl:
-                return hit[1]
-        parts: List[SearchResult] = []
-
-        # Exact via ES
-        parts.extend(self._search_exact(query, limit, topic_filter=topic_filter))
-
-        # Fuzzy
-        if self._cfg.search_settings.enable_spelling_correction:
-            parts.extend(self._search_fuzzy(query, limit))
-
-        # Semantic
-        if self._cfg.search_settings.enable_ai_search:
-            parts.extend(self._search_semantic(query, limit))
-
-        # Merge by (document_id, page) keeping highest score
-        merged: dict[tuple[str, int], SearchResult] = {}
-        for r in parts:
-            key = (r.document_id, r.page_number)
-            if key not in merged or r.relevance_score > merged[key].relevance_score:
-                merged[key] = r
-
-        # Sort by score desc and trim
-        results = sorted(merged.values(), key=lambda r: r.relevance_score, reverse=True)
-        results = results[:limit]
+        return self.search_detailed(query, limit=limit, topic_filter=topic_filter).results
+
+    def search_detailed(self, query: str, limit: int = 10, topic_filter: Optional[str] = None) -> SearchOutcome:
+        """Run all enabled legs concurrently and report legs that timed out."""
+        cache_key: CacheKey = (query, int(limit), topic_filter)
+        generation = self._cache.generation  # before the legs read the index
         if self._ttl > 0:
-            self._cache[key] = (now, results)
-        return results
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return SearchOutcome(results=list(cached))
+
+        settings = self._cfg.search_settings
+        parts, timed_out = self._run_legs(self._build_legs(query, limit, topic_filter))
+        results = fuse(parts, self._weights, limit, method=settings.fusion_method, rrf_k=settings.rrf_k)
+        if self._ttl > 0 and not timed_out:
+            self._cache.put(cache_key, list(results), generation=generation)
+        return SearchOutcome(results=results, timed_out_legs=timed_out)
+
+    def search_page(
+        self,
+        query: str,
+        size: int = 10,
+        topic_filter: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> SearchPage:
+        """Return one page of results plus an opaque cursor for the next page.
+
+        The first call opens an Elasticsearch point-in-time and runs the fuzzy and
+        semantic legs once over `cursor_leg_window` candidates, caching their lists in
+        a server-side session. Each later page costs one `search_after` request of
+        `size` hits plus slicing the cached lists, however deep it is. Pages are ranked
+        by reciprocal rank so they can be merged without the full exact list.
+
+        The point-in-time is closed once the exact leg is exhausted, or with its
+        session when that expires or is evicted; requests on one cursor are serialised.
+
+        Raises `ValueError` for a malformed or expired cursor.
+        """
+        size = max(1, int(size))
+        settings = self._cfg.search_settings
+        timed_out: List[str] = []
+        self._sessions.expire()  # releases the PITs of abandoned sessions
+        if cursor is None:
+            paginate_exact = not (settings.enable_ai_search and settings.hybrid_search)
+            window = max(size, int(settings.cursor_leg_window))
+            legs = [leg for leg in self._build_legs(query, window, topic_filter) if leg[0] != self.LEG_EXACT]
+            parts, timed_out = self._run_legs(legs)
+            session = PageSession(query, topic_filter, parts, paginate_exact)
+            state = SearchCursor(session_id=uuid.uuid4().hex, exact_done=not paginate_exact)
+            if paginate_exact:
+                state.pit_id = session.pit_id = self._open_pit()
+            self._sessions.put(state.session_id, session)
+        else:
+            state = SearchCursor.decode(cursor)
+            found = self._sessions.get(state.session_id)
+            if found is None:
+                raise ValueError("search cursor expired")
+            session = found
+        with session.lock:
+            return self._next_page(session, state, size, timed_out)
+
+    def _next_page(self, session: PageSession, state: SearchCursor, size: int, timed_out: List[str]) -> SearchPage:
+        settings = self._cfg.search_settings
+        if not state.exact_done and state.pit_id is not None:
+            if session.pit_id is None:
+                # Replay of an older cursor after the PIT was closed: take a fresh snapshot
+                session.pit_id = self._open_pit()
+            state.pit_id = session.pit_id  # ES may have refreshed the id since
+        emitted = session.emitted_upto(state.emitted)
+        total_weight = sum(self._weights.for_leg(leg) for leg in session.legs)
+        if session.paginate_exact:
+            total_weight += self._weights.exact
+        page: List[SearchResult] = []
+        while len(page) < size:
+            windows: Dict[str, List[SearchResult]] = {
+                leg: results[state.offsets.get(leg, 0) : state.offsets.get(leg, 0) + size]
+                for leg, results in session.legs.items()
+            }
+            exact_sorts: List[Any] = []
+            if not state.exact_done:
+                windows[self.LEG_EXACT], exact_sorts, state.pit_id = self._exact_window(
+                    session.query, size, session.topic_filter, state.search_after, state.pit_id
+                )
+            if not any(windows.values()):
+                state.exact_done = True
+                break
+            starts = {leg: state.offsets.get(leg, 0) for leg in windows}
+            chunk, consumed = select_page(
+                windows, starts, emitted, self._weights, size - len(page), settings.rrf_k, total_weight
+            )
+            page.extend(chunk)
+            emitted.update((r.document_id, r.page_number) for r in chunk)
+            session.emitted_order.extend((r.document_id, r.page_number) for r in chunk)
+            for leg, n in consumed.items():
+                if leg != self.LEG_EXACT:
+                    state.offsets[leg] = state.offsets.get(leg, 0) + n
+                elif n > 0:
+                    state.search_after = exact_sorts[n - 1]
+            exact_window = windows.get(self.LEG_EXACT)
+            if exact_window is not None and len(exact_window) < size and consumed[self.LEG_EXACT] == len(exact_window):
+                state.exact_done = True
+            if not chunk and not any(consumed.values()):
+                break
+
+        if state.exact_done:
+            self._close_pit(session.pit_id)
+            session.pit_id = state.pit_id = None
+        else:
+            session.pit_id = state.pit_id
+        state.emitted = len(session.emitted_order)
+        more = not state.exact_done or any(state.offsets.get(leg, 0) < len(r) for leg, r in session.legs.items())
+        return SearchPage(results=page, next_cursor=state.encode() if more else None, timed_out_legs=timed_out)
+
+    def use_vector_store(self, store: Optional[EmbeddingStore], model: Optional[Any] = None) -> None:
+        """Switch semantic search to another store (and the model that encoded it).
+
+        Used after a re-encode swap; queries already running finish on the old pair.
+        """
+        if model is not None:
+            self._model = model
+        self._store = store
+        self.invalidate_cache()
+
+    def invalidate_cache(self) -> None:
+        """Drop all cached results (called automatically after reindexing)."""
+        self._cache.invalidate()
+
+    def cache_stats(self) -> CacheStats:
+        return self._cache.stats()
+
+    def close(self) -> None:
+        """Release the leg thread pool and open PITs (legs still running are not interrupted)."""
+        self._sessions.invalidate()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @staticmethod
+    def _results_nbytes(results: List[SearchResult]) -> int:
+        # Approximate footprint: strings dominate, plus a fixed per-object overhead
+        total = 64
+        for r in results:
+            total += 160 + len(r.document_id) + len(r.document_title) + len(r.snippet) + len(r.highlighted_text)
+        return total
+
+    # ---- Fan-out ----
+    def _build_legs(
+        self, query: str, limit: int, topic_filter: Optional[str]
+    ) -> List[Tuple[str, Callable[[], List[SearchResult]], float]]:
+        settings = self._cfg.search_settings
+        core_timeout = settings.core_search_timeout_ms / 1000.0
+        ai_timeout = float(settings.search_timeout_seconds)
+        legs: List[Tuple[str, Callable[[], List[SearchResult]], float]] = []
+        if settings.enable_ai_search and settings.hybrid_search:
+            legs.append((self.LEG_HYBRID, lambda: self._search_hybrid(query, limit, topic_filter), ai_timeout))
+        else:
+            legs.append(
+                (self.LEG_EXACT, lambda: self._search_exact(query, limit, topic_filter=topic_filter), core_timeout)
+            )
+        if settings.enable_spelling_correction:
+            legs.append((self.LEG_FUZZY, lambda: self._search_fuzzy(query, limit), core_timeout))
+        if settings.enable_ai_search and not settings.hybrid_search:
+            legs.append(
+                (self.LEG_SEMANTIC, lambda: self._search_semantic(query, limit, topic_filter=topic_filter), ai_timeout)
+            )
+        return legs
+
+    def _run_legs(
+        self, legs: Sequence[Tuple[str, Callable[[], List[SearchResult]], float]]
+    ) -> Tuple[Dict[str, List[SearchResult]], List[str]]:
+        executor = self._get_executor()
+        started = time.monotonic()
+        futures: List[Tuple[str, Future, float]] = [(name, executor.submit(fn), timeout) for name, fn, timeout in legs]
+        parts: Dict[str, List[SearchResult]] = {}
+        timed_out: List[str] = []
+        for name, fut, timeout in futures:
+            # Each leg has its own deadline measured from fan-out, not from the previous wait
+            remaining = None if timeout <= 0 else max(0.0, started + timeout - time.monotonic())
+            try:
+                # Legs return lists sorted by score; fusion relies on that ordering
+                parts[name] = sorted(fut.result(timeout=remaining), key=lambda r: r.relevance_score, reverse=True)
+            except FutureTimeout:
+                fut.cancel()
+                timed_out.append(name)
+            except Exception:
+                continue
+        return parts, timed_out
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            # Headroom beyond 3 so a leg stuck past its deadline does not starve the next query
+            self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="search-leg")
+        return self._executor
 
     def suggest(self, prefix: str, limit: int = 5) -> List[str]:
-        """Return simple auto-complete terms derived from provider texts."""
-        if not prefix:
+        """Return auto-complete terms, from the `PrefixIndex` when one is attached.
+
+        Without an index, terms are counted from provider texts on every call.
+        """
+        if not prefix or not self._cfg.search_settings.enable_auto_complete:
             return []
+        if self._autocomplete is not None and len(self._autocomplete) > 0:
+            return [term for term, _weight in self._autocomplete.complete(prefix, limit)]
         prefix_low = prefix.lower()
         seen: dict[str, int] = {}
         for _doc, text in self._provider(prefix, limit * 10):
@@ -93,107 +333,339 @@ class SearchManager:
 
     # ---- Exact ----
     def _search_exact(self, query: str, limit: int, topic_filter: Optional[str] = None) -> List[SearchResult]:
-        es = self._get_es()
-        if es is None:
-            return []
+        for backend in self._exact_backends():
+            try:
+                resp = backend.search(  # type: ignore[attr-defined]
+                    index=self.INDEX_NAME,
+                    size=limit,
+                    query=self._exact_query(query, topic_filter),
+                    highlight={"fields": {"content": {}}},
+                )
+            except Exception:
+                if backend is self._es:
+                    self._es_failed()
+                continue
+            return self._bm25_results(resp)
+        return []
+
+    def _exact_backends(self) -> List[Any]:
+        """Search clients for the exact leg, in the order they should be tried."""
+        mode = self._cfg.search_settings.exact_search_backend
+        backends: List[Any] = []
+        es = self._exact_es()
+        if es is not None:
+            backends.append(es)
+        if mode != "elasticsearch":
+            local = self._get_local_index()
+            if local is not None:
+                backends.append(local)
+        return backends
+
+    def _search_hybrid(self, query: str, limit: int, topic_filter: Optional[str] = None) -> List[SearchResult]:
+        """BM25 `query` plus `knn` in one request; ES sums the two scores per hit."""
+        es = self._exact_es()
+        model = self._get_model()
+        if es is None or model is None:
+            return self._search_exact(query, limit, topic_filter=topic_filter)
+        q_vec = np.asarray(model.encode([query], normalize_embeddings=True)[0], dtype=np.float32)
         try:
-            q: dict[str, Any] = {"multi_match": {"query": query, "fields": ["title^2", "content"]}}
-            if topic_filter:
-                q = {"bool": {"must": [q], "filter": [{"term": {"metadata.topic_path.keyword": topic_filter}}]}}
             resp = es.search(  # type: ignore[attr-defined]
-                index="documents",
+                index=self.INDEX_NAME,
                 size=limit,
-                query=q,
+                query=self._exact_query(query, topic_filter),
+                knn=self._knn_clause(q_vec, limit, topic_filter),
                 highlight={"fields": {"content": {}}},
+                source_excludes=["embedding"],
             )
         except Exception:
-            return []
+            self._es_failed()
+            return self._search_exact(query, limit, topic_filter=topic_filter)
+        return self._bm25_results(resp)
 
-        out: List[SearchResult] = []
-        for hit in resp.get("hits", {}).get("hits", []):
-            src = hit.get("_source", {})
-            title = src.get("title", "")
-            doc_id = hit.get("_id", src.get("file_path", title))
-            score = float(hit.get("_score", 0.0))
-            highlight_list = hit.get("highlight", {}).get("content", [])
-            snippet = highlight_list[0] if highlight_list else src.get("content", "")[:200]
-            out.append(
-                SearchResult(
-                    document_id=str(doc_id),
-                    document_title=title,
-                    page_number=0,
-                    snippet=snippet,
-                    relevance_score=min(1.0, score / 10.0) * self._weights.exact,  # normalize
-                    match_type=MatchType.EXACT,
-                    highlighted_text=snippet,
-                )
-            )
-        return out
+    def _exact_window(
+        self,
+        query: str,
+        size: int,
+        topic_filter: Optional[str],
+        search_after: Optional[List[Any]],
+        pit_id: Optional[str],
+    ) -> Tuple[List[SearchResult], List[Any], Optional[str]]:
+        """Next `size` exact hits after `search_after`, with their sort values."""
+        body: dict[str, Any] = {
+            "size": size,
+            "query": self._exact_query(query, topic_filter),
+            "highlight": {"fields": {"content": {}}},
+            "source_excludes": ["embedding"],
+        }
+        if pit_id:
+            body["pit"] = {"id": pit_id, "keep_alive": self.PIT_KEEP_ALIVE}
+            body["sort"] = [{"_score": "desc"}, {"_shard_doc": "asc"}]
+        else:
+            body["index"] = self.INDEX_NAME
+            body["sort"] = [
+                {"_score": "desc"},
+                {"document_id": {"order": "asc", "unmapped_type": "keyword"}},
+                {"page_number": {"order": "asc", "unmapped_type": "integer"}},
+                {"chunk_index": {"order": "asc", "unmapped_type": "integer"}},
+            ]
+        if search_after is not None:
+            body["search_after"] = search_after
+        for backend in self._exact_backends():
+            try:
+                resp = backend.search(**body)  # type: ignore[attr-defined]
+            except Exception:
+                if backend is self._es:
+                    self._es_failed()
+                continue
+            break
+        else:
+            return [], [], pit_id
+        hits = resp.get("hits", {}).get("hits", [])
+        # ES may hand back a refreshed PIT id; always continue with the latest one
+        return self._bm25_results(resp), [h.get("sort") for h in hits], resp.get("pit_id", pit_id)
+
+    def _open_pit(self) -> Optional[str]:
+        es = self._exact_es()
+        if es is None:
+            return None
+        try:
+            resp = es.open_point_in_time(index=self.INDEX_NAME, keep_alive=self.PIT_KEEP_ALIVE)  # type: ignore[attr-defined]
+            return str(resp["id"])
+        except Exception:
+            return None  # fall back to plain search_after without a snapshot
+
+    def _close_pit(self, pit_id: Optional[str]) -> None:
+        if not pit_id:
+            return
+        es = self._get_es()
+        if es is None:
+            return
+        try:
+            es.close_point_in_time(id=pit_id)  # type: ignore[attr-defined]
+        except Exception:
+            pass  # ES drops it after PIT_KEEP_ALIVE anyway
+
+    def _exact_query(self, query: str, topic_filter: Optional[str]) -> dict[str, Any]:
+        try:
+            q = self._exact.build_query(query)
+        except ValueError:
+            # Not an expression of the grammar (e.g. several bare words): match it as text
+            q = {"multi_match": {"query": query, "fields": list(ExactSearchStrategy.FIELDS)}}
+        if topic_filter:
+            q = {"bool": {"must": [q], "filter": [self._topic_term(topic_filter)]}}
+        return q
+
+    def _bm25_results(self, resp: dict[str, Any]) -> List[SearchResult]:
+        hits = resp.get("hits", {})
+        raw = hits.get("hits", [])
+        # BM25 scores are unbounded; scale by the best hit so the leg reports [0, 1]
+        max_score = hits.get("max_score") or max((float(h.get("_score") or 0.0) for h in raw), default=0.0)
+        denom = float(max_score) if max_score and max_score > 0 else 1.0
+        return [self._hit_to_result(hit, float(hit.get("_score") or 0.0) / denom) for hit in raw]
+
+    def _hit_to_result(
+        self, hit: dict[str, Any], score: float, match_type: MatchType = MatchType.EXACT
+    ) -> SearchResult:
+        src = hit.get("_source", {})
+        title = src.get("title", "")
+        # Chunk records carry `document_id`; older whole-document records only `_id`
+        doc_id = src.get("document_id") or hit.get("_id") or src.get("file_path", title)
+        highlight_list = hit.get("highlight", {}).get("content", [])
+        snippet = highlight_list[0] if highlight_list else src.get("content", "")[:200]
+        return SearchResult(
+            document_id=str(doc_id),
+            document_title=title,
+            page_number=int(src.get("page_number", 0)),
+            snippet=snippet,
+            relevance_score=min(1.0, max(0.0, score)),
+            match_type=match_type,
+            highlighted_text=snippet,
+        )
+
+    @staticmethod
+    def _topic_term(topic_filter: str) -> dict[str, Any]:
+        return {"term": {"metadata.topic_path.keyword": topic_filter}}
 
     # ---- Fuzzy ----
     def _search_fuzzy(self, query: str, limit: int) -> List[SearchResult]:
+        """Score query-sized token windows of each candidate and keep its best window.
+
+        All windows of all candidates are scored in one `process.cdist` call (with
+        `score_cutoff` from `fuzzy_accuracy_target` and `fuzzy_workers` threads); if
+        only `fuzz` is available the windows are scored in a loop instead.
+        """
         try:
             from rapidfuzz import fuzz  # type: ignore
         except Exception:
             return []
 
+        q = query.strip().lower()
+        if not q:
+            return []
+        n_tokens = len(q.split())
+        cands = list(self._provider(query, limit * 3))
+        windows: List[str] = []
+        spans: List[Tuple[int, int]] = []
+        bounds: List[Tuple[int, int]] = []  # per candidate: [first, last) window index
+        for _doc_id, text in cands:
+            first = len(windows)
+            for start, end in self._token_windows(text, n_tokens):
+                windows.append(text[start:end].lower())
+                spans.append((start, end))
+            bounds.append((first, len(windows)))
+        if not windows:
+            return []
+
+        target = float(self._cfg.search_settings.fuzzy_accuracy_target)
+        scores = self._score_windows(q, windows, target * 100.0, fuzz)
+        best: List[Tuple[float, int, int]] = []
+        for ci, (first, last) in enumerate(bounds):
+            if first == last:
+                continue
+            wi = first + int(np.argmax(scores[first:last]))
+            score = float(scores[wi]) / 100.0
+            if score >= target:
+                best.append((score, ci, wi))
+        best.sort(key=lambda b: b[0], reverse=True)
+
         results: List[SearchResult] = []
-        for doc_id, text in self._provider(query, limit * 3):
-            score = float(fuzz.ratio(query, text)) / 100.0
-            if score >= self._cfg.search_settings.fuzzy_accuracy_target:
-                snippet = text[:200]
-                results.append(
-                    SearchResult(
-                        document_id=str(doc_id),
-                        document_title=str(doc_id),
-                        page_number=0,
-                        snippet=snippet,
-                        relevance_score=score * self._weights.fuzzy,
-                        match_type=MatchType.FUZZY,
-                        highlighted_text=snippet,
-                    )
+        for score, ci, wi in best[:limit]:
+            doc_id, text = cands[ci]
+            start, end = spans[wi]
+            # A little context either side of the matched window, match wrapped like ES highlights
+            ctx_start, ctx_end = max(0, start - 60), min(len(text), end + 60)
+            highlighted = f"{text[ctx_start:start]}<em>{text[start:end]}</em>{text[end:ctx_end]}"
+            results.append(
+                SearchResult(
+                    document_id=str(doc_id),
+                    document_title=str(doc_id),
+                    page_number=0,
+                    snippet=text[start:end][:200],
+                    relevance_score=min(1.0, score),
+                    match_type=MatchType.FUZZY,
+                    highlighted_text=highlighted,
+                    offset=start,
                 )
-        return results[:limit]
+            )
+        return results
+
+    def _score_windows(self, query: str, windows: List[str], cutoff: float, fuzz: Any) -> np.ndarray:
+        try:
+            from rapidfuzz import process  # type: ignore
+
+            cdist = process.cdist
+        except Exception:
+            cdist = None
+        if cdist is not None:
+            workers = int(self._cfg.search_settings.fuzzy_workers)
+            matrix = cdist([query], windows, scorer=fuzz.ratio, score_cutoff=cutoff, workers=workers)
+            return np.asarray(matrix, dtype=np.float32)[0]
+        return np.asarray([float(fuzz.ratio(query, w)) for w in windows], dtype=np.float32)
+
+    @staticmethod
+    def _token_windows(text: str, size: int) -> Iterator[Tuple[int, int]]:
+        """Character spans of every run of `size` consecutive whitespace tokens."""
+        toks = [(m.start(), m.end()) for m in _TOKEN_RE.finditer(text)]
+        if not toks:
+            return
+        for i in range(max(1, len(toks) - size + 1)):
+            yield toks[i][0], toks[min(i + size, len(toks)) - 1][1]
 
     # ---- Semantic ----
-    def _search_semantic(self, query: str, limit: int) -> List[SearchResult]:
+    def _search_semantic(self, query: str, limit: int, topic_filter: Optional[str] = None) -> List[SearchResult]:
         model = self._get_model()
         if model is None:
             return []
         # Encode query once
-        q_vec = model.encode([query], normalize_embeddings=True)[0]
-        q_vec = [float(x) for x in q_vec]
+        q_vec = np.asarray(model.encode([query], normalize_embeddings=True)[0], dtype=np.float32)
+
+        mode = self._cfg.search_settings.semantic_retrieval
+        store = self._store if self._store is not None and len(self._store) > 0 else None
+        if mode == "elasticsearch" or (mode == "auto" and store is None):
+            knn_results = self._search_knn(q_vec, limit, topic_filter)
+            if knn_results is not None:
+                return knn_results
+            if mode == "elasticsearch" and store is None:
+                return []
+            # Elasticsearch unavailable: the local store (if any) answers instead
+
+        hits: List[Tuple[str, int, str, float]] = []
+        if store is not None:
+            seen: set[tuple[str, int]] = set()
+            # Rows are per chunk: over-fetch and keep the best chunk of each page
+            for rec, sim in store.search(q_vec, limit * 3):
+                page_key = (rec.document_id, rec.page_number)
+                if page_key not in seen and len(hits) < limit:
+                    seen.add(page_key)
+                    hits.append((rec.document_id, rec.page_number, rec.text, sim))
+        elif not self._cfg.search_settings.fallback_to_preencoded_only:
+            cands = list(self._provider(query, limit * 3))
+            if not cands:
+                return []
+            # One batched encode for all candidates, then a single top-k pass
+            d_mat = np.asarray(model.encode([t for _d, t in cands], normalize_embeddings=True), dtype=np.float32)
+            idx, sims = top_k_cosine(d_mat, q_vec, limit)
+            for i, sim in zip(idx.tolist(), sims.tolist()):
+                hits.append((cands[i][0], 0, cands[i][1], sim))
 
         results: List[SearchResult] = []
-        for doc_id, text in self._provider(query, limit * 3):
-            doc_vec = model.encode([text], normalize_embeddings=True)[0]
-            doc_vec = [float(x) for x in doc_vec]
-            sim = self._cosine(q_vec, doc_vec)
+        for doc_id, page, text, sim in hits:
             if sim >= self._cfg.search_settings.semantic_similarity_threshold:
                 snippet = text[:200]
                 results.append(
                     SearchResult(
                         document_id=str(doc_id),
                         document_title=str(doc_id),
-                        page_number=0,
+                        page_number=page,
                         snippet=snippet,
-                        relevance_score=sim * self._weights.semantic,
+                        relevance_score=min(1.0, max(0.0, sim)),
                         match_type=MatchType.SEMANTIC,
                         highlighted_text=snippet,
                     )
                 )
-        return results[:limit]
+        return results
 
-    @staticmethod
-    def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
-        import math
+    def _search_knn(
+        self, q_vec: np.ndarray, limit: int, topic_filter: Optional[str] = None
+    ) -> Optional[List[SearchResult]]:
+        """Approximate kNN over the indexed `embedding` field; None when ES is unavailable."""
+        es = self._exact_es()
+        if es is None:
+            return None
+        try:
+            resp = es.search(  # type: ignore[attr-defined]
+                index=self.INDEX_NAME,
+                size=limit,
+                knn=self._knn_clause(q_vec, limit, topic_filter),
+                source_excludes=["embedding"],
+            )
+        except Exception:
+            self._es_failed()
+            return None
+        threshold = self._cfg.search_settings.semantic_similarity_threshold
+        results: List[SearchResult] = []
+        seen: set[tuple[str, int]] = set()
+        for hit in resp.get("hits", {}).get("hits", []):
+            # For cosine fields ES reports (1 + cos) / 2
+            sim = 2.0 * float(hit.get("_score", 0.0)) - 1.0
+            if sim < threshold:
+                continue
+            r = self._hit_to_result(hit, sim, MatchType.SEMANTIC)
+            if (r.document_id, r.page_number) not in seen:
+                seen.add((r.document_id, r.page_number))
+                results.append(r)
+        return results
 
-        num = sum(x * y for x, y in zip(a, b))
-        da = math.sqrt(sum(x * x for x in a))
-        db = math.sqrt(sum(y * y for y in b))
-        if da == 0 or db == 0:
-            return 0.0
-        return float(num / (da * db))
+    def _knn_clause(self, q_vec: np.ndarray, limit: int, topic_filter: Optional[str]) -> dict[str, Any]:
+        knn: dict[str, Any] = {
+            "field": "embedding",
+            "query_vector": q_vec.tolist(),
+            "k": int(limit),
+            "num_candidates": max(int(limit), int(self._cfg.search_settings.knn_num_candidates)),
+        }
+        if topic_filter:
+            knn["filter"] = self._topic_term(topic_filter)
+        return knn
 
     # ---- Lazy deps ----
     def _get_es(self) -> Optional[Any]:
@@ -209,13 +681,55 @@ class SearchManager:
         except Exception:
             return None
 
+    def _exact_es(self) -> Optional[Any]:
+        """Elasticsearch for exact queries, or None when `exact_search_backend` skips it."""
+        mode = self._cfg.search_settings.exact_search_backend
+        if mode == "local":
+            return None
+        es = self._get_es()
+        if es is None or mode == "elasticsearch":
+            return es
+        if time.monotonic() < self._es_down_until:
+            return None
+        if not self._es_probed:
+            # Building a client never connects; find out once instead of on every query
+            ping = getattr(es, "ping", None)
+            try:
+                alive = ping is None or bool(ping())
+            except Exception:
+                alive = False
+            if not alive:
+                self._es_failed()
+                return None
+            self._es_probed = True
+        return es
+
+    def _es_failed(self) -> None:
+        if self._cfg.search_settings.exact_search_backend == "auto":
+            self._es_probed = False  # ping again once the back-off is over
+            self._es_down_until = time.monotonic() + self.ES_RETRY_SECONDS
+
+    def _get_local_index(self) -> Optional[LocalIndex]:
+        if self._local is not None:
+            return self._local
+        try:
+            from cross_ide_path_utils import PathResolver
+
+            directory = PathResolver().get_cache_path("local_index")
+        except Exception:
+            return None
+        # `auto` only picks up an index that was actually built; `local` starts empty
+        if self._cfg.search_settings.exact_search_backend == "local" or (directory / "segments.json").exists():
+            self._local = LocalIndex.open(directory)
+        return self._local
+
     def _get_model(self) -> Optional[Any]:
         if self._model is not None:
             return self._model
         try:
             from sentence_transformers import SentenceTransformer  # type: ignore
 
-            self._model = SentenceTransformer("all-MiniLM-L6-v2")
+            self._model = SentenceTransformer(self._cfg.search_settings.embedding_model)
             return self._model
         except Exception:
             return None
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import heapq
+import json
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from src.core.models.search import SearchResult
+from src.core.search.fusion import ResultKey, SearchRankWeights
+
+
+@dataclass(slots=True)
+class SearchCursor:
+    """Position of a paginated search, serialised into an opaque token.
+
+    - `offsets`: how far each cached leg (fuzzy/semantic/hybrid) has been consumed.
+    - `search_after` / `pit_id`: where the exact leg resumes in Elasticsearch.
+    - `emitted`: number of results already returned, so replaying a token is idempotent.
+    """
+
+    session_id: str
+    offsets: Dict[str, int] = field(default_factory=dict)
+    emitted: int = 0
+    search_after: Optional[List[Any]] = None
+    pit_id: Optional[str] = None
+    exact_done: bool = False
+
+    def encode(self) -> str:
+        raw = {
+            "s": self.session_id,
+            "o": self.offsets,
+            "e": self.emitted,
+            "a": self.search_after,
+            "p": self.pit_id,
+            "d": self.exact_done,
+        }
+        data = json.dumps(raw, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "SearchCursor":
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return cls(
+                session_id=str(raw["s"]),
+                offsets={str(k): int(v) for k, v in dict(raw.get("o") or {}).items()},
+                emitted=int(raw.get("e", 0)),
+                search_after=raw.get("a"),
+                pit_id=raw.get("p"),
+                exact_done=bool(raw.get("d", False)),
+            )
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError, AttributeError) as exc:
+            raise ValueError("invalid search cursor") from exc
+
+
+@dataclass(slots=True)
+class SearchPage:
+    results: List[SearchResult] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    timed_out_legs: List[str] = field(default_factory=list)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.timed_out_legs)
+
+
+@dataclass(slots=True)
+class PageSession:
+    """Server-side state behind a cursor: cached leg lists and what was already returned.
+
+    `lock` serialises requests on the same session; `pit_id` is the open
+    point-in-time (None once closed).
+    """
+
+    query: str
+    topic_filter: Optional[str]
+    legs: Dict[str, List[SearchResult]]
+    paginate_exact: bool
+    emitted_order: List[ResultKey] = field(default_factory=list)
+    pit_id: Optional[str] = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def emitted_upto(self, count: int) -> Set[ResultKey]:
+        # A replayed (older) cursor forgets anything returned after it was issued
+        del self.emitted_order[count:]
+        return set(self.emitted_order)
+
+
+def select_page(
+    windows: Mapping[str, Sequence[SearchResult]],
+    start_ranks: Mapping[str, int],
+    emitted: Set[ResultKey],
+    weights: SearchRankWeights,
+    size: int,
+    rrf_k: int = 60,
+    total_weight: float = 0.0,
+) -> Tuple[List[SearchResult], Dict[str, int]]:
+    """Pick the next `size` results from each leg's next window by reciprocal rank.
+
+    `start_ranks[leg]` is the global rank of the window's first item, so scores match
+    what RRF over the full lists would assign. Returns the page and, per leg, how many
+    leading window items are now consumed (returned on this or an earlier page).
+    """
+    acc: Dict[ResultKey, Tuple[float, float, SearchResult]] = {}
+    for leg, window in windows.items():
+        weight = max(0.0, weights.for_leg(leg))
+        base = start_ranks.get(leg, 0)
+        seen: Set[ResultKey] = set()
+        for i, r in enumerate(window):
+            key = (r.document_id, r.page_number)
+            if key in emitted or key in seen:
+                continue  # other chunks of a page rank below its best one
+            seen.add(key)
+            contribution = weight / (rrf_k + base + i + 1)
+            score, best, best_r = acc.get(key, (0.0, -1.0, r))
+            if contribution > best:
+                best, best_r = contribution, r
+            acc[key] = (score + contribution, best, best_r)
+
+    ranked = heapq.nlargest(max(0, size), acc.items(), key=lambda kv: kv[1][0])
+    scale = (rrf_k + 1) / total_weight if total_weight > 0 else 1.0
+    page = [replace(best_r, relevance_score=min(1.0, score * scale)) for _key, (score, _b, best_r) in ranked]
+    taken = emitted | {key for key, _ in ranked}
+
+    consumed: Dict[str, int] = {}
+    for leg, window in windows.items():
+        n = 0
+        while n < len(window) and (window[n].document_id, window[n].page_number) in taken:
+            n += 1
+        consumed[leg] = n
+    return page, consumed
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:  # pragma: no cover
+    from src.core.search.vector_store import EmbeddingStore
+
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+_BLOCK_ROWS = 65536  # bounds the float temporaries of one scoring pass
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def quantize_int8(mat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 codes and the float32 scale that restores each row."""
+    mat = np.asarray(mat, dtype=np.float32)
+    scales = np.abs(mat).max(axis=1) / 127.0
+    scales[scales == 0.0] = 1.0
+    codes = np.rint(mat / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def pack_signs(mat: np.ndarray) -> np.ndarray:
+    """One bit per dimension (1 = positive), packed 8 per byte."""
+    return np.packbits(np.asarray(mat) > 0, axis=-1)
+
+
+def hamming_distances(codes: np.ndarray, query_bits: np.ndarray) -> np.ndarray:
+    """Bits differing between each packed row of `codes` and `query_bits`."""
+    xor = np.bitwise_xor(codes, query_bits)
+    count = getattr(np, "bitwise_count", None)  # NumPy >= 2.0
+    if count is not None:
+        return count(xor).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT[xor].sum(axis=1, dtype=np.int32)
+
+
+class QuantizedRows:
+    """Quantised codes of a store's rows, kept row-aligned with the store's labels.
+
+    - "int8": per-row scaled int8 codes, 4x smaller than float32; scores are the
+      dequantised inner product and typically rank like the float scores.
+    - "binary": sign bits, 32x smaller; scores are the SimHash cosine estimate
+      `cos(pi * hamming / dim)`, good enough to pre-filter candidates for rescoring.
+    """
+
+    def __init__(self, mode: str, dim: int, capacity: int) -> None:
+        if mode not in ("int8", "binary"):
+            raise ValueError("quantization must be one of: int8, binary")
+        self.mode = mode
+        self.dim = int(dim)
+        width = self.dim if mode == "int8" else (self.dim + 7) // 8
+        self.codes = np.zeros((max(1, int(capacity)), width), dtype=np.int8 if mode == "int8" else np.uint8)
+        self.scales = np.ones(self.codes.shape[0], dtype=np.float32)
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return int(self.codes.shape[1] * self.codes.itemsize + (4 if self.mode == "int8" else 0))
+
+    def resize(self, capacity: int) -> None:
+        old = self.codes.shape[0]
+        self.codes = np.resize(self.codes, (capacity, self.codes.shape[1]))
+        self.scales = np.resize(self.scales, capacity)
+        if capacity > old:
+            self.codes[old:] = 0
+            self.scales[old:] = 1.0
+
+    def set(self, rows: Sequence[int], mat: np.ndarray) -> None:
+        if self.mode == "int8":
+            codes, scales = quantize_int8(mat)
+            self.codes[rows] = codes
+            self.scales[rows] = scales
+        else:
+            self.codes[rows] = pack_signs(mat)
+
+    def move(self, src: int, dst: int) -> None:
+        self.codes[dst] = self.codes[src]
+        self.scales[dst] = self.scales[src]
+
+    def scores(self, query: np.ndarray, size: int) -> np.ndarray:
+        """Approximate cosine of the first `size` rows against a unit `query`."""
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        out = np.empty(size, dtype=np.float32)
+        for start in range(0, size, _BLOCK_ROWS):
+            stop = min(size, start + _BLOCK_ROWS)
+            out[start:stop] = self._score(self.codes[start:stop], self.scales[start:stop], q)
+        return out
+
+    def scores_rows(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Approximate cosine of `rows` (e.g. ANN candidates) against a unit `query`."""
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        rows = np.asarray(rows, dtype=np.int64)
+        out = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), _BLOCK_ROWS):
+            block = rows[start : start + _BLOCK_ROWS]
+            out[start : start + len(block)] = self._score(self.codes[block], self.scales[block], q)
+        return out
+
+    def _score(self, codes: np.ndarray, scales: np.ndarray, q: np.ndarray) -> np.ndarray:
+        if self.mode == "binary":
+            return np.cos(np.pi * hamming_distances(codes, pack_signs(q)) / self.dim)
+        return (codes.astype(np.float32) @ q) * scales
+
+
+@dataclass(slots=True)
+class RecallReport:
+    mode: str
+    k: int
+    queries: int
+    recall: float  # mean |quantised top-k ∩ float top-k| / k
+    rescore_multiplier: int
+    bytes_per_vector: int
+    float_bytes_per_vector: int
+
+
+def measure_recall(
+    store: "EmbeddingStore",
+    queries: np.ndarray,
+    k: int = 10,
+    rescore_multiplier: Optional[int] = None,
+) -> RecallReport:
+    """Recall@k of the store's quantised search against the exact float search."""
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    hits: List[float] = []
+    for q in queries:
+        exact = {(r.document_id, r.page_number, r.chunk_index) for r, _ in store.search(q, k, exact=True)}
+        if not exact:
+            continue
+        approx = store.search(q, k, rescore=rescore_multiplier)
+        found = sum((r.document_id, r.page_number, r.chunk_index) in exact for r, _ in approx)
+        hits.append(found / len(exact))
+    mult = store.rescore_multiplier if rescore_multiplier is None else int(rescore_multiplier)
+    return RecallReport(
+        mode=store.quantization,
+        k=int(k),
+        queries=len(hits),
+        recall=float(np.mean(hits)) if hits else math.nan,
+        rescore_multiplier=mult,
+        bytes_per_vector=store.bytes_per_vector,
+        float_bytes_per_vector=store.dim * 4,
+    )
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+MANIFEST_FILE = "segments.json"
+
+
+@dataclass(slots=True)
+class TieredMergePolicy:
+    """Chooses which immutable segments to compact, Lucene-style.
+
+    - Segments are bucketed into tiers by live size: tier `t` holds sizes in
+      `[floor * per_tier**t, floor * per_tier**(t+1))`. Once a tier holds
+      `segments_per_tier` segments, its smallest `max_merge_at_once` are merged into
+      one segment of the next tier, so the segment count stays O(log corpus).
+    - A segment whose tombstoned fraction exceeds `deletes_pct_allowed` is rewritten
+      on its own to reclaim space.
+    """
+
+    segments_per_tier: int = 8
+    max_merge_at_once: int = 8
+    floor_docs: int = 64
+    deletes_pct_allowed: float = 0.33
+
+    def select(self, live: Sequence[int], total: Sequence[int]) -> List[int]:
+        """Indices of the segments to merge next (empty when nothing is due)."""
+        per_tier = max(2, int(self.segments_per_tier))
+        floor = max(1, int(self.floor_docs))
+        tiers: Dict[int, List[int]] = {}
+        for i, n in enumerate(live):
+            tier = int(math.log(max(n, floor) / floor, per_tier))
+            tiers.setdefault(tier, []).append(i)
+        for tier in sorted(tiers):
+            members = tiers[tier]
+            if len(members) >= per_tier:
+                members.sort(key=lambda i: live[i])
+                return sorted(members[: max(2, int(self.max_merge_at_once))])
+        for i, (n_live, n_total) in enumerate(zip(live, total)):
+            if n_total and (n_total - n_live) / n_total > self.deletes_pct_allowed:
+                return [i]
+        return []
+
+
+class BackgroundMerger:
+    """Daemon thread running `merge_once` until it reports nothing left to merge.
+
+    `request()` is cheap and coalesces: commits call it after every flush and the
+    thread wakes once to drain all due merges.
+    """
+
+    def __init__(self, merge_once: Callable[[], bool], name: str = "segment-merger") -> None:
+        self._merge_once = merge_once
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def request(self) -> None:
+        self._idle.clear()
+        self._wake.set()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        return self._idle.wait(timeout)
+
+    def close(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                while not self._stop.is_set() and self._merge_once():
+                    pass
+            except Exception:
+                # A failed merge leaves the old segments in place; never kill the thread
+                pass
+            if not self._wake.is_set():
+                self._idle.set()
+
+
+# ---------- Files ----------
+def save_tombstones(path: Path, deleted: np.ndarray) -> None:
+    """Persist a deletion bitmap packed to one bit per row."""
+    np.save(path, np.packbits(np.asarray(deleted, dtype=bool)))
+
+
+def load_tombstones(path: Optional[Path], rows: int) -> np.ndarray:
+    if path is None or not path.exists():
+        return np.zeros(rows, dtype=bool)
+    return np.unpackbits(np.load(path), count=rows).astype(bool)
+
+
+def write_manifest(directory: Path, data: Dict[str, Any]) -> None:
+    """Atomically replace the manifest; readers see either generation, never a mix."""
+    tmp = directory / (MANIFEST_FILE + ".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, directory / MANIFEST_FILE)
+
+
+def read_manifest(directory: Path) -> Optional[Dict[str, Any]]:
+    path = Path(directory) / MANIFEST_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
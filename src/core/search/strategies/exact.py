@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import json
 import re
+import threading
 from dataclasses import dataclass
-from typing import Any, List, Optional, Sequence, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.core.performance.lru_cache import LRUCache
 
 
 @dataclass(slots=True)
@@ -13,6 +17,20 @@ class _Node:
 @dataclass(slots=True)
 class _Term(_Node):
     value: str
+    field: Optional[str] = None  # None = all of FIELDS
+
+
+@dataclass(slots=True)
+class _Phrase(_Node):
+    value: str
+    field: Optional[str] = None
+    slop: int = 0  # "a b"~N: terms may be up to N positions apart
+
+
+@dataclass(slots=True)
+class _Prefix(_Node):
+    value: str
+    field: Optional[str] = None
 
 
 @dataclass(slots=True)
@@ -22,31 +40,58 @@ class _Not(_Node):
 
 @dataclass(slots=True)
 class _And(_Node):
-    left: _Node
-    right: _Node
+    children: Tuple[_Node, ...]
 
 
 @dataclass(slots=True)
 class _Or(_Node):
-    left: _Node
-    right: _Node
+    children: Tuple[_Node, ...]
 
 
 class ExactSearchStrategy:
-    """Parses boolean expressions and builds Elasticsearch queries (req 1.1, 4.4, 5.1)."""
+    """Parses boolean expressions and builds Elasticsearch queries (req 1.1, 4.4, 5.1).
+
+    Grammar: `AND`/`OR`/`NOT`, parentheses, bare terms, `"phrases"`, proximity
+    `"a b"~N`, trailing-wildcard `prefix*`, and field scoping (`title:x`,
+    `title:"a b"`, `path:docs*`) for the fields in `FIELD_ALIASES`.
+
+    Parsed expressions are simplified (nested AND/OR chains flattened into one
+    `must`/`should` array, double NOT removed, duplicate operands dropped) and the
+    resulting ES body is kept in a bounded LRU keyed by the whitespace-normalised
+    expression, so repeated queries skip tokenising and parsing entirely.
+    """
 
     FIELDS: Tuple[str, ...] = ("title^2", "content")
+    FIELD_ALIASES: Dict[str, str] = {
+        "title": "title",
+        "content": "content",
+        "path": "file_path",
+        "file": "file_path",
+        "topic": "metadata.topic_path.keyword",
+    }
+    KEYWORD_FIELDS: Tuple[str, ...] = ("file_path", "metadata.topic_path.keyword")
 
-    def __init__(self) -> None:
+    def __init__(self, plan_cache_size: int = 256) -> None:
         self._token_re = re.compile(
-            r"\s*(\()|\s*(\))|\s*(AND|OR|NOT)\b|\s*\"([^\"]+)\"|\s*([^\s\)\(]+)",
+            r"\s*(\()|\s*(\))|\s*(AND|OR|NOT)\b"
+            r"|\s*(?:([A-Za-z_][\w.]*):)?\"([^\"]+)\"(?:~(\d+))?"
+            r"|\s*([^\s\)\(]+)",
             re.IGNORECASE,
         )
+        # Plans are stored as JSON so every caller gets its own (cheaply decoded) copy
+        self._plans: LRUCache[str, str] = LRUCache(plan_cache_size)
+        self._plans_lock = threading.Lock()
 
     # ---------- Public API ----------
     def build_query(self, expression: str) -> dict:
-        root = self._parse(expression)
-        return self._to_es(root)
+        key = " ".join(expression.split())
+        with self._plans_lock:
+            plan = self._plans.get(key)
+        if plan is None:
+            plan = json.dumps(self._to_es(self._simplify(self._parse(key))))
+            with self._plans_lock:
+                self._plans.put(key, plan)
+        return json.loads(plan)
 
     def search(self, es_client: Any, index: str, expression: str, size: int = 10) -> dict:
         body = {
@@ -57,8 +102,9 @@ class ExactSearchStrategy:
         return es_client.search(index=index, **body)
 
     # ---------- Parsing ----------
-    def _tokenize(self, s: str) -> List[str]:
-        tokens: List[str] = []
+    def _tokenize(self, s: str) -> List[Union[str, _Node]]:
+        """Split into operator/parenthesis strings and ready-made operand nodes."""
+        tokens: List[Union[str, _Node]] = []
         pos = 0
         while pos < len(s):
             m = self._token_re.match(s, pos)
@@ -71,15 +117,32 @@ class ExactSearchStrategy:
                 tokens.append(")")
             elif m.group(3):
                 tokens.append(m.group(3).upper())
-            elif m.group(4):
-                tokens.append(m.group(4))
             elif m.group(5):
-                tokens.append(m.group(5))
+                field = self._resolve_field(m.group(4)) if m.group(4) else None
+                tokens.append(_Phrase(m.group(5), field, int(m.group(6) or 0)))
+            elif m.group(7):
+                tokens.append(self._word_node(m.group(7)))
             else:
                 # Only whitespace matched; advance
                 continue
         return tokens
 
+    def _word_node(self, word: str) -> _Node:
+        field: Optional[str] = None
+        name, sep, rest = word.partition(":")
+        # Unknown prefixes (URLs, times like 10:30) stay part of a plain term
+        if sep and rest and name.lower() in self.FIELD_ALIASES:
+            field, word = self.FIELD_ALIASES[name.lower()], rest
+        if word.endswith("*"):
+            return _Prefix(word.rstrip("*"), field)
+        return _Term(word, field)
+
+    def _resolve_field(self, name: str) -> str:
+        field = self.FIELD_ALIASES.get(name.lower())
+        if field is None:
+            raise ValueError(f"Unknown field '{name}'")
+        return field
+
     def _parse(self, s: str) -> _Node:
         tokens = self._tokenize(s)
         if not tokens:
@@ -102,12 +165,14 @@ class ExactSearchStrategy:
                     raise ValueError(f"{op} missing operands")
                 right = output.pop()
                 left = output.pop()
-                output.append(_And(left, right) if op == "AND" else _Or(left, right))
+                output.append(_And((left, right)) if op == "AND" else _Or((left, right)))
 
         i = 0
         while i < len(tokens):
             t = tokens[i]
-            if t == "(":
+            if isinstance(t, _Node):
+                output.append(t)
+            elif t == "(":
                 ops.append(t)
             elif t == ")":
                 while ops and ops[-1] != "(":
@@ -115,12 +180,13 @@ class ExactSearchStrategy:
                 if not ops:
                     raise ValueError("Mismatched parenthesis")
                 ops.pop()  # remove '('
-            elif t in ("AND", "OR", "NOT"):
+            elif t == "NOT":
+                # Unary prefix operator: nothing on the stack can be applied yet (NOT NOT x)
+                ops.append(t)
+            elif t in ("AND", "OR"):
                 while ops and ops[-1] in ("AND", "OR", "NOT") and prec(ops[-1]) >= prec(t):
                     apply_op(ops.pop())
                 ops.append(t)
-            else:
-                output.append(_Term(t))
             i += 1
 
         while ops:
@@ -133,15 +199,60 @@ class ExactSearchStrategy:
             raise ValueError("Invalid expression")
         return output[0]
 
+    # ---------- Simplification ----------
+    def _simplify(self, node: _Node) -> _Node:
+        if isinstance(node, _Not):
+            child = self._simplify(node.child)
+            return child.child if isinstance(child, _Not) else _Not(child)
+        if isinstance(node, (_And, _Or)):
+            kind = type(node)
+            flat: List[_Node] = []
+            for child in node.children:
+                child = self._simplify(child)
+                # (a AND b) AND c -> AND(a, b, c); same for OR
+                for leaf in child.children if isinstance(child, kind) else (child,):
+                    if leaf not in flat:
+                        flat.append(leaf)
+            return flat[0] if len(flat) == 1 else kind(tuple(flat))
+        return node
+
     # ---------- ES conversion ----------
     def _to_es(self, node: _Node) -> dict:
-        if isinstance(node, _Term):
-            return {"multi_match": {"query": node.value, "fields": list(self.FIELDS)}}
+        if isinstance(node, (_Term, _Phrase, _Prefix)):
+            return self._leaf_to_es(node)
         if isinstance(node, _Not):
-            return {"bool": {"must_not": [self._to_es(node.child)]}}
+            # NOT (a OR b) == must_not [a, b]
+            negated = node.child.children if isinstance(node.child, _Or) else (node.child,)
+            return {"bool": {"must_not": [self._to_es(c) for c in negated]}}
         if isinstance(node, _And):
-            return {"bool": {"must": [self._to_es(node.left), self._to_es(node.right)]}}
+            return {"bool": {"must": [self._to_es(c) for c in node.children]}}
         if isinstance(node, _Or):
-            return {"bool": {"should": [self._to_es(node.left), self._to_es(node.right)], "minimum_should_match": 1}}
+            return {"bool": {"should": [self._to_es(c) for c in node.children], "minimum_should_match": 1}}
         raise TypeError("Unknown node type")
 
+    def _leaf_to_es(self, node: Union[_Term, _Phrase, _Prefix]) -> dict:
+        """Compile a leaf to the narrowest clause: exact `term` on keyword fields, a
+        single-field `match*` when scoped, `multi_match` only for unscoped leaves."""
+        field = node.field
+        if isinstance(node, _Prefix):
+            if not node.value:
+                return {"match_all": {}}
+            if field is None:
+                return {"multi_match": {"query": node.value, "type": "bool_prefix", "fields": list(self.FIELDS)}}
+            return {"prefix": {field: {"value": node.value, "case_insensitive": True}}}
+        if field in self.KEYWORD_FIELDS:
+            return {"term": {field: node.value}}
+        if isinstance(node, _Phrase):
+            if field is None:
+                clause: Dict[str, Any] = {"query": node.value, "type": "phrase", "fields": list(self.FIELDS)}
+                if node.slop:
+                    clause["slop"] = node.slop
+                return {"multi_match": clause}
+            body: Dict[str, Any] = {"query": node.value}
+            if node.slop:
+                body["slop"] = node.slop
+            return {"match_phrase": {field: body}}
+        if field is None:
+            return {"multi_match": {"query": node.value, "fields": list(self.FIELDS)}}
+        return {"match": {field: node.value}}
+
@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from typing import Any, Callable, Iterable, List, Sequence, Tuple
 
 from src.core.models.configuration import ApplicationConfig, SearchSettings
+from src.core.search.vocabulary import Vocabulary, best_correction, rank_candidates
 
 
 CorpusProvider = Callable[[], Sequence[str]]
@@ -14,20 +15,27 @@ class FuzzyConfig:
     fields: Tuple[str, ...] = ("title^2", "content")
     fuzziness: str | int = "AUTO"
     prefix_length: int = 0
+    max_candidates: int = 200  # vocabulary terms scored per suggested word
 
 
 class FuzzySearchStrategy:
-    """Elasticsearch fuzzy search with rapidfuzz-based spelling suggestions (req 1.1, 1.4, 1.5)."""
+    """Elasticsearch fuzzy search with rapidfuzz-based spelling suggestions (req 1.1, 1.4, 1.5).
+
+    With a `Vocabulary` attached, suggestions score only the trigram candidates of each
+    word instead of the whole corpus from `corpus_provider`.
+    """
 
     def __init__(
         self,
         app_config: ApplicationConfig | None = None,
         corpus_provider: CorpusProvider | None = None,
         fuzzy_config: FuzzyConfig | None = None,
+        vocabulary: Vocabulary | None = None,
     ) -> None:
         self._cfg = app_config.search_settings if app_config else SearchSettings()
         self._fuzzy = fuzzy_config or FuzzyConfig()
         self._corpus_provider = corpus_provider or (lambda: ())
+        self._vocab = vocabulary
 
     # ---------- ES query ----------
     def build_query(self, text: str) -> dict:
@@ -50,6 +58,8 @@ class FuzzySearchStrategy:
 
     # ---------- Suggestions ----------
     def suggest(self, text: str, limit: int = 5) -> List[Tuple[str, float]]:
+        if self._vocab is not None and len(self._vocab) > 0:
+            return self._suggest_from_vocabulary(self._vocab, text, limit)
         try:
             from rapidfuzz import process, fuzz  # type: ignore
         except Exception:
@@ -66,6 +76,27 @@ class FuzzySearchStrategy:
                 out.append((cand, conf))
         return out
 
+    def _suggest_from_vocabulary(self, vocab: Vocabulary, text: str, limit: int) -> List[Tuple[str, float]]:
+        target = float(self._cfg.fuzzy_accuracy_target)
+        edits = int(self._cfg.fuzzy_edit_distance)
+        words = text.split()
+        if len(words) == 1:
+            cands = vocab.candidates(words[0], max_edits=edits, limit=self._fuzzy.max_candidates)
+            return [(t, c) for t, c in rank_candidates(words[0], cands, limit) if c >= target]
+        # Phrases: correct each unknown word independently; the weakest word bounds confidence
+        fixed: List[str] = []
+        conf = 1.0
+        for word in words:
+            if word in vocab:
+                fixed.append(word)
+                continue
+            best = best_correction(vocab, word, max_edits=edits, limit=self._fuzzy.max_candidates)
+            if best is None:
+                return []
+            fixed.append(best[0])
+            conf = min(conf, best[1])
+        return [(" ".join(fixed), conf)] if conf >= target else []
+
     def confidence(self, a: str, b: str) -> float:
         try:
             from rapidfuzz import fuzz  # type: ignore
@@ -2,10 +2,14 @@ from __future__ import annotations
 
 from collections import OrderedDict
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
 
+import numpy as np
+
 from src.core.models.configuration import ApplicationConfig, SearchSettings
-from src.core.performance.numba_ops import cosine_similarity_numba
+from src.core.performance.numba_ops import top_k_cosine
+from src.core.search.vector_store import EmbeddingStore
 
 
 CandidateProvider = Callable[[str, int], Sequence[Tuple[str, str]]]
@@ -16,6 +20,9 @@ class SemanticConfig:
     model_name: str = "all-MiniLM-L6-v2"
     threshold: float = 0.7
     cache_size: int = 1000
+    ann_effort: Optional[int] = None  # nprobe/ef passed to an ANN-backed store
+    quantization: Optional[str] = None  # "none" | "int8" | "binary" for `open_store`; None = float
+    rescore_multiplier: int = 4  # quantised stores float-rescore k * this candidates
 
 
 class EmbeddingCache:
@@ -38,7 +45,15 @@ class EmbeddingCache:
 
 
 class SemanticSearchStrategy:
-    """Semantic search using sentence-transformers with GPU/CPU fallback and caching (req 1.2, 4.1)."""
+    """Semantic search using sentence-transformers with GPU/CPU fallback and caching (req 1.2, 4.1).
+
+    When an `EmbeddingStore` populated at indexing time is provided, a query costs one
+    encode of the query plus one matrix-vector product (or an ANN lookup when the store
+    has an attached `AnnIndex`); the candidate provider is only used as a fallback when
+    the store is empty. A store passed in is used as-is; `open_store` loads one with
+    `SemanticConfig.quantization` (int8 or binary codes, see `EmbeddingStore`) to cut
+    its memory footprint.
+    """
 
     def __init__(
         self,
@@ -47,18 +62,28 @@ class SemanticSearchStrategy:
         sem_config: Optional[SemanticConfig] = None,
         embedding_cache: Optional[EmbeddingCache] = None,
         model: Optional[Any] = None,
+        vector_store: Optional[EmbeddingStore] = None,
     ) -> None:
         self._settings: SearchSettings = (app_config.search_settings if app_config else SearchSettings())
         self._conf = sem_config or SemanticConfig(threshold=self._settings.semantic_similarity_threshold)
         self._provider = candidate_provider or (lambda q, n: ())
         self._cache = embedding_cache or EmbeddingCache(self._conf.cache_size)
         self._model = model  # allow injection for tests
+        self._store = vector_store
         self._device = self._detect_device()
 
+    @staticmethod
+    def open_store(directory: Path, sem_config: Optional[SemanticConfig] = None, dim: int = 384) -> EmbeddingStore:
+        """Open (or create) the store at `directory` in the configured quantisation mode."""
+        conf = sem_config or SemanticConfig()
+        return EmbeddingStore.open(directory, dim=dim, quantization=conf.quantization or "none")
+
     # ---------- Public API ----------
     def search(self, query: str, limit: int = 10) -> List[Tuple[str, float, str]]:
         if not self._settings.enable_ai_search:
             return []
+        if self._store is not None and len(self._store) > 0:
+            return self._search_store(self._store, query, limit)
         cands = list(self._provider(query, limit * 3))
         if not cands:
             return []
@@ -67,20 +92,36 @@ class SemanticSearchStrategy:
             return []
 
         q_vec = self._embed_text(query)
+        d_mat = self._embed_many([text for _doc_id, text in cands])
+        idx, sims = top_k_cosine(d_mat, q_vec, limit)
         out: List[Tuple[str, float, str]] = []
-        for doc_id, text in cands:
-            d_vec = self._embed_text(text)
-            sim = float(cosine_similarity_numba(q_vec, d_vec))
+        for i, sim in zip(idx.tolist(), sims.tolist()):
             if sim >= self._conf.threshold:
+                doc_id, text = cands[i]
                 out.append((doc_id, sim, text))
-        out.sort(key=lambda x: x[1], reverse=True)
-        return out[:limit]
+        return out
 
     def encode_texts(self, texts: Sequence[str]) -> List[List[float]]:
         model = self._get_model()
         vecs = model.encode(list(texts), normalize_embeddings=True, device=self._device)
         return [list(map(float, v)) for v in vecs]
 
+    # ---------- Vector store ----------
+    def _search_store(self, store: EmbeddingStore, query: str, limit: int) -> List[Tuple[str, float, str]]:
+        q_vec = self._embed_text(query)
+        out: List[Tuple[str, float, str]] = []
+        seen: set[str] = set()
+        # Rows are per chunk: over-fetch and keep each document's best chunk
+        for rec, sim in store.search(
+            q_vec, limit * 3, effort=self._conf.ann_effort, rescore=self._conf.rescore_multiplier
+        ):
+            if sim >= self._conf.threshold and rec.document_id not in seen:
+                seen.add(rec.document_id)
+                out.append((rec.document_id, sim, rec.text))
+                if len(out) >= limit:
+                    break
+        return out
+
     # ---------- Embedding helpers ----------
     def _embed_text(self, text: str) -> List[float]:
         cached = self._cache.get(text)
@@ -90,6 +131,17 @@ class SemanticSearchStrategy:
         self._cache.put(text, vec)
         return vec
 
+    def _embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts as an (N, D) matrix, encoding all cache misses in one call."""
+        vecs: List[Optional[List[float]]] = [self._cache.get(t) for t in texts]
+        missing = [i for i, v in enumerate(vecs) if v is None]
+        if missing:
+            encoded = self.encode_texts([texts[i] for i in missing])
+            for i, vec in zip(missing, encoded):
+                self._cache.put(texts[i], vec)
+                vecs[i] = vec
+        return np.asarray(vecs, dtype=np.float32)
+
     # ---------- Device/model ----------
     @staticmethod
     def _detect_device() -> str:
@@ -0,0 +1,755 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from src.core.performance.numba_ops import top_k_cosine, top_k_indices
+from src.core.search.ann import AnnIndex, load_ann_index
+from src.core.search.quantization import QUANTIZATION_MODES, QuantizedRows
+from src.core.search.segments import (
+    BackgroundMerger,
+    TieredMergePolicy,
+    load_tombstones,
+    read_manifest,
+    save_tombstones,
+    write_manifest,
+)
+
+
+VectorKey = Union[Tuple[str, int], Tuple[str, int, int]]
+# (document_id, page_number[, chunk_index]) identifying one stored embedding
+_RowKey = Tuple[str, int, int]
+
+
+@dataclass(slots=True)
+class VectorRecord:
+    document_id: str
+    page_number: int
+    text: str = ""
+    chunk_index: int = 0
+
+
+@dataclass(slots=True)
+class _StoredSegment:
+    """One immutable on-disk batch of rows and its tombstone bitmap."""
+
+    name: str
+    labels: np.ndarray
+    deleted: np.ndarray
+    deleted_file: Optional[str] = None
+
+    @property
+    def live_count(self) -> int:
+        return len(self.labels) - int(self.deleted.sum())
+
+
+class EmbeddingStore:
+    """Array-backed embedding store populated at indexing time (req 1.2, 4.1).
+
+    - Rows are unit-normalised float32 vectors in one contiguous matrix, so a query
+      is one matrix-vector product instead of one `model.encode` per candidate.
+    - Each row is keyed by `(document_id, page_number, chunk_index)` (the chunk index
+      defaults to 0 for whole-page vectors); re-adding a key overwrites it.
+      Rows also carry a stable integer label used by an attached `AnnIndex`, which is
+      kept in sync on add/remove and queried instead of the brute-force scan.
+    - Persists as immutable segments (`seg_*/vectors.npy` + `records.json`, plus
+      `ann/`) under a `segments.json` manifest: `save` appends only rows written since
+      the previous save and tombstones overwritten/removed rows of older segments, so
+      saving after adding one file is O(file). The ANN index is likewise written in
+      full only once per directory (or when its change log passes a quarter of the
+      rows); other saves append the changed labels to `ann/changes.log`, which `load`
+      replays from the segments. A `TieredMergePolicy` compacts segments
+      after saves (inline, or on a `BackgroundMerger` thread). The pre-segment layout
+      (`vectors.npy` + `records.json` at the top level) still loads.
+    - With `quantization="int8"` (4x smaller) or `"binary"` (32x smaller) only codes
+      are kept in memory: a query ranks every row on the codes, then rescores the best
+      `k * rescore_multiplier` with their float vectors, read from the unsaved rows or
+      the memory-mapped segments. Float rows stay in memory only until they are saved.
+      Segments are mapped as soon as they are written or loaded, so a store keeps
+      reading its own vectors after its directory is renamed or removed (e.g. by a
+      `ReEncoder` swap). An attached IVF index then scores candidates on the codes
+      instead of keeping its own float copy.
+      `quantization.measure_recall` reports recall against the float search.
+    """
+
+    SNIPPET_CHARS = 200
+    _VECTORS_FILE = "vectors.npy"
+    _RECORDS_FILE = "records.json"
+    _ANN_DIR = "ann"
+    _LOAD_BLOCK_ROWS = 1024
+    _ANN_LOG_FILE = "changes.log"
+    _ANN_LOG_MIN = 1024  # logged labels always tolerated before the ANN is rewritten
+
+    def __init__(
+        self,
+        dim: int = 384,
+        initial_capacity: int = 1024,
+        merge_policy: Optional[TieredMergePolicy] = None,
+        background_merge: bool = False,
+        quantization: str = "none",
+        rescore_multiplier: int = 4,
+    ) -> None:
+        if dim <= 0:
+            raise ValueError("dim must be > 0")
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError("quantization must be one of: none, int8, binary")
+        self._dim = int(dim)
+        self._capacity = max(1, int(initial_capacity))
+        # Exactly one of the float matrix and the quantised codes holds the rows
+        self._matrix: Optional[np.ndarray] = None
+        self._quant: Optional[QuantizedRows] = None
+        if quantization == "none":
+            self._matrix = np.zeros((self._capacity, self._dim), dtype=np.float32)
+        else:
+            self._quant = QuantizedRows(quantization, self._dim, self._capacity)
+        self._rescore = max(0, int(rescore_multiplier))
+        self._pending: Dict[int, np.ndarray] = {}  # label -> float row not yet on disk (quantised)
+        self._mmaps: Dict[str, np.ndarray] = {}  # segment -> vectors mapped when written/loaded (quantised)
+        self._labels = np.zeros(self._capacity, dtype=np.int64)
+        self._size = 0
+        self._next_label = 0
+        self._records: List[VectorRecord] = []
+        self._row_of: Dict[_RowKey, int] = {}
+        self._row_of_label: Dict[int, int] = {}
+        self._pages_of: Dict[str, Set[Tuple[int, int]]] = {}
+        self._ann: Optional[AnnIndex] = None
+        self._lock = threading.RLock()
+        # ---- Persistence state (guarded by _persist_lock) ----
+        self._dir: Optional[Path] = None
+        self._segments: List[_StoredSegment] = []
+        self._persisted: Dict[int, Tuple[str, int]] = {}  # label -> (segment, row)
+        self._dirty: Set[int] = set()  # labels (re)written since the last save
+        self._gone: Set[int] = set()  # labels removed since the last save
+        self._generation = 0
+        self._next_segment = 0
+        self._policy = merge_policy or TieredMergePolicy()
+        self._persist_lock = threading.RLock()
+        self._ann_base: Optional[Path] = None  # directory holding the last full ANN write
+        self._ann_log: Set[int] = set()  # labels changed since then (also in ann/changes.log)
+        self._merger = BackgroundMerger(self._merge_once, name="vector-store-merger") if background_merge else None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: VectorKey) -> bool:
+        return self._row_key(key) in self._row_of
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    @property
+    def quantization(self) -> str:
+        return self._quant.mode if self._quant is not None else "none"
+
+    @property
+    def rescore_multiplier(self) -> int:
+        return self._rescore
+
+    @property
+    def bytes_per_vector(self) -> int:
+        """In-memory bytes per saved row (float32, or the quantised code)."""
+        return self._quant.bytes_per_vector if self._quant is not None else self._dim * 4
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Read-only view of the live rows, shape (len(store), dim).
+
+        Quantised stores materialise a float copy from disk; avoid on large stores.
+        """
+        with self._lock:
+            view = self._matrix[: self._size] if self._matrix is not None else self._float_rows(range(self._size))
+        view.flags.writeable = False
+        return view
+
+    @property
+    def labels(self) -> np.ndarray:
+        """Stable integer label of each live row (same order as `matrix`)."""
+        return self._labels[: self._size].copy()
+
+    @property
+    def ann_index(self) -> Optional[AnnIndex]:
+        return self._ann
+
+    def record(self, row: int) -> VectorRecord:
+        return self._records[row]
+
+    def record_for_label(self, label: int) -> Optional[VectorRecord]:
+        row = self._row_of_label.get(int(label))
+        return self._records[row] if row is not None else None
+
+    # ---------- ANN ----------
+    def attach_index(self, index: AnnIndex, rebuild: bool = True) -> None:
+        """Route searches through `index`; `rebuild` (re)trains it on the current rows."""
+        if index.dim != self._dim:
+            raise ValueError(f"ANN index dim {index.dim} does not match store dim {self._dim}")
+        with self._lock:
+            if self._quant is not None:
+                index.use_scorer(self._label_scores)
+            elif not index.has_vectors:
+                # Saved by a quantised store: needs its float vectors back
+                index.use_scorer(None)
+                rebuild = True
+            if rebuild:
+                index.build(self._labels[: self._size].tolist(), self.matrix)
+            self._ann = index
+            self._ann_base = None
+
+    def detach_index(self) -> Optional[AnnIndex]:
+        with self._lock:
+            index, self._ann = self._ann, None
+            self._ann_base = None
+            return index
+
+    # ---------- Mutation ----------
+    def add(
+        self,
+        document_id: str,
+        page_number: int,
+        vector: Sequence[float],
+        text: str = "",
+        chunk_index: int = 0,
+    ) -> None:
+        self.add_many([(document_id, page_number, chunk_index)], [vector], [text])
+
+    def add_many(
+        self,
+        keys: Sequence[VectorKey],
+        vectors: Sequence[Sequence[float]] | np.ndarray,
+        texts: Optional[Sequence[str]] = None,
+    ) -> None:
+        mat = self._normalise(np.asarray(vectors, dtype=np.float32).reshape(len(keys), -1))
+        if mat.shape[1] != self._dim:
+            raise ValueError(f"expected vectors of dim {self._dim}, got {mat.shape[1]}")
+        with self._lock:
+            self._reserve(self._size + len(keys))
+            labels: List[int] = []
+            rows: List[int] = []
+            for i, raw_key in enumerate(keys):
+                key = self._row_key(raw_key)
+                snippet = (texts[i] if texts is not None else "")[: self.SNIPPET_CHARS]
+                record = VectorRecord(key[0], key[1], snippet, key[2])
+                row = self._row_of.get(key)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._row_of[key] = row
+                    self._pages_of.setdefault(key[0], set()).add((key[1], key[2]))
+                    self._records.append(record)
+                    self._labels[row] = self._next_label
+                    self._row_of_label[self._next_label] = row
+                    self._next_label += 1
+                else:
+                    self._records[row] = record
+                labels.append(int(self._labels[row]))
+                rows.append(row)
+                if self._matrix is not None:
+                    self._matrix[row] = mat[i]
+                else:
+                    self._pending[labels[-1]] = mat[i].copy()
+                self._dirty.add(labels[-1])
+            if self._quant is not None and rows:
+                self._quant.set(rows, mat)
+            if self._ann is not None and labels:
+                self._ann.add(labels, mat)
+
+    def remove(self, document_id: str, page_number: Optional[int] = None) -> int:
+        """Remove every chunk of one page (or of a whole document); returns rows removed."""
+        with self._lock:
+            doc_id = str(document_id)
+            targets = sorted(self._pages_of.get(doc_id, set()))
+            if page_number is not None:
+                targets = [t for t in targets if t[0] == int(page_number)]
+            removed = 0
+            for page, chunk in targets:
+                if self._remove_key((doc_id, page, chunk)):
+                    removed += 1
+            return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._ann is not None:
+                self._ann.remove(self._labels[: self._size].tolist())
+            self._gone.update(self._labels[: self._size].tolist())
+            self._dirty.clear()
+            self._pending.clear()
+            self._size = 0
+            self._records.clear()
+            self._row_of.clear()
+            self._row_of_label.clear()
+            self._pages_of.clear()
+
+    # ---------- Query ----------
+    def search(
+        self,
+        query: Sequence[float],
+        k: int = 10,
+        effort: Optional[int] = None,
+        rescore: Optional[int] = None,
+        exact: bool = False,
+    ) -> List[Tuple[VectorRecord, float]]:
+        """Return up to `k` records ordered by cosine similarity to `query`.
+
+        With an attached ANN index the result is approximate; `effort` is passed
+        through as its recall/latency knob. Quantised stores rescore the best
+        `k * rescore` code matches with float vectors (`rescore=0` returns the
+        code scores as-is). `exact=True` bypasses both for a float brute-force scan.
+        """
+        with self._lock:
+            if self._size == 0 or k <= 0:
+                return []
+            q = self._normalise(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+            mult = self._rescore if rescore is None else max(0, int(rescore))
+            if self._ann is not None and len(self._ann) > 0 and not exact:
+                rescored = self._quant is not None and mult > 0
+                labels, scores = self._ann.search(q, k * mult if rescored else k, effort=effort)
+                rows = [self._row_of_label.get(lab) for lab in labels.tolist()]
+                if rescored:
+                    return self._rescored([r for r in rows if r is not None], q, k)
+                return [(self._records[r], s) for r, s in zip(rows, scores.tolist()) if r is not None]
+            if self._quant is None or exact:
+                mat = self._matrix[: self._size] if self._matrix is not None else self._float_rows(range(self._size))
+                idx, scores = top_k_cosine(mat, q, k, normalized=True)
+                return [(self._records[i], s) for i, s in zip(idx.tolist(), scores.tolist())]
+            approx = self._quant.scores(q, self._size)
+            if mult == 0:
+                idx = top_k_indices(approx, k)
+                return [(self._records[i], s) for i, s in zip(idx.tolist(), approx[idx].tolist())]
+            return self._rescored(top_k_indices(approx, k * mult).tolist(), q, k)
+
+    def _rescored(self, cand: List[int], q: np.ndarray, k: int) -> List[Tuple[VectorRecord, float]]:
+        """Best `k` of candidate rows by their float vectors."""
+        if not cand:
+            return []
+        scores = self._float_rows(cand) @ q
+        order = top_k_indices(scores, k)
+        return [(self._records[cand[o]], s) for o, s in zip(order.tolist(), scores[order].tolist())]
+
+    def _label_scores(self, labels: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Code scores of ANN candidates (`LabelScorer` for a quantised store)."""
+        assert self._quant is not None
+        rows = np.fromiter((self._row_of_label.get(int(lab), -1) for lab in labels.tolist()), np.int64, len(labels))
+        scores = np.full(len(rows), -np.inf, dtype=np.float32)
+        known = rows >= 0
+        scores[known] = self._quant.scores_rows(query, rows[known])
+        return scores
+
+    def quantize(self, mode: str) -> None:
+        """Switch the in-memory representation to `mode` ("none", "int8" or "binary")."""
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError("quantization must be one of: none, int8, binary")
+        with self._persist_lock, self._lock:
+            if mode == self.quantization:
+                return
+            floats = self._float_rows(range(self._size))
+            if mode == "none":
+                self._matrix = np.zeros((self._capacity, self._dim), dtype=np.float32)
+                self._matrix[: self._size] = floats
+                self._quant = None
+                self._pending.clear()
+                self._mmaps.clear()
+                if self._ann is not None:
+                    self._ann.use_scorer(None)
+                    if not self._ann.has_vectors:
+                        self._ann.build(self._labels[: self._size].tolist(), self._matrix[: self._size])
+                        self._ann_base = None
+                return
+            self._quant = QuantizedRows(mode, self._dim, self._capacity)
+            if self._size:
+                self._quant.set(list(range(self._size)), floats)
+            if self._matrix is not None:
+                if self._dir is not None:
+                    for seg in self._segments:
+                        self._pin(self._dir, seg.name)
+                # Keep floats only for rows that are not (or not currently) on disk
+                for row in range(self._size):
+                    lab = int(self._labels[row])
+                    if lab not in self._persisted or lab in self._dirty:
+                        self._pending[lab] = floats[row].copy()
+                self._matrix = None
+            if self._ann is not None and self._ann.use_scorer(self._label_scores):
+                self._ann_base = None  # its vectors are gone; the next save rewrites it
+
+    # ---------- Persistence ----------
+    def save(self, directory: Path) -> None:
+        """Append rows written since the last save as a new segment (atomic manifest swap).
+
+        Saving to a different directory than the last save/load writes every row.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._persist_lock:
+            if self._dir is None or self._dir.resolve() != directory.resolve():
+                with self._lock:
+                    if self._matrix is None:
+                        # Rows are about to be re-written elsewhere; pull them off the old segments
+                        floats = self._float_rows(range(self._size))
+                        for row in range(self._size):
+                            self._pending.setdefault(int(self._labels[row]), floats[row].copy())
+                    self._segments, self._persisted = [], {}
+                    self._mmaps.clear()
+                    self._dirty = set(self._labels[: self._size].tolist())
+                    self._gone.clear()
+            with self._lock:
+                dirty = sorted(lab for lab in self._dirty if lab in self._row_of_label)
+                rows = [self._row_of_label[lab] for lab in dirty]
+                vectors = self._float_rows(rows)
+                written = {lab: self._pending[lab] for lab in dirty if lab in self._pending}
+                records = [self._records[r] for r in rows]
+                touched = self._dirty | self._gone
+                replaced = touched & self._persisted.keys()
+                self._dirty.clear()
+                self._gone.clear()
+                next_label = self._next_label
+                if self._ann is not None:
+                    # Before the manifest, so a crash never leaves saved rows the ANN misses
+                    self._save_ann(directory, touched)
+            self._generation += 1
+            self._tombstone(directory, replaced)
+            if dirty:
+                name = self._new_segment_name()
+                self._write_segment(directory / name, dirty, vectors, records)
+                self._pin(directory, name)
+                self._segments.append(
+                    _StoredSegment(name, np.asarray(dirty, dtype=np.int64), np.zeros(len(dirty), dtype=bool))
+                )
+                self._persisted.update({lab: (name, i) for i, lab in enumerate(dirty)})
+            self._dir = directory
+            self._publish(next_label)
+            if written:
+                with self._lock:
+                    # Saved floats are served from the segment now, unless re-written meanwhile
+                    for lab, vec in written.items():
+                        if self._pending.get(lab) is vec:
+                            del self._pending[lab]
+        if self._merger is not None:
+            self._merger.request()
+        else:
+            while self._merge_once():
+                pass
+
+    @classmethod
+    def load(
+        cls,
+        directory: Path,
+        merge_policy: Optional[TieredMergePolicy] = None,
+        background_merge: bool = False,
+        quantization: str = "none",
+        rescore_multiplier: int = 4,
+    ) -> "EmbeddingStore":
+        directory = Path(directory)
+        manifest = read_manifest(directory)
+        if manifest is None:
+            legacy = cls._load_single_file(directory)
+            legacy._rescore = max(0, int(rescore_multiplier))
+            legacy.quantize(quantization)
+            return legacy
+        dims = int(manifest["dim"])
+        labels: List[int] = []
+        loaded: List[Tuple[Path, list, np.ndarray]] = []  # (segment dir, records, live rows)
+        segments: List[_StoredSegment] = []
+        persisted: Dict[int, Tuple[str, int]] = {}
+        for entry in manifest.get("segments", []):
+            seg_dir = directory / entry["name"]
+            records = json.loads((seg_dir / cls._RECORDS_FILE).read_text(encoding="utf-8"))
+            deleted = load_tombstones(seg_dir / entry["deleted"] if entry.get("deleted") else None, len(records))
+            live = np.flatnonzero(~deleted)
+            for i in live.tolist():
+                labels.append(int(records[i][3]))
+                persisted[int(records[i][3])] = (entry["name"], i)
+            loaded.append((seg_dir, records, live))
+            seg_labels = np.asarray([int(r[3]) for r in records], dtype=np.int64)
+            segments.append(_StoredSegment(entry["name"], seg_labels, deleted, entry.get("deleted")))
+
+        store = cls(
+            dim=dims,
+            initial_capacity=max(1, len(labels)),
+            merge_policy=merge_policy,
+            background_merge=background_merge,
+            quantization=quantization,
+            rescore_multiplier=rescore_multiplier,
+        )
+        for seg_dir, records, live in loaded:
+            # Block by block straight from the mapped file: a quantised store never
+            # holds more than one block of floats while loading
+            matrix = np.load(seg_dir / cls._VECTORS_FILE, mmap_mode="r")
+            for start in range(0, len(live), cls._LOAD_BLOCK_ROWS):
+                rows = live[start : start + cls._LOAD_BLOCK_ROWS]
+                block = [records[i] for i in rows.tolist()]
+                store.add_many([(str(r[0]), int(r[1]), int(r[4])) for r in block], matrix[rows], [r[2] for r in block])
+                store._pending.clear()
+                store._dirty.clear()
+        if labels:
+            store._restore_labels(labels, int(manifest.get("next_label", len(labels))))
+        store._dirty.clear()
+        store._pending.clear()  # every row is on disk
+        store._dir = directory
+        store._segments = segments
+        store._persisted = persisted
+        for seg in segments:
+            store._pin(directory, seg.name)
+        store._generation = int(manifest.get("generation", 0))
+        store._next_segment = int(manifest.get("next_segment", len(segments)))
+        if (directory / cls._ANN_DIR).exists():
+            store._attach_saved_index(directory)
+        return store
+
+    @classmethod
+    def _load_single_file(cls, directory: Path) -> "EmbeddingStore":
+        """Load the pre-segment layout; the next `save` rewrites it as a segment."""
+        meta = json.loads((directory / cls._RECORDS_FILE).read_text(encoding="utf-8"))
+        matrix = np.load(directory / cls._VECTORS_FILE)
+        store = cls(dim=int(meta["dim"]), initial_capacity=max(1, len(matrix)))
+        records = meta.get("records", [])
+        if records:
+            keys = [(str(r[0]), int(r[1]), int(r[4]) if len(r) > 4 else 0) for r in records]
+            store.add_many(keys, matrix, [r[2] for r in records])
+            if all(len(r) > 3 for r in records):
+                # Restore persisted labels so a saved ANN index still lines up
+                store._restore_labels([int(r[3]) for r in records], int(meta.get("next_label", len(records))))
+        if (directory / cls._ANN_DIR).exists():
+            store._attach_saved_index(directory)
+        return store
+
+    @classmethod
+    def open(cls, directory: Path, dim: int = 384, quantization: str = "none") -> "EmbeddingStore":
+        """Load from `directory` if it holds a saved store, else return an empty one."""
+        directory = Path(directory)
+        if read_manifest(directory) is not None or (directory / cls._RECORDS_FILE).exists():
+            return cls.load(directory, quantization=quantization)
+        return cls(dim=dim, quantization=quantization)
+
+    def close(self) -> None:
+        if self._merger is not None:
+            self._merger.close()
+
+    def wait_for_merges(self, timeout: Optional[float] = None) -> bool:
+        return self._merger.wait_idle(timeout) if self._merger is not None else True
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._segments)
+
+    def _restore_labels(self, labels: List[int], next_label: int) -> None:
+        self._labels[: len(labels)] = labels
+        self._row_of_label = {lab: row for row, lab in enumerate(labels)}
+        self._next_label = next_label
+
+    def _save_ann(self, directory: Path, touched: Set[int]) -> None:
+        """Rewrite the ANN index, or just log the labels `touched` since its last rewrite."""
+        assert self._ann is not None
+        ann_dir = directory / self._ANN_DIR
+        self._ann_log |= touched
+        limit = max(self._ANN_LOG_MIN, self._size // 4)
+        if self._ann_base is None or self._ann_base.resolve() != directory.resolve() or len(self._ann_log) > limit:
+            self._ann.save(ann_dir)
+            (ann_dir / self._ANN_LOG_FILE).unlink(missing_ok=True)
+            self._ann_base = directory
+            self._ann_log = set()
+        elif touched:
+            with (ann_dir / self._ANN_LOG_FILE).open("a", encoding="utf-8") as f:
+                f.write(json.dumps(sorted(touched)) + "\n")
+
+    def _attach_saved_index(self, directory: Path) -> None:
+        """Attach the saved ANN index, replaying its change log from the loaded rows."""
+        ann_dir = directory / self._ANN_DIR
+        index = load_ann_index(ann_dir)
+        changed: Set[int] = set()
+        log = ann_dir / self._ANN_LOG_FILE
+        if log.exists():
+            for line in log.read_text(encoding="utf-8").splitlines():
+                try:
+                    changed.update(int(lab) for lab in json.loads(line))
+                except ValueError:
+                    continue  # torn last line: its save never reached the manifest
+        if changed:
+            index.remove(sorted(changed))
+            live = sorted(lab for lab in changed if lab in self._row_of_label)
+            if live:
+                index.add(live, self._float_rows([self._row_of_label[lab] for lab in live]))
+        rebuilt = self._quant is None and not index.has_vectors
+        self.attach_index(index, rebuild=False)
+        if not rebuilt:
+            self._ann_base = directory
+            self._ann_log = changed
+
+    def _new_segment_name(self) -> str:
+        self._next_segment += 1
+        return f"seg_{self._next_segment:06d}"
+
+    def _write_segment(
+        self, seg_dir: Path, labels: Sequence[int], vectors: np.ndarray, records: Sequence[VectorRecord]
+    ) -> None:
+        seg_dir.mkdir(parents=True, exist_ok=True)
+        np.save(seg_dir / self._VECTORS_FILE, vectors)
+        rows = [[r.document_id, r.page_number, r.text, int(lab), r.chunk_index] for r, lab in zip(records, labels)]
+        (seg_dir / self._RECORDS_FILE).write_text(json.dumps(rows), encoding="utf-8")
+
+    def _tombstone(self, directory: Path, labels: Set[int]) -> None:
+        by_segment: Dict[str, List[int]] = {}
+        for lab in labels:
+            name, row = self._persisted.pop(lab)
+            by_segment.setdefault(name, []).append(row)
+        for seg in self._segments:
+            rows = by_segment.get(seg.name)
+            if rows:
+                seg.deleted = seg.deleted.copy()
+                seg.deleted[rows] = True
+                seg.deleted_file = f"deleted_{self._generation:06d}.npy"
+                save_tombstones(directory / seg.name / seg.deleted_file, seg.deleted)
+        self._segments = [seg for seg in self._segments if seg.live_count > 0]
+
+    def _publish(self, next_label: int) -> None:
+        assert self._dir is not None
+        write_manifest(
+            self._dir,
+            {
+                "dim": self._dim,
+                "next_label": next_label,
+                "generation": self._generation,
+                "next_segment": self._next_segment,
+                "segments": [{"name": s.name, "deleted": s.deleted_file} for s in self._segments],
+            },
+        )
+        referenced = {s.name: s.deleted_file for s in self._segments}
+        for name in [n for n in self._mmaps if n not in referenced]:
+            del self._mmaps[name]
+        for path in self._dir.glob("seg_*"):
+            if path.name not in referenced:
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            for tomb in path.glob("deleted_*.npy"):
+                if tomb.name != referenced[path.name]:
+                    tomb.unlink(missing_ok=True)
+        for legacy in (self._VECTORS_FILE, self._RECORDS_FILE):
+            (self._dir / legacy).unlink(missing_ok=True)
+
+    def _merge_once(self) -> bool:
+        """Compact the segments the merge policy picks; False when nothing is due."""
+        with self._persist_lock:
+            if self._dir is None:
+                return False
+            picked = self._policy.select(
+                [s.live_count for s in self._segments], [len(s.labels) for s in self._segments]
+            )
+            if not picked:
+                return False
+            sources = [self._segments[i] for i in picked]
+            labels: List[int] = []
+            blocks: List[np.ndarray] = []
+            records: List[VectorRecord] = []
+            for seg in sources:
+                seg_dir = self._dir / seg.name
+                rows = json.loads((seg_dir / self._RECORDS_FILE).read_text(encoding="utf-8"))
+                live = np.flatnonzero(~seg.deleted)
+                blocks.append(np.asarray(np.load(seg_dir / self._VECTORS_FILE, mmap_mode="r")[live]))
+                for i in live.tolist():
+                    r = rows[i]
+                    labels.append(int(r[3]))
+                    records.append(VectorRecord(str(r[0]), int(r[1]), r[2], int(r[4])))
+            self._generation += 1
+            names = {seg.name for seg in sources}
+            self._segments = [seg for seg in self._segments if seg.name not in names]
+            if labels:
+                name = self._new_segment_name()
+                self._write_segment(self._dir / name, labels, np.concatenate(blocks), records)
+                self._pin(self._dir, name)
+                self._segments.append(
+                    _StoredSegment(name, np.asarray(labels, dtype=np.int64), np.zeros(len(labels), dtype=bool))
+                )
+                self._persisted.update({lab: (name, i) for i, lab in enumerate(labels)})
+            manifest = read_manifest(self._dir) or {}
+            self._publish(int(manifest.get("next_label", self._next_label)))
+            return True
+
+    # ---------- Internals ----------
+    @staticmethod
+    def _row_key(key: VectorKey) -> _RowKey:
+        chunk = int(key[2]) if len(key) > 2 else 0
+        return (str(key[0]), int(key[1]), chunk)
+
+    def _reserve(self, needed: int) -> None:
+        cap = self._capacity
+        if needed <= cap:
+            return
+        while cap < needed:
+            cap *= 2
+        if self._matrix is not None:
+            grown = np.zeros((cap, self._dim), dtype=np.float32)
+            grown[: self._size] = self._matrix[: self._size]
+            self._matrix = grown
+        if self._quant is not None:
+            self._quant.resize(cap)
+        self._labels = np.resize(self._labels, cap)
+        self._capacity = cap
+
+    def _float_rows(self, rows: Sequence[int]) -> np.ndarray:
+        """Float vectors of `rows`: from memory, or unsaved/persisted floats when quantised."""
+        if self._matrix is not None:
+            return self._matrix[list(rows)]
+        rows = list(rows)
+        out = np.empty((len(rows), self._dim), dtype=np.float32)
+        for i, row in enumerate(rows):
+            label = int(self._labels[row])
+            vec = self._pending.get(label)
+            out[i] = vec if vec is not None else self._persisted_vector(label)
+        return out
+
+    def _pin(self, directory: Path, name: str) -> None:
+        """Map a segment's vectors now; the mapping outlives a rename or removal of `directory`."""
+        if self._quant is not None:
+            self._mmaps[name] = np.load(directory / name / self._VECTORS_FILE, mmap_mode="r")
+
+    def _persisted_vector(self, label: int) -> np.ndarray:
+        for _attempt in range(2):
+            name, row = self._persisted[label]
+            vectors = self._mmaps.get(name)
+            if vectors is not None:
+                return vectors[row]
+            # Merged away meanwhile; `_persisted` now points at the new segment
+        raise RuntimeError(f"float vector of label {label} is not mapped (segment {name})")
+
+    def _remove_key(self, key: _RowKey) -> bool:
+        row = self._row_of.pop(key, None)
+        if row is None:
+            return False
+        pages = self._pages_of.get(key[0])
+        if pages is not None:
+            pages.discard((key[1], key[2]))
+            if not pages:
+                self._pages_of.pop(key[0], None)
+        label = int(self._labels[row])
+        self._row_of_label.pop(label, None)
+        self._dirty.discard(label)
+        self._pending.pop(label, None)
+        self._gone.add(label)
+        if self._ann is not None:
+            self._ann.remove([label])
+        last = self._size - 1
+        if row != last:
+            # Swap the last row into the hole to keep the matrix dense
+            if self._matrix is not None:
+                self._matrix[row] = self._matrix[last]
+            if self._quant is not None:
+                self._quant.move(last, row)
+            self._labels[row] = self._labels[last]
+            self._row_of_label[int(self._labels[row])] = row
+            moved = self._records[last]
+            self._records[row] = moved
+            self._row_of[(moved.document_id, moved.page_number, moved.chunk_index)] = row
+        self._records.pop()
+        self._size -= 1
+        return True
+
+    @staticmethod
+    def _normalise(mat: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        return (mat / norms).astype(np.float32, copy=False)
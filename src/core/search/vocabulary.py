@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.core.performance.text_processing import split_tokens_ws
+
+
+VocabularyListener = Callable[[Dict[str, int]], None]
+# Receives {term: new_frequency} for every term changed by one mutation
+
+_STRIP_CHARS = ".,;:!?\"'()[]{}<>«»“”‘’`*_|/\\"
+
+
+def normalise_term(token: str) -> str:
+    return token.strip(_STRIP_CHARS).lower()
+
+
+def trigrams(term: str) -> List[str]:
+    """Padded character trigrams; padding gives short terms and word edges their own grams."""
+    padded = f"$${term}$"
+    return [padded[i : i + 3] for i in range(len(padded) - 2)]
+
+
+class Vocabulary:
+    """Term dictionary with frequencies and trigram posting lists (req 1.4, 1.5).
+
+    - Built at indexing time from page text, so spelling suggestions never scan the
+      corpus; a lookup touches only the posting lists of the query's trigrams.
+    - `candidates` keeps terms sharing enough trigrams to be within `max_edits` edits
+      (one edit destroys at most three trigrams) and of compatible length; only these
+      are handed to the string scorer.
+    - Text added under a `document_id` has its term counts kept per document, so
+      `discard_document` can subtract exactly what a removed or re-indexed document
+      contributed.
+    - Persists as one JSON file (`terms`, `freqs`, `documents`); postings are rebuilt on load.
+    - Listeners (e.g. `PrefixIndex`) are told about frequency changes as they happen.
+    """
+
+    def __init__(self) -> None:
+        self._terms: List[str] = []
+        self._freqs: List[int] = []
+        self._id_of: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._documents: Dict[str, Counter[str]] = {}
+        self._listeners: List[VocabularyListener] = []
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, term: str) -> bool:
+        tid = self._id_of.get(normalise_term(term))
+        return tid is not None and self._freqs[tid] > 0
+
+    def frequency(self, term: str) -> int:
+        tid = self._id_of.get(normalise_term(term))
+        return self._freqs[tid] if tid is not None else 0
+
+    def subscribe(self, listener: VocabularyListener) -> None:
+        self._listeners.append(listener)
+
+    # ---------- Mutation ----------
+    def add_text(self, text: str, document_id: Optional[str] = None) -> None:
+        self.add_terms(split_tokens_ws(text.encode("utf-8")), document_id=document_id)
+
+    def add_terms(self, tokens: Iterable[str], count: int = 1, document_id: Optional[str] = None) -> None:
+        counts = Counter(t for t in (normalise_term(tok) for tok in tokens) if t)
+        changed: Dict[str, int] = {}
+        with self._lock:
+            if document_id is not None:
+                owned = self._documents.setdefault(document_id, Counter())
+                for term, n in counts.items():
+                    owned[term] += n * count
+            for term, n in counts.items():
+                tid = self._id_of.get(term)
+                if tid is None:
+                    tid = len(self._terms)
+                    self._id_of[term] = tid
+                    self._terms.append(term)
+                    self._freqs.append(0)
+                    for gram in set(trigrams(term)):
+                        self._postings.setdefault(gram, []).append(tid)
+                self._freqs[tid] += n * count
+                changed[term] = self._freqs[tid]
+        self._notify(changed)
+
+    def discard_text(self, text: str) -> None:
+        """Decrement frequencies for a removed document; zero-frequency terms stop matching."""
+        self._discard(Counter(normalise_term(tok) for tok in split_tokens_ws(text.encode("utf-8"))))
+
+    def discard_document(self, document_id: str) -> None:
+        """Subtract every term count added under `document_id`; unknown ids are a no-op."""
+        with self._lock:
+            counts = self._documents.pop(document_id, None)
+        if counts:
+            self._discard(counts)
+
+    def _discard(self, counts: Counter[str]) -> None:
+        changed: Dict[str, int] = {}
+        with self._lock:
+            for term, n in counts.items():
+                tid = self._id_of.get(term)
+                if tid is not None:
+                    self._freqs[tid] = max(0, self._freqs[tid] - n)
+                    changed[term] = self._freqs[tid]
+        self._notify(changed)
+
+    def clear(self) -> None:
+        with self._lock:
+            changed = {t: 0 for t, f in zip(self._terms, self._freqs) if f > 0}
+            self._terms.clear()
+            self._freqs.clear()
+            self._id_of.clear()
+            self._postings.clear()
+            self._documents.clear()
+        self._notify(changed)
+
+    def _notify(self, changed: Dict[str, int]) -> None:
+        if changed:
+            for listener in list(self._listeners):
+                listener(changed)
+
+    # ---------- Lookup ----------
+    def candidates(self, term: str, max_edits: int = 2, limit: int = 200) -> List[Tuple[str, int]]:
+        """Return up to `limit` `(term, frequency)` pairs plausibly within `max_edits` edits."""
+        query = normalise_term(term)
+        if not query:
+            return []
+        grams = set(trigrams(query))
+        with self._lock:
+            shared: Counter[int] = Counter()
+            for gram in grams:
+                posting = self._postings.get(gram)
+                if posting:
+                    shared.update(posting)
+            min_shared = max(1, len(grams) - 3 * max(0, max_edits))
+            out: List[Tuple[int, int, int]] = []
+            for tid, n in shared.items():
+                if n < min_shared or self._freqs[tid] <= 0:
+                    continue
+                if abs(len(self._terms[tid]) - len(query)) > max_edits:
+                    continue
+                out.append((n, self._freqs[tid], tid))
+            out.sort(reverse=True)
+            return [(self._terms[tid], freq) for _n, freq, tid in out[: max(0, limit)]]
+
+    def terms(self) -> List[str]:
+        with self._lock:
+            return [t for t, f in zip(self._terms, self._freqs) if f > 0]
+
+    # ---------- Persistence ----------
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with self._lock:
+            live = [(t, f) for t, f in zip(self._terms, self._freqs) if f > 0]
+            documents = {d: dict(c) for d, c in self._documents.items()}
+        data = {"terms": [t for t, _ in live], "freqs": [f for _, f in live], "documents": documents}
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "Vocabulary":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        vocab = cls()
+        for term, freq in zip(data.get("terms", []), data.get("freqs", [])):
+            vocab.add_terms([term], count=int(freq))
+        vocab._documents = {d: Counter(c) for d, c in data.get("documents", {}).items()}
+        return vocab
+
+    @classmethod
+    def open(cls, path: Path) -> "Vocabulary":
+        """Load from `path` if it exists, else return an empty vocabulary."""
+        return cls.load(path) if Path(path).exists() else cls()
+
+
+def best_correction(
+    vocab: Vocabulary, term: str, max_edits: int = 2, limit: int = 200
+) -> Optional[Tuple[str, float]]:
+    """Highest-scoring vocabulary term for `term` by `rapidfuzz.fuzz.ratio` (0..1)."""
+    ranked = rank_candidates(term, vocab.candidates(term, max_edits=max_edits, limit=limit), 1)
+    return ranked[0] if ranked else None
+
+
+def rank_candidates(term: str, candidates: List[Tuple[str, int]], limit: int) -> List[Tuple[str, float]]:
+    """Score candidates with rapidfuzz; ties go to the more frequent term."""
+    try:
+        from rapidfuzz import process, fuzz  # type: ignore
+    except Exception:
+        return []
+    if not candidates:
+        return []
+    freq = dict(candidates)
+    scored = process.extract(normalise_term(term), list(freq), scorer=fuzz.ratio, limit=len(freq))
+    scored = sorted(scored, key=lambda c: (-float(c[1]), -freq.get(c[0], 0), c[0]))
+    return [(cand, float(score) / 100.0) for cand, score, _idx in scored[: max(0, limit)]]
@@ -67,3 +67,37 @@ def test_upload_list_delete_document(tmp_path) -> None:
         assert not (tmp_path / name).exists()
     finally:
         PathResolver.get_document_path = orig  # type: ignore
+
+
+def test_advanced_search_cursor_pagination() -> None:
+    client = TestClient(app)
+    r = client.post("/api/search/advanced", json={"query": "test", "size": 2})
+    assert r.status_code == 200 and isinstance(r.json()["total"], int) and r.json()["next_cursor"] is None
+    r = client.post("/api/search/advanced", json={"query": "test", "size": 2, "cursor": True})
+    assert r.status_code == 200 and "next_cursor" in r.json() and r.json()["total"] is None
+    bad = client.post("/api/search/advanced", json={"query": "test", "cursor": "garbage"})
+    assert bad.status_code == 400
+
+
+def test_search_compiles_phrase_and_field_queries(monkeypatch) -> None:
+    from src.api import main
+
+    class _RecordingES:
+        def __init__(self) -> None:
+            self.queries: list = []
+
+        def search(self, **body):  # noqa: ANN003
+            self.queries.append(body.get("query"))
+            return {"hits": {"hits": []}}
+
+    es = _RecordingES()
+    monkeypatch.setattr(main.search_manager, "_es", es)
+    monkeypatch.setattr(main.search_manager, "_es_probed", True)
+    monkeypatch.setattr(main.search_manager, "_es_down_until", 0.0)
+    main.search_manager.invalidate_cache()
+    client = TestClient(app)
+    r = client.post("/api/search", json={"query": 'title:graph AND "binary tree"', "limit": 3})
+    assert r.status_code == 200
+    assert {"match": {"title": "graph"}} in es.queries[0]["bool"]["must"]
+    phrase = es.queries[0]["bool"]["must"][1]["multi_match"]
+    assert phrase["type"] == "phrase" and phrase["query"] == "binary tree"
@@ -37,3 +37,20 @@ def test_file_watcher_detects_new_supported_file(tmp_path: Path) -> None:
     watcher.stop()
     assert seen and seen[0].name == "new_note.md"
 
+
+
+def test_file_watcher_reports_files_present_at_start(tmp_path: Path) -> None:
+    mgr = DocumentManager()
+    mgr.auto_register_builtin()
+    (tmp_path / "old_note.md").write_text("hello", encoding="utf-8")
+    watcher = FileWatcher(mgr, interval_sec=0.1, debounce_sec=0.05)
+    watcher.add_directory(tmp_path)
+
+    seen: List[Path] = []
+    watcher.start(lambda p: seen.append(p))
+    timeout = time.time() + 3
+    while not seen and time.time() < timeout:
+        time.sleep(0.05)
+
+    watcher.stop()
+    assert [p.name for p in seen] == ["old_note.md"]
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, List
+
+from src.core.documents import DocumentContent, DocumentManager, DocumentProcessor, ExtractionCache, ManifestStore
+from src.core.documents.models import PageContent
+
+
+class _CountingProcessor(DocumentProcessor):
+    def __init__(self, version: str = "1") -> None:
+        self.calls: List[str] = []
+        self._version = version
+
+    @property
+    def name(self) -> str:
+        return "counting"
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    @property
+    def supported_suffixes(self) -> Iterable[str]:
+        return [".txt"]
+
+    def process(self, file_path: Path) -> DocumentContent:
+        self.calls.append(file_path.name)
+        lines = file_path.read_text(encoding="utf-8").split("|")
+        pages = [PageContent(page_number=i, text=t) for i, t in enumerate(lines)]
+        return DocumentContent(file_path=file_path, title=file_path.stem, pages=pages, metadata={"lines": len(lines)})
+
+
+def _manager(tmp_path: Path, proc: DocumentProcessor, **kwargs) -> DocumentManager:  # noqa: ANN003
+    mgr = DocumentManager(cache=ExtractionCache(tmp_path / "cache", **kwargs))
+    mgr.register(proc)
+    return mgr
+
+
+def test_process_serves_unchanged_and_copied_files_from_cache(tmp_path: Path) -> None:
+    proc = _CountingProcessor()
+    mgr = _manager(tmp_path, proc)
+    a = tmp_path / "a.txt"
+    a.write_text("first page|second page ünïcode", encoding="utf-8")
+
+    doc = mgr.process(a)
+    again = mgr.process(a)
+    copy = tmp_path / "copy.txt"
+    copy.write_bytes(a.read_bytes())
+    copied = mgr.process(copy)
+
+    assert proc.calls == ["a.txt"]  # the copy has the same content hash
+    assert [p.text for p in again.pages] == [p.text for p in doc.pages] == ["first page", "second page ünïcode"]
+    assert again.metadata == {"lines": 2}
+    assert copied.file_path == copy and copied.title == "copy"  # file-name titles follow the path
+
+    a.write_text("edited", encoding="utf-8")
+    assert [p.text for p in mgr.process(a).pages] == ["edited"]
+    assert proc.calls == ["a.txt", "a.txt"]
+
+
+def test_processor_version_bump_misses(tmp_path: Path) -> None:
+    f = tmp_path / "v.txt"
+    f.write_text("x", encoding="utf-8")
+    cache = ExtractionCache(tmp_path / "cache")
+    old, new = _CountingProcessor("1"), _CountingProcessor("2")
+    for proc in (old, new, new):
+        mgr = DocumentManager(cache=cache)
+        mgr.register(proc)
+        mgr.process(f)
+    assert (old.calls, new.calls) == (["v.txt"], ["v.txt"])
+
+
+def test_stream_records_only_fully_read_documents(tmp_path: Path) -> None:
+    proc = _CountingProcessor()
+    mgr = _manager(tmp_path, proc)
+    f = tmp_path / "s.txt"
+    f.write_text("p0|p1|p2", encoding="utf-8")
+
+    partial = mgr.stream(f)
+    next(partial.pages)
+    partial.pages.close()  # type: ignore[attr-defined]
+    assert [p.text for p in mgr.iter_pages(f)] == ["p0", "p1", "p2"]
+    assert len(proc.calls) == 2
+
+    cached = mgr.stream(f)
+    assert cached.page_count == 3 and [p.text for p in cached.pages] == ["p0", "p1", "p2"]
+    assert len(proc.calls) == 2
+
+
+def test_manifest_entries_rebuild_documents_without_the_originals(tmp_path: Path) -> None:
+    proc = _CountingProcessor()
+    mgr = _manager(tmp_path, proc)
+    f = tmp_path / "m.txt"
+    f.write_text("keep me", encoding="utf-8")
+    manifest = ManifestStore()
+    diff = manifest.diff([f], mgr.processor_version)
+    manifest.upsert(diff.changed)
+    mgr.process(f)
+    f.unlink()
+
+    entry = manifest.get(f)
+    assert entry is not None
+    doc = mgr.from_cache(Path(entry.path), entry.content_hash, entry.processor_version)
+    assert doc is not None and doc.pages[0].text == "keep me"
+
+
+def test_size_based_eviction_drops_least_recently_used(tmp_path: Path) -> None:
+    import random
+
+    rng = random.Random(0)
+    proc = _CountingProcessor()
+    mgr = _manager(tmp_path, proc, max_bytes=4000, codec="zlib")
+    files = []
+    for i in range(4):
+        f = tmp_path / f"f{i}.txt"
+        # Random letters compress to ~1.2 KB per blob
+        f.write_text("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(2000)), encoding="utf-8")
+        files.append(f)
+    cache = mgr.cache
+    assert cache is not None
+
+    for i, f in enumerate(files[:2]):
+        mgr.process(f)
+        os.utime(cache.blob_path(cache.hash_of(f), "counting:1"), ns=(i * 10**9, i * 10**9))
+    mgr.process(files[0])  # refresh f0, so f1 is now the oldest
+    mgr.process(files[2])
+    mgr.process(files[3])
+
+    assert cache.size_bytes() <= 4000
+    kept = [f.name for f in files if (cache.hash_of(f), "counting:1") in cache]
+    assert "f1.txt" not in kept and "f3.txt" in kept
+
+
+def test_corrupt_blob_is_treated_as_a_miss(tmp_path: Path) -> None:
+    proc = _CountingProcessor()
+    mgr = _manager(tmp_path, proc)
+    f = tmp_path / "c.txt"
+    f.write_text("text", encoding="utf-8")
+    mgr.process(f)
+    cache = mgr.cache
+    assert cache is not None
+    cache.blob_path(cache.hash_of(f), "counting:1").write_bytes(b"junk")
+
+    assert mgr.process(f).pages[0].text == "text"
+    assert len(proc.calls) == 2
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from src.core.documents import ManifestStore
+from src.core.documents.hashing import content_hash
+
+
+def _version(_path: Path) -> str:
+    return "text:1"
+
+
+def test_diff_detects_new_touched_modified_and_missing(tmp_path: Path) -> None:
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text("alpha")
+    b.write_text("beta")
+    store = ManifestStore(tmp_path / "manifest.sqlite")
+
+    first = store.diff([a, b], _version, "m1")
+    assert [e.path for e in first.changed] == [str(a), str(b)]
+    store.upsert(first.changed)
+
+    # Touch without changing content: not re-indexed, mtime refreshed in place
+    st = a.stat()
+    os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    b.write_text("beta, edited")
+    second = store.diff([a, b, tmp_path / "gone.txt"], _version, "m1")
+    assert second.unchanged == [a]
+    assert [e.path for e in second.changed] == [str(b)]
+    assert second.missing == [tmp_path / "gone.txt"]
+    assert store.get(a).mtime_ns == a.stat().st_mtime_ns  # type: ignore[union-attr]
+    assert store.get(b).content_hash != content_hash(b)  # type: ignore[union-attr] - recorded only after indexing
+
+
+def test_processor_or_model_change_invalidates(tmp_path: Path) -> None:
+    a = tmp_path / "a.txt"
+    a.write_text("alpha")
+    store = ManifestStore()
+    store.upsert(store.diff([a], _version, "m1").changed)
+    assert store.diff([a], _version, "m1").unchanged == [a]
+    assert len(store.diff([a], lambda _p: "text:2", "m1").changed) == 1
+    assert len(store.diff([a], _version, "m2").changed) == 1
+
+
+def test_manifest_persists_and_reports_stale_paths(tmp_path: Path) -> None:
+    a = tmp_path / "a.txt"
+    a.write_text("alpha")
+    db = tmp_path / "m.sqlite"
+    store = ManifestStore(db)
+    store.upsert(store.diff([a], _version).changed)
+    store.close()
+
+    reopened = ManifestStore(db)
+    assert len(reopened) == 1
+    assert reopened.stale_paths([]) == [str(a)]
+    reopened.remove([a])
+    assert len(reopened) == 0
@@ -67,3 +67,39 @@ def test_pdf_processor_wraps_errors(monkeypatch) -> None:
     with pytest.raises(DocumentProcessingError):
         mgr.process(Path("/tmp/bad.pdf"))
 
+
+
+def test_pdf_iter_pages_is_lazy_and_flushes_each_page(monkeypatch) -> None:
+    events: list[str] = []
+
+    class _TrackedPage(_FakePage):
+        def extract_text(self) -> str:
+            events.append(f"extract {self._text}")
+            return self._text
+
+        def close(self) -> None:
+            events.append(f"close {self._text}")
+
+    class _TrackedPDF(_FakePDF):
+        def close(self) -> None:
+            events.append("pdf closed")
+
+    fake_module = types.SimpleNamespace()
+    fake_module.open = lambda _path: _TrackedPDF([_TrackedPage("a"), _TrackedPage("b")])  # type: ignore[attr-defined]
+    monkeypatch.setitem(__import__("sys").modules, "pdfplumber", fake_module)
+
+    stream = PDFProcessor().stream(Path("/tmp/big.pdf"))
+    assert stream.page_count == 2 and stream.header.title == "Fake PDF" and not stream.header.pages
+    assert events == []  # nothing extracted until pages are consumed
+
+    first = next(stream.pages)
+    assert first.page_number == 0 and first.text == "a"
+    assert events == ["extract a", "close a"]
+
+    assert [p.text for p in stream.pages] == ["b"]
+    assert events[-1] == "pdf closed"
+
+    pages = PDFProcessor().iter_pages(Path("/tmp/big.pdf"))
+    next(pages)
+    pages.close()  # type: ignore[attr-defined]
+    assert events[-1] == "pdf closed"  # abandoning the iterator releases the file
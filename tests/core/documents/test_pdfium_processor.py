@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from src.core.documents import DocumentManager, PDFProcessor, PdfiumProcessor
+from src.core.documents.benchmark import benchmark_extraction, format_benchmark
+from src.core.exceptions.exceptions import DocumentProcessingError
+
+pytest.importorskip("pypdfium2")
+
+
+def _write_pdf(path: Path, pages: List[str], title: str = "Sample") -> None:
+    """Minimal single-font PDF with one text line per "\\n"-separated segment."""
+    objs = []
+    n = len(pages)
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(n))
+    objs.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objs.append(f"<< /Type /Pages /Kids [{kids}] /Count {n} >>".encode())
+    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, text in enumerate(pages):
+        lines = "".join(f"({t}) Tj 0 -14 Td " for t in text.split("\n"))
+        stream = f"BT /F1 12 Tf 72 720 Td {lines}ET".encode()
+        objs.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode())
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objs.append(f"<< /Title ({title}) >>".encode())
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, len(objs), xref)
+    Path(path).write_bytes(bytes(out))
+
+
+def test_pdfium_matches_pdfplumber_text(tmp_path: Path) -> None:
+    path = tmp_path / "doc.pdf"
+    _write_pdf(path, ["hello world\nsecond line", "page two"], title="Manual")
+
+    fast = PdfiumProcessor().process(path)
+    slow = PDFProcessor().process(path)
+
+    assert fast.title == slow.title == "Manual"
+    assert [p.text for p in fast.pages] == [p.text for p in slow.pages] == ["hello world\nsecond line", "page two"]
+
+
+def test_layout_sensitive_files_and_unreadable_files_use_fallback(tmp_path: Path) -> None:
+    calls: List[str] = []
+
+    class _Recording(PDFProcessor):
+        def stream(self, file_path: Path):  # noqa: ANN201
+            calls.append(file_path.name)
+            return super().stream(file_path)
+
+    tables = tmp_path / "tables-q3.pdf"
+    plain = tmp_path / "plain.pdf"
+    _write_pdf(tables, ["a | b"])
+    _write_pdf(plain, ["text"])
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+
+    proc = PdfiumProcessor(fallback=_Recording(), layout_patterns=["tables-*"])
+    assert proc.process(tables).pages[0].text == "a | b"
+    assert proc.process(plain).pages[0].text == "text"
+    with pytest.raises(DocumentProcessingError):
+        proc.process(broken)
+    assert calls == ["tables-q3.pdf", "broken.pdf"]
+
+
+def test_auto_register_prefers_pdfium_and_honours_backend_choice() -> None:
+    mgr = DocumentManager()
+    mgr.auto_register_builtin()
+    assert mgr.get_processor_for(Path("x.pdf")).name == "pdfium"  # type: ignore[union-attr]
+
+    mgr = DocumentManager()
+    mgr.auto_register_builtin(pdf_backend="pdfplumber")
+    assert mgr.get_processor_for(Path("x.pdf")).name == "pdf-plumber"  # type: ignore[union-attr]
+
+    with pytest.raises(ValueError):
+        DocumentManager().auto_register_builtin(pdf_backend="ocr")
+
+
+def test_benchmark_reports_pages_per_second_per_backend(tmp_path: Path) -> None:
+    for i in range(3):
+        _write_pdf(tmp_path / f"d{i}.pdf", [f"page {n}" for n in range(4)])
+    (tmp_path / "bad.pdf").write_bytes(b"garbage")
+
+    results = benchmark_extraction(tmp_path, {"pdfium": PdfiumProcessor(), "pdfplumber": PDFProcessor()})
+
+    assert [r.backend for r in results] == ["pdfium", "pdfplumber"]
+    for r in results:
+        assert (r.files, r.pages, len(r.failed)) == (3, 12, 1)
+        assert r.pages_per_sec > 0
+    assert "pages/s" in format_benchmark(results)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Iterable, List
+
+from src.core.documents import DocumentContent, DocumentManager, DocumentProcessor, PoolSettings
+
+
+class _ScriptedProcessor(DocumentProcessor):
+    """Behaves according to the file stem: `slow*` sleeps, `bad*` raises, `crash*` exits."""
+
+    @property
+    def name(self) -> str:
+        return "scripted"
+
+    @property
+    def supported_suffixes(self) -> Iterable[str]:
+        return [".txt"]
+
+    def process(self, file_path: Path) -> DocumentContent:
+        stem = file_path.stem
+        if stem.startswith("slow"):
+            time.sleep(30)
+        if stem.startswith("bad"):
+            raise ValueError("corrupt file")
+        if stem.startswith("crash"):
+            os._exit(3)
+        if stem.startswith("nap"):
+            time.sleep(0.05 * int(stem[3:]))
+        return DocumentContent.from_text(file_path, title=stem, text=f"pid {os.getpid()}")
+
+
+def _files(tmp_path: Path, names: List[str]) -> List[Path]:
+    out = []
+    for name in names:
+        p = tmp_path / f"{name}.txt"
+        p.write_text("x", encoding="utf-8")
+        out.append(p)
+    return out
+
+
+def _manager() -> DocumentManager:
+    mgr = DocumentManager()
+    mgr.register(_ScriptedProcessor())
+    return mgr
+
+
+def test_process_many_preserves_input_order(tmp_path: Path) -> None:
+    paths = _files(tmp_path, [f"nap{n}" for n in (4, 0, 2, 1, 3, 0)])
+    results = list(_manager().process_many(paths, PoolSettings(workers=3)))
+
+    assert [r.path for r in results] == paths
+    assert all(r.ok for r in results)
+    assert results[0].document is not None and results[0].document.title == "nap4"
+
+
+def test_process_many_unordered_streams_as_completed(tmp_path: Path) -> None:
+    paths = _files(tmp_path, ["nap8", "nap0"])
+    results = list(_manager().process_many(paths, PoolSettings(workers=2), ordered=False))
+
+    assert [r.path.stem for r in results] == ["nap0", "nap8"]
+
+
+def test_errors_timeouts_and_crashes_are_isolated(tmp_path: Path) -> None:
+    paths = _files(tmp_path, ["ok1", "bad", "slow", "crash", "ok2", "ok3"])
+    settings = PoolSettings(workers=2, timeout_sec=1.0)
+
+    start = time.monotonic()
+    results = {r.path.stem: r for r in _manager().process_many(paths, settings)}
+
+    assert time.monotonic() - start < 10
+    assert {k for k, r in results.items() if r.ok} == {"ok1", "ok2", "ok3"}
+    assert results["bad"].error is not None and "corrupt file" in results["bad"].error
+    assert results["slow"].timed_out
+    assert results["crash"].error == "worker process died"
+
+
+def test_workers_are_recycled_after_max_tasks(tmp_path: Path) -> None:
+    paths = _files(tmp_path, [f"ok{i}" for i in range(4)])
+    settings = PoolSettings(workers=1, max_tasks_per_worker=2)
+
+    results = list(_manager().process_many(paths, settings))
+
+    pids = [r.document.pages[0].text for r in results if r.document is not None]
+    assert len(pids) == 4
+    assert pids[0] == pids[1] and pids[2] == pids[3] and pids[1] != pids[2]
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from src.core.documents import DocumentManager, FileWatcher
+from src.core.documents.watcher import _Coalescer
+from src.core.events import EventBus, FileChanged
+
+
+def _kinds(events: List[FileChanged]) -> List[tuple]:
+    return [(e.kind, Path(e.path).name, Path(e.src_path).name if e.src_path else None) for e in events]
+
+
+def test_coalescer_folds_bursts_per_path() -> None:
+    c = _Coalescer(debounce_sec=0.5)
+    a, b, d = Path("a.txt"), Path("b.txt"), Path("d.txt")
+    c.push("created", a, None, 0.0)
+    c.push("modified", a, None, 0.1)
+    c.push("created", b, None, 0.0)
+    c.push("deleted", b, None, 0.2)  # created then deleted: nothing to report
+    c.push("moved", d, Path("old.txt"), 0.0)
+    c.push("moved", Path("e.txt"), d, 0.1)  # chained moves collapse
+    assert c.pop_ready(0.3) == []  # still inside the debounce window
+    assert _kinds(c.pop_ready(1.0)) == [("created", "a.txt", None), ("moved", "e.txt", "old.txt")]
+
+    c.push("moved", d, Path("old.txt"), 2.0)
+    c.push("deleted", d, None, 2.1)
+    assert _kinds(c.pop_ready(3.0)) == [("deleted", "old.txt", None)]
+
+
+def _wait_for(events: List[FileChanged], n: int, timeout: float = 5.0) -> None:
+    deadline = time.time() + timeout
+    while len(events) < n and time.time() < deadline:
+        time.sleep(0.05)
+
+
+@pytest.mark.parametrize("backend", ["inotify", "polling"])
+def test_watcher_reports_modify_move_delete_on_bus(tmp_path: Path, backend: str) -> None:
+    mgr = DocumentManager()
+    mgr.auto_register_builtin()
+    bus = EventBus()
+    published: List[FileChanged] = []
+    bus.subscribe(FileChanged, published.append)
+    existing = tmp_path / "sub" / "keep.md"
+    existing.parent.mkdir()
+    existing.write_text("v1", encoding="utf-8")
+
+    watcher = FileWatcher(
+        mgr, interval_sec=0.1, debounce_sec=0.1, event_bus=bus, backend=backend, report_existing=False
+    )
+    watcher.add_directory(tmp_path)
+    try:
+        watcher.start()
+    except OSError:
+        pytest.skip("inotify unavailable")
+    try:
+        assert watcher.backend == backend
+        existing.write_text("version two", encoding="utf-8")
+        (tmp_path / "ignored.bin").write_bytes(b"\0")
+        _wait_for(published, 1)
+        existing.rename(tmp_path / "moved.md")
+        _wait_for(published, 2)
+        (tmp_path / "moved.md").unlink()
+        deadline = time.time() + 5
+        while ("deleted", "moved.md", None) not in _kinds(published) and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        watcher.stop()
+
+    kinds = _kinds(published)
+    assert kinds[0] == ("modified", "keep.md", None)
+    if backend == "inotify":
+        assert kinds[1] == ("moved", "moved.md", "keep.md")
+    else:  # polling cannot pair a rename
+        assert sorted(kinds[1:3]) == [("created", "moved.md", None), ("deleted", "keep.md", None)]
+    assert kinds[-1] == ("deleted", "moved.md", None)
+
+
+def test_inotify_watches_new_subdirectories(tmp_path: Path) -> None:
+    mgr = DocumentManager()
+    mgr.auto_register_builtin()
+    created: List[Path] = []
+    watcher = FileWatcher(mgr, debounce_sec=0.05, backend="inotify")
+    watcher.add_directory(tmp_path)
+    try:
+        watcher.start(created.append)
+    except OSError:
+        pytest.skip("inotify unavailable")
+    try:
+        nested = tmp_path / "new" / "deeper"
+        nested.mkdir(parents=True)
+        time.sleep(0.2)
+        (nested / "note.txt").write_text("hi", encoding="utf-8")
+        deadline = time.time() + 5
+        while not created and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        watcher.stop()
+    assert [p.name for p in created] == ["note.txt"]
+
+
+def test_inotify_reports_files_of_directory_moved_out(tmp_path: Path) -> None:
+    mgr = DocumentManager()
+    mgr.auto_register_builtin()
+    watched, outside = tmp_path / "watched", tmp_path / "outside"
+    (watched / "docs" / "deep").mkdir(parents=True)
+    outside.mkdir()
+    (watched / "docs" / "a.md").write_text("a", encoding="utf-8")
+    (watched / "docs" / "deep" / "b.txt").write_text("b", encoding="utf-8")
+    events: List[FileChanged] = []
+    watcher = FileWatcher(mgr, debounce_sec=0.05, backend="inotify", report_existing=False)
+    watcher.add_directory(watched)
+    try:
+        watcher.start(on_event=events.append)
+    except OSError:
+        pytest.skip("inotify unavailable")
+    try:
+        (watched / "docs").rename(outside / "docs")
+        _wait_for(events, 2)
+        backend = watcher._backend
+        assert backend is not None and set(backend._paths.values()) == {watched}
+    finally:
+        watcher.stop()
+    assert sorted(_kinds(events)) == [("deleted", "a.md", None), ("deleted", "b.txt", None)]
+
+
+def test_inotify_directory_delete_drops_its_files_and_watches(tmp_path: Path) -> None:
+    import struct
+
+    from src.core.documents.watcher import _InotifyBackend
+
+    try:
+        backend = _InotifyBackend()
+    except OSError:
+        pytest.skip("inotify unavailable")
+    (tmp_path / "gone" / "sub").mkdir(parents=True)
+    (tmp_path / "gone" / "sub" / "c.md").write_text("c", encoding="utf-8")
+    (tmp_path / "kept.md").write_text("k", encoding="utf-8")
+    try:
+        backend.add_root(tmp_path)
+        root_wd = next(wd for wd, p in backend._paths.items() if p == tmp_path)
+        # IN_DELETE | IN_ISDIR for "gone", without the per-file events
+        name = b"gone".ljust(16, b"\0")
+        raw = struct.pack("iIII", root_wd, _InotifyBackend._IN_DELETE | _InotifyBackend._IN_ISDIR, 0, len(name)) + name
+        assert backend._parse(raw) == [("deleted", tmp_path / "gone" / "sub" / "c.md", None)]
+        assert set(backend._paths.values()) == {tmp_path}
+        assert backend._files == {tmp_path / "kept.md"}
+    finally:
+        backend.close()
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import pytest
+
+from src.core.documents.models import DocumentContent, PageContent
+from src.core.indexing.chunking import ChunkSettings, chunk_document
+
+
+def test_chunks_overlap_and_keep_page_numbers() -> None:
+    doc = DocumentContent(
+        file_path="/tmp/a.pdf",
+        title="a",
+        pages=[PageContent(0, " ".join(f"w{i}" for i in range(10))), PageContent(3, "last page")],
+    )
+    chunks = chunk_document(doc, ChunkSettings(max_tokens=4, overlap_tokens=2))
+    page0 = [c for c in chunks if c.page_number == 0]
+    assert [c.token_start for c in page0] == [0, 2, 4, 6]
+    assert page0[1].text == "w2 w3 w4 w5"
+    assert chunks[-1].page_number == 3 and chunks[-1].text == "last page"
+    assert chunks[-1].chunk_id == "/tmp/a.pdf#p3c0"
+
+
+def test_empty_document_yields_single_chunk() -> None:
+    doc = DocumentContent(file_path="/tmp/e.txt", title="e", pages=[PageContent(0, "")])
+    chunks = chunk_document(doc)
+    assert len(chunks) == 1 and chunks[0].text == ""
+
+
+def test_invalid_settings_rejected() -> None:
+    with pytest.raises(ValueError):
+        ChunkSettings(max_tokens=4, overlap_tokens=4)
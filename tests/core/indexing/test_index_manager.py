@@ -23,15 +23,42 @@ class _FakeES:
         self.indices = _FakeIndices()
         self.indexed: List[dict] = []
 
+        self.bulk_calls = 0
+        self.delete_calls = 0
+
     def index(self, index: str, document: dict) -> None:  # noqa: A003
         self.indexed.append({"index": index, "document": document})
 
+    def bulk(self, operations: list) -> dict:
+        self.bulk_calls += 1
+        for action, document in zip(operations[::2], operations[1::2]):
+            self.indexed.append({"index": action["index"]["_index"], "document": document})
+        return {"errors": False}
+
+    def delete_by_query(self, index: str, query: dict, **_kwargs: Any) -> dict:
+        self.delete_calls += 1
+        keep_generation = None
+        if "bool" in query:  # stale chunks: the documents' chunks except the current generation
+            keep_generation = query["bool"]["must_not"][0]["term"]["index_generation"]
+            query = query["bool"]["filter"][0]
+        ids = set(query["terms"]["document_id"])
+
+        def _deleted(d: dict) -> bool:
+            doc = d["document"]
+            return d["index"] == index and doc["document_id"] in ids and doc.get("index_generation") != keep_generation
+
+        kept = [d for d in self.indexed if not _deleted(d)]
+        deleted, self.indexed = len(self.indexed) - len(kept), kept
+        return {"deleted": deleted}
+
 
 class _FakeModel:
     def __init__(self, dim: int) -> None:
         self._dim = dim
+        self.calls = 0
 
     def encode(self, texts: list[str], normalize_embeddings: bool = True):  # noqa: ANN001
+        self.calls += 1
         return [[0.0] * self._dim for _ in texts]
 
 
@@ -51,9 +78,9 @@ def test_create_index_schema_and_index_document(monkeypatch) -> None:
 
     # Index a document
     doc = DocumentContent(file_path="/tmp/f.txt", title="f", pages=[PageContent(0, "hello")])
-    payload = mgr.index_document(doc)
-    assert payload["title"] == "f"
-    assert len(payload["embedding"]) == 384
+    payloads = mgr.index_document(doc)
+    assert len(payloads) == 1 and payloads[0]["title"] == "f"
+    assert len(payloads[0]["embedding"]) == 384
     assert es.indexed and es.indexed[0]["index"] == "docs"
 
 
@@ -64,7 +91,7 @@ def test_bulk_index_parallel(monkeypatch) -> None:
     mgr._model = _FakeModel(settings.embedding_dim)  # type: ignore[attr-defined]
 
     # Monkeypatch joblib to run synchronously for speed
-    def _Parallel(n_jobs=2):  # noqa: ANN001
+    def _Parallel(n_jobs=2, **_kwargs):  # noqa: ANN001
         def runner(tasks):
             return [t() for t in tasks]
 
@@ -83,3 +110,326 @@ def test_bulk_index_parallel(monkeypatch) -> None:
     assert len(out) == 3
     assert len(es.indexed) == 3
 
+
+
+def test_index_document_populates_vector_store(tmp_path) -> None:
+    from src.core.search.vector_store import EmbeddingStore
+
+    es = _FakeES()
+    settings = IndexSettings(index_name="docs", embedding_dim=8)
+    store = EmbeddingStore(dim=8)
+    mgr = IndexManager(es_client=es, settings=settings, vector_store=store)
+    mgr._model = _FakeModel(settings.embedding_dim)  # type: ignore[attr-defined]
+
+    doc = DocumentContent(file_path="/tmp/g.txt", title="g", pages=[PageContent(0, "hello")])
+    mgr.index_document(doc)
+    assert ("/tmp/g.txt", 0) in store
+
+    target = mgr.save_vector_store(tmp_path / "emb")
+    assert target is not None and len(EmbeddingStore.open(target, dim=8)) == 1
+
+
+def test_bulk_index_batches_encode_and_bulk_requests() -> None:
+    from src.core.models.configuration import ApplicationConfig, PerformanceSettings
+
+    es = _FakeES()
+    cfg = ApplicationConfig(performance_settings=PerformanceSettings(indexing_batch_size=4))
+    mgr = IndexManager(es_client=es, settings=IndexSettings(index_name="docs", embedding_dim=8), config=cfg)
+    model = _FakeModel(8)
+    mgr._model = model  # type: ignore[attr-defined]
+
+    docs = (
+        DocumentContent(file_path=f"/tmp/{i}.txt", title=str(i), pages=[PageContent(0, f"text {i}")])
+        for i in range(10)
+    )
+    out = mgr.bulk_index(docs)
+    assert len(out) == 10 and len(es.indexed) == 10
+    # 10 docs in batches of 4 -> 3 encodes and 3 _bulk requests, no per-doc index calls
+    assert model.calls == 3 and es.bulk_calls == 3
+    assert [p["title"] for p in out] == [str(i) for i in range(10)]
+
+
+def test_index_document_indexes_one_record_per_chunk() -> None:
+    from src.core.indexing import ChunkSettings
+    from src.core.search.vector_store import EmbeddingStore
+
+    es = _FakeES()
+    settings = IndexSettings(index_name="docs", embedding_dim=8, chunking=ChunkSettings(max_tokens=4, overlap_tokens=1))
+    store = EmbeddingStore(dim=8)
+    mgr = IndexManager(es_client=es, settings=settings, vector_store=store)
+    mgr._model = _FakeModel(8)  # type: ignore[attr-defined]
+
+    doc = DocumentContent(
+        file_path="/tmp/h.txt",
+        title="h",
+        pages=[PageContent(0, "a b c d e f g"), PageContent(1, "tail")],
+    )
+    payloads = mgr.index_document(doc)
+    # Page 0 -> windows [a..d], [d..g]; page 1 -> one chunk
+    assert [(p["page_number"], p["chunk_index"]) for p in payloads] == [(0, 0), (0, 1), (1, 0)]
+    assert payloads[1]["content"] == "d e f g"
+    assert all(p["document_id"] == "/tmp/h.txt" for p in payloads)
+    assert ("/tmp/h.txt", 1, 0) in store and len(store) == 3
+    assert store.remove("/tmp/h.txt", 0) == 2
+
+
+def test_indexing_feeds_vocabulary(tmp_path) -> None:
+    from src.core.search.vocabulary import Vocabulary
+
+    vocab = Vocabulary()
+    mgr = IndexManager(es_client=_FakeES(), settings=IndexSettings(embedding_dim=8), vocabulary=vocab)
+    mgr._model = _FakeModel(8)  # type: ignore[attr-defined]
+    mgr.index_document(DocumentContent(file_path="/tmp/v.txt", title="Notes", pages=[PageContent(0, "graph graph tree")]))
+    assert vocab.frequency("graph") == 2 and "notes" in vocab
+    target = mgr.save_vocabulary(tmp_path / "vocab.json")
+    assert target is not None and target.exists()
+
+
+def test_reindexing_and_removal_update_vocabulary(tmp_path) -> None:
+    from src.core.documents import ManifestStore
+    from src.core.search.vocabulary import Vocabulary
+
+    vocab = Vocabulary()
+    mgr = IndexManager(es_client=_FakeES(), settings=IndexSettings(embedding_dim=8), vocabulary=vocab)
+    mgr._model = _FakeModel(8)  # type: ignore[attr-defined]
+    path = str(tmp_path / "v.txt")
+    mgr.index_document(DocumentContent(file_path=path, title="Notes", pages=[PageContent(0, "graph graph tree")]))
+    mgr.index_document(DocumentContent(file_path=path, title="Notes", pages=[PageContent(0, "graph forest")]))
+    assert vocab.frequency("graph") == 1 and "tree" not in vocab and "forest" in vocab
+
+    mgr._remove_paths([path], ManifestStore(tmp_path / "manifest.sqlite"))
+    assert vocab.terms() == []
+
+
+def test_local_backend_indexes_without_elasticsearch(tmp_path) -> None:
+    from src.core.models.configuration import ApplicationConfig, SearchSettings
+    from src.core.search.local_index import LocalIndex
+
+    class _NoES:
+        def bulk(self, operations: list) -> dict:
+            raise AssertionError("Elasticsearch must not be used with the local backend")
+
+    cfg = ApplicationConfig(search_settings=SearchSettings(exact_search_backend="local"))
+    local = LocalIndex(tmp_path)
+    mgr = IndexManager(es_client=_NoES(), settings=IndexSettings(embedding_dim=8), config=cfg, local_index=local)
+    mgr._model = _FakeModel(8)  # type: ignore[attr-defined]
+    mgr.ensure_index()
+    doc = DocumentContent(file_path="/tmp/l.txt", title="Local", pages=[PageContent(0, "alpha beta"), PageContent(1, "gamma")])
+    mgr.index_document(doc)
+    mgr.index_document(DocumentContent(file_path="/tmp/l.txt", title="Local", pages=[PageContent(0, "delta")]))
+
+    hits = LocalIndex.open(tmp_path).search(query={"multi_match": {"query": "alpha gamma delta"}})["hits"]["hits"]
+    assert [h["_source"]["content"] for h in hits] == ["delta"]  # re-index dropped the old pages
+    assert "embedding" not in hits[0]["_source"]
+
+
+def test_index_paths_skips_unchanged_files(tmp_path) -> None:
+    from src.core.documents import DocumentManager, ManifestStore
+    from src.core.documents.text import TextProcessor
+
+    docs = DocumentManager()
+    docs.register(TextProcessor())
+    files = [tmp_path / f"f{i}.txt" for i in range(3)]
+    for f in files:
+        f.write_text(f"content of {f.stem}")
+    (tmp_path / "skip.bin").write_bytes(b"\x00")
+
+    es = _FakeES()
+    mgr = IndexManager(es_client=es, settings=IndexSettings(embedding_dim=8))
+    model = _FakeModel(8)
+    mgr._model = model  # type: ignore[attr-defined]
+    manifest = ManifestStore(tmp_path / "manifest.sqlite")
+
+    report = mgr.index_paths(sorted(tmp_path.iterdir()), docs, manifest)
+    assert sorted(report.indexed) == [str(f) for f in files] and report.skipped == 0
+
+    files[1].write_text("changed content")
+    calls = model.calls
+    report = mgr.index_paths(sorted(tmp_path.iterdir()), docs, manifest)
+    assert report.indexed == [str(files[1])] and report.skipped == 2
+    assert model.calls == calls + 1  # only the changed file was embedded
+
+
+def test_index_paths_streams_long_documents_in_page_windows(tmp_path) -> None:
+    from src.core.documents import DocumentManager, DocumentProcessor, PageStream
+    from src.core.search.local_index import LocalIndex
+
+    pulled: List[int] = []
+
+    class _LongProcessor(DocumentProcessor):
+        name = "long"
+        supported_suffixes = [".long"]
+
+        def process(self, file_path):  # noqa: ANN001
+            return self.stream(file_path).collect()
+
+        def stream(self, file_path):  # noqa: ANN001
+            def pages():
+                for i in range(5):
+                    pulled.append(i)
+                    yield PageContent(i, f"page {i} text" if i != 3 else "")
+
+            return PageStream(DocumentContent(file_path=file_path, title="Manual"), pages(), page_count=5)
+
+    docs = DocumentManager()
+    docs.register(_LongProcessor())
+    (tmp_path / "m.long").write_text("x")
+
+    encoded: List[int] = []
+
+    class _TrackingModel(_FakeModel):
+        def encode(self, texts, normalize_embeddings=True):  # noqa: ANN001
+            encoded.append(len(pulled))  # pages extracted so far when a window is embedded
+            return super().encode(texts, normalize_embeddings)
+
+    es = _FakeES()
+    local = LocalIndex(tmp_path / "idx")
+    mgr = IndexManager(es_client=es, settings=IndexSettings(embedding_dim=8), local_index=local)
+    mgr._model = _TrackingModel(8)  # type: ignore[attr-defined]
+
+    report = mgr.index_paths([tmp_path / "m.long"], docs, stream_pages=2)
+
+    assert report.indexed == [str(tmp_path / "m.long")]
+    assert encoded == [2, 4, 5]  # embedded window by window, not after the whole document
+    records = [d["document"] for d in es.indexed]
+    assert [r["page_number"] for r in records] == [0, 1, 2, 4]
+    assert {r["page_count"] for r in records} == {5}
+    assert len(local) == 4
+
+
+def test_reindexing_with_fewer_chunks_drops_stale_chunks_everywhere(tmp_path) -> None:
+    from src.core.indexing import ChunkSettings
+    from src.core.search.local_index import LocalIndex
+    from src.core.search.vector_store import EmbeddingStore
+
+    es = _FakeES()
+    settings = IndexSettings(index_name="docs", embedding_dim=8, chunking=ChunkSettings(max_tokens=4, overlap_tokens=1))
+    store = EmbeddingStore(dim=8)
+    local = LocalIndex(tmp_path)
+    mgr = IndexManager(es_client=es, settings=settings, vector_store=store, local_index=local)
+    mgr._model = _FakeModel(8)  # type: ignore[attr-defined]
+
+    long_text = " ".join(f"w{i}" for i in range(30))
+    mgr.index_document(DocumentContent(file_path="/tmp/s.txt", title="s", pages=[PageContent(0, long_text), PageContent(1, "x")]))
+    assert len(store) == len(es.indexed) == len(local) == 11
+    mgr.index_document(DocumentContent(file_path="/tmp/s.txt", title="s", pages=[PageContent(0, "short")]))
+
+    assert len(store) == 1 and ("/tmp/s.txt", 0, 0) in store
+    assert [(d["document"]["page_number"], d["document"]["chunk_index"]) for d in es.indexed] == [(0, 0)]
+    assert len(local) == 1
+
+
+def test_bulk_item_errors_are_reported_and_not_recorded_in_manifest(tmp_path) -> None:
+    import pytest
+
+    from src.core.documents import DocumentManager, ManifestStore
+    from src.core.documents.text import TextProcessor
+    from src.core.exceptions.exceptions import BulkIndexError
+
+    class _RejectingES(_FakeES):
+        def bulk(self, operations: list) -> dict:
+            super().bulk(operations)
+            items = []
+            for action, document in zip(operations[::2], operations[1::2]):
+                result: Dict[str, Any] = {"_id": action["index"]["_id"], "status": 201}
+                if document["title"] == "bad":
+                    result = {"_id": action["index"]["_id"], "status": 400, "error": {"type": "mapper_parsing_exception", "reason": "failed to parse"}}
+                items.append({"index": result})
+            return {"errors": any("error" in i["index"] for i in items), "items": items}
+
+    docs = DocumentManager()
+    docs.register(TextProcessor())
+    good, bad = tmp_path / "good.txt", tmp_path / "bad.txt"
+    good.write_text("fine")
+    bad.write_text("broken")
+    mgr = IndexManager(es_client=_RejectingES(), settings=IndexSettings(embedding_dim=8))
+    mgr._model = _FakeModel(8)  # type: ignore[attr-defined]
+    manifest = ManifestStore(tmp_path / "manifest.sqlite")
+
+    report = mgr.index_paths([good, bad], docs, manifest)
+    assert report.indexed == [str(good)]
+    assert "failed to parse" in report.failed[str(bad)]
+    assert set(manifest.entries()) == {str(good)}
+    # Not in the manifest, so the next run retries it
+    assert mgr.index_paths([good, bad], docs, manifest).failed.keys() == {str(bad)}
+
+    with pytest.raises(BulkIndexError) as info:
+        mgr.index_document(DocumentContent(file_path=bad, title="bad", pages=[PageContent(0, "x")]))
+    assert list(info.value.failed) == [str(bad)]
+
+
+def test_index_paths_deletes_vanished_files_everywhere(tmp_path) -> None:
+    from src.core.documents import DocumentManager, ManifestStore
+    from src.core.documents.text import TextProcessor
+    from src.core.search.local_index import LocalIndex
+    from src.core.search.vector_store import EmbeddingStore
+
+    docs = DocumentManager()
+    docs.register(TextProcessor())
+    src = tmp_path / "src"
+    src.mkdir()
+    files = [src / f"f{i}.txt" for i in range(3)]
+    for f in files:
+        f.write_text(f"content of {f.stem}")
+    es = _FakeES()
+    store = EmbeddingStore(dim=8)
+    local = LocalIndex(tmp_path / "idx")
+    mgr = IndexManager(es_client=es, settings=IndexSettings(embedding_dim=8), vector_store=store, local_index=local)
+    mgr._model = _FakeModel(8)  # type: ignore[attr-defined]
+    manifest = ManifestStore(tmp_path / "manifest.sqlite")
+    mgr.index_paths(files, docs, manifest)
+
+    # f0 vanished but is still listed; f1 is no longer listed at all
+    files[0].unlink()
+    report = mgr.index_paths([files[0], files[2]], docs, manifest)
+    assert report.removed == [str(files[0])] and not report.failed and report.skipped == 1
+    assert set(manifest.entries()) == {str(files[1]), str(files[2])}
+
+    report = mgr.index_paths([files[2]], docs, manifest, prune=True)
+    assert report.removed == [str(files[1])]
+    assert set(manifest.entries()) == {str(files[2])}
+    assert {d["document"]["document_id"] for d in es.indexed} == {str(files[2])}
+    assert len(store) == 1 and (str(files[2]), 0) in store
+    assert len(local) == 1
+
+
+def test_stale_chunks_are_deleted_only_after_a_successful_bulk(tmp_path) -> None:
+    import pytest
+
+    from src.core.documents import DocumentManager, ManifestStore
+    from src.core.documents.text import TextProcessor
+    from src.core.exceptions.exceptions import BulkIndexError
+
+    class _FlakyES(_FakeES):
+        reject = False
+
+        def bulk(self, operations: list) -> dict:
+            if not self.reject:
+                return super().bulk(operations)
+            items = [{"index": {"_id": a["index"]["_id"], "status": 503, "error": {"reason": "busy"}}} for a in operations[::2]]
+            return {"errors": True, "items": items}
+
+    docs = DocumentManager()
+    docs.register(TextProcessor())
+    files = [tmp_path / f"f{i}.txt" for i in range(2)]
+    for f in files:
+        f.write_text(f"first version of {f.stem}")
+    es = _FlakyES()
+    mgr = IndexManager(es_client=es, settings=IndexSettings(embedding_dim=8))
+    mgr._model = _FakeModel(8)  # type: ignore[attr-defined]
+    manifest = ManifestStore(tmp_path / "manifest.sqlite")
+    mgr.index_paths(files, docs, manifest)
+    assert es.delete_calls == 0  # new documents: nothing stale to delete
+
+    files[0].write_text("second version, now longer than before")
+    mgr.index_paths(files, docs, manifest)
+    assert es.delete_calls == 1
+    assert [d["document"]["content"] for d in es.indexed if d["document"]["document_id"] == str(files[0])] == [
+        "second version, now longer than before"
+    ]
+
+    es.reject = True
+    with pytest.raises(BulkIndexError):
+        mgr.index_document(DocumentContent(file_path=str(files[1]), title="f1", pages=[PageContent(0, "x")]))
+    assert es.delete_calls == 1  # the rejected document keeps its indexed chunks
+    assert any(d["document"]["document_id"] == str(files[1]) for d in es.indexed)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pytest
+
+from src.core.documents import DocumentManager, ExtractionCache, ManifestStore, TextProcessor
+from src.core.indexing import IndexManager, IndexSettings, ReEncoder, ReEncodeSettings
+from src.core.models.configuration import ApplicationConfig, SearchSettings
+from src.core.models.service import ReEncodingResult
+from src.core.search.vector_store import EmbeddingStore
+
+
+class _Model:
+    def __init__(self, dim: int, fail_on_call: Optional[int] = None) -> None:
+        self.dim = dim
+        self.calls = 0
+        self.texts: List[str] = []
+        self._fail_on_call = fail_on_call
+
+    def encode(self, texts: list[str], normalize_embeddings: bool = True):  # noqa: ANN001
+        self.calls += 1
+        if self.calls == self._fail_on_call:
+            raise RuntimeError("simulated crash")
+        self.texts.extend(texts)
+        return [[1.0] + [0.0] * (self.dim - 1) for _ in texts]
+
+
+def _indexed_corpus(tmp_path: Path, n: int = 4) -> Tuple[ManifestStore, DocumentManager, Path]:
+    """Index `n` one-chunk text files with the default model and save the live store."""
+    docs = DocumentManager(cache=ExtractionCache(tmp_path / "extracted"))
+    docs.register(TextProcessor())
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(n):
+        (src / f"doc{i}.txt").write_text(f"document number {i}", encoding="utf-8")
+    store = EmbeddingStore(dim=8)
+    mgr = IndexManager(es_client=_NoES(), settings=IndexSettings(embedding_dim=8), vector_store=store)
+    mgr._model = _Model(8)  # type: ignore[attr-defined]
+    manifest = ManifestStore(tmp_path / "manifest.sqlite")
+    mgr.index_paths(sorted(src.iterdir()), docs, manifest)
+    live = tmp_path / "embeddings"
+    store.save(live)
+    return manifest, docs, live
+
+
+class _NoES:
+    def bulk(self, operations: list) -> dict:
+        return {"errors": False}
+
+    def delete_by_query(self, **_kwargs: object) -> dict:
+        return {"deleted": 0}
+
+
+def _config(model: str = "new-model") -> ApplicationConfig:
+    return ApplicationConfig(search_settings=SearchSettings(current_model_name=model))
+
+
+def test_reencode_swaps_in_new_vectors_without_reading_originals(tmp_path: Path) -> None:
+    manifest, docs, live = _indexed_corpus(tmp_path)
+    for f in (tmp_path / "src").iterdir():
+        f.unlink()  # text must come from the extraction cache
+    model = _Model(4)
+    seen: List[ReEncodingResult] = []
+    swapped: List[Tuple[EmbeddingStore, object]] = []
+
+    result = ReEncoder(manifest, docs, live, _config(), model, ReEncodeSettings(batch_size=3)).run(
+        progress=seen.append, on_swap=lambda store, m: swapped.append((store, m))
+    )
+
+    assert result.is_complete and result.re_encoded_documents == 4 and result.failed_documents == 0
+    assert (result.old_model, result.new_model) == ("all-MiniLM-L6-v2", "new-model")
+    assert result.estimated_time_remaining == 0
+    assert model.calls == 2  # 4 chunks in batches of 3
+    assert model.texts[0] == "doc0\ndocument number 0"  # same input format as indexing
+    assert [r.re_encoded_documents for r in seen] == sorted(r.re_encoded_documents for r in seen)
+
+    store = EmbeddingStore.load(live)
+    assert store.dim == 4 and len(store) == 4
+    assert EmbeddingStore.load(live.with_name("embeddings.previous")).dim == 8
+    assert not live.with_name("embeddings.reencode").exists()
+    assert not (live / ReEncoder.CHECKPOINT_FILE).exists()
+    assert {e.model_name for e in manifest.entries().values()} == {"new-model"}
+    assert swapped and swapped[0][0].dim == 4 and swapped[0][1] is model
+
+    # A second run finds nothing left to do
+    again = ReEncoder(manifest, docs, live, _config(), _Model(4)).run()
+    assert again.is_complete and again.re_encoded_documents == 4
+
+
+def test_reencode_resumes_from_checkpoint_after_crash(tmp_path: Path) -> None:
+    manifest, docs, live = _indexed_corpus(tmp_path, n=5)
+    settings = ReEncodeSettings(batch_size=1, checkpoint_interval_sec=0.0)
+
+    crashing = _Model(4, fail_on_call=4)
+    with pytest.raises(RuntimeError):
+        ReEncoder(manifest, docs, live, _config(), crashing, settings).run()
+    # The live store is untouched while the job is unfinished
+    assert EmbeddingStore.load(live).dim == 8
+
+    resumed = _Model(4)
+    progress: List[ReEncodingResult] = []
+    result = ReEncoder(manifest, docs, live, _config(), resumed, settings).run(progress=progress.append)
+
+    assert result.is_complete and result.re_encoded_documents == 5
+    assert [t.split("\n")[0] for t in resumed.texts] == ["doc3", "doc4"]  # doc0..doc2 were checkpointed
+    assert progress[0].re_encoded_documents == 4 and progress[0].estimated_time_remaining is not None
+    store = EmbeddingStore.load(live)
+    assert store.dim == 4 and len(store) == 5
+    assert np.allclose(store.matrix[:, 0], 1.0)
+
+
+def test_changing_target_model_discards_the_shadow(tmp_path: Path) -> None:
+    manifest, docs, live = _indexed_corpus(tmp_path, n=3)
+    settings = ReEncodeSettings(batch_size=1, checkpoint_interval_sec=0.0)
+    with pytest.raises(RuntimeError):
+        ReEncoder(manifest, docs, live, _config("model-a"), _Model(4, fail_on_call=3), settings).run()
+
+    other = _Model(6)
+    result = ReEncoder(manifest, docs, live, _config("model-b"), other, settings).run()
+
+    assert result.is_complete and result.new_model == "model-b"
+    assert len(other.texts) == 3
+    assert EmbeddingStore.load(live).dim == 6
+
+
+def test_reencode_without_cache_re_extracts_unchanged_files(tmp_path: Path) -> None:
+    manifest, _docs, live = _indexed_corpus(tmp_path, n=2)
+    uncached = DocumentManager()  # the default: no extraction cache
+    uncached.register(TextProcessor())
+    model = _Model(4)
+
+    result = ReEncoder(manifest, uncached, live, _config(), model).run()
+
+    assert result.is_complete and result.re_encoded_documents == 2
+    store = EmbeddingStore.load(live)
+    assert store.dim == 4 and len(store) == 2
+
+
+def test_reencode_does_not_swap_while_documents_are_unavailable(tmp_path: Path) -> None:
+    manifest, _docs, live = _indexed_corpus(tmp_path, n=3)
+    for f in (tmp_path / "src").iterdir():
+        f.unlink()
+    uncached = DocumentManager()
+    uncached.register(TextProcessor())
+
+    result = ReEncoder(manifest, uncached, live, _config(), _Model(4)).run()
+    assert not result.is_complete and result.failed_documents == 3
+    store = EmbeddingStore.load(live)
+    assert store.dim == 8 and len(store) == 3  # live store kept as it was
+    assert {e.model_name for e in manifest.entries().values()} == {"all-MiniLM-L6-v2"}
+
+    # Partial cache: one blob evicted, the others still there
+    cache = ExtractionCache(tmp_path / "extracted")
+    evicted = next(iter(manifest.entries().values()))
+    cache.blob_path(evicted.content_hash, evicted.processor_version).unlink()
+    partial = DocumentManager(cache=cache)
+    partial.register(TextProcessor())
+    result = ReEncoder(manifest, partial, live, _config(), _Model(4)).run()
+    assert not result.is_complete and result.re_encoded_documents == 2 and result.failed_documents == 1
+    assert EmbeddingStore.load(live).dim == 8
@@ -24,3 +24,21 @@ def test_batch_cosine_parallel_runs() -> None:
 def test_gpu_available_returns_bool() -> None:
     assert isinstance(gpu_available(), bool)
 
+
+
+def test_top_k_cosine_returns_sorted_indices_and_scores() -> None:
+    import numpy as np
+
+    from src.core.performance import top_k_cosine
+
+    mat = np.array([[1, 0, 0], [0, 1, 0], [1, 1, 0], [3, 0.1, 0], [0, 0, 0]], dtype=np.float32)
+    idx, scores = top_k_cosine(mat, [1, 0, 0], k=2)
+    assert idx.tolist() == [0, 3]
+    assert scores[0] >= scores[1] and math.isclose(float(scores[0]), 1.0, rel_tol=1e-6)
+
+    # k larger than N returns everything; zero rows score 0
+    idx_all, scores_all = top_k_cosine(mat, [1, 0, 0], k=10)
+    assert len(idx_all) == 5 and float(scores_all[-1]) <= 0.0
+    # normalized=True is a plain dot product
+    _idx, raw = top_k_cosine(mat, [1, 0, 0], k=1, normalized=True)
+    assert math.isclose(float(raw[0]), 3.0, rel_tol=1e-6)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from src.core.performance.lru_cache import LRUCache
+from src.core.performance.result_cache import ResultCache
+
+
+def test_lru_cache_reports_evictions() -> None:
+    evicted = []
+    c = LRUCache[str, int](capacity=1, on_evict=lambda k, v: evicted.append((k, v)))
+    c.put("a", 1)
+    c.put("b", 2)
+    assert evicted == [("a", 1)]
+    assert c.pop("b") == 2 and c.pop_lru() is None
+
+
+def test_entry_and_byte_limits_evict_lru() -> None:
+    cache = ResultCache[str, str](max_entries=3, max_bytes=10, sizer=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    assert cache.get("a") == "xxxx"  # 'a' becomes most recent
+    cache.put("c", "xxxx")  # 12 bytes > 10 -> evict LRU ('b')
+    assert cache.get("b") is None
+    cache.put("too-big", "x" * 11)  # never cached
+    assert cache.get("too-big") is None
+    stats = cache.stats()
+    assert stats.entries == 2 and stats.bytes == 8
+    assert stats.evictions == 1 and stats.hits == 1 and stats.misses == 2
+
+
+def test_ttl_expiry_and_invalidate() -> None:
+    cache = ResultCache[str, int](ttl_seconds=0.05)
+    cache.put("k", 1)
+    assert cache.get("k") == 1
+    time.sleep(0.08)
+    assert cache.get("k") is None and cache.stats().expirations == 1
+
+    cache.put("k", 2)
+    cache.invalidate()
+    assert cache.get("k") is None
+    assert cache.stats().invalidations == 1 and cache.stats().bytes == 0
+
+
+def test_concurrent_access_keeps_accounting_consistent() -> None:
+    cache = ResultCache[int, str](max_entries=50, max_bytes=10_000, sizer=len)
+
+    def worker(offset: int) -> None:
+        for i in range(500):
+            cache.put((offset + i) % 120, "x" * 10)
+            cache.get(i % 120)
+
+    threads = [threading.Thread(target=worker, args=(n * 37,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = cache.stats()
+    assert stats.entries <= 50 and stats.bytes == 10 * stats.entries
+
+
+def test_expire_sweeps_and_reports_discarded_entries() -> None:
+    dropped = []
+    cache = ResultCache[str, int](max_entries=2, ttl_seconds=0.05, on_discard=lambda k, v: dropped.append(k))
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("c", 3)  # evicts 'a'
+    assert dropped == ["a"]
+    time.sleep(0.08)
+    assert cache.expire() == 2 and sorted(dropped) == ["a", "b", "c"] and len(cache) == 0
+    cache.put("d", 4)
+    cache.invalidate()
+    assert dropped[-1] == "d"
+
+
+def test_put_from_before_an_invalidation_is_dropped() -> None:
+    cache = ResultCache[str, int]()
+    generation = cache.generation  # lookup time
+    cache.invalidate()  # index updated while the value was being computed
+    cache.put("k", 1, generation=generation)
+    assert cache.get("k") is None
+    cache.put("k", 2, generation=cache.generation)
+    assert cache.get("k") == 2
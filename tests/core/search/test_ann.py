@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.core.search.ann import AnnConfig, IVFFlatIndex, create_ann_index, load_ann_index
+from src.core.search.vector_store import EmbeddingStore
+
+
+def _clustered(n: int, dim: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(8, dim))
+    return (centers[rng.integers(0, 8, n)] + 0.1 * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def _recall(index, data: np.ndarray, queries: np.ndarray, k: int, effort: int) -> float:
+    unit = data / np.linalg.norm(data, axis=1, keepdims=True)
+    hits = 0
+    for q in queries:
+        truth = set(np.argsort(-(unit @ (q / np.linalg.norm(q))))[:k].tolist())
+        labels, _scores = index.search(q, k, effort=effort)
+        hits += len(truth & set(labels.tolist()))
+    return hits / (k * len(queries))
+
+
+def test_ivf_recall_improves_with_nprobe() -> None:
+    data = _clustered(2000, 16)
+    index = IVFFlatIndex(16, AnnConfig(backend="ivf", nlist=32))
+    index.build(list(range(len(data))), data)
+    queries = _clustered(20, 16, seed=7)
+    assert len(index) == 2000
+    assert _recall(index, data, queries, k=10, effort=32) == pytest.approx(1.0)
+    assert _recall(index, data, queries, k=10, effort=4) >= 0.6
+
+
+def test_ivf_add_remove_and_upsert() -> None:
+    index = IVFFlatIndex(2, AnnConfig(backend="ivf", nlist=2))
+    index.build([0, 1, 2], np.array([[1, 0], [0, 1], [1, 1]], dtype=np.float32))
+    index.add([3], np.array([[1, 0.1]], dtype=np.float32))
+    index.remove([0, 99])
+    labels, scores = index.search([1, 0], k=2, effort=2)
+    assert labels.tolist()[0] == 3 and 0 not in labels.tolist()
+    # Re-adding a label replaces its vector
+    index.add([3], np.array([[0, 1]], dtype=np.float32))
+    assert len(index) == 3
+    labels, _ = index.search([0, 1], k=1, effort=2)
+    assert labels[0] in (1, 3)
+
+
+def test_ivf_save_load_roundtrip(tmp_path: Path) -> None:
+    data = _clustered(300, 8)
+    index = create_ann_index(8, AnnConfig(backend="ivf", nlist=8))
+    index.build(list(range(300)), data)
+    index.save(tmp_path / "ann")
+    loaded = load_ann_index(tmp_path / "ann")
+    assert isinstance(loaded, IVFFlatIndex) and len(loaded) == 300
+    a, _ = index.search(data[5], 5, effort=8)
+    b, _ = loaded.search(data[5], 5, effort=8)
+    assert a.tolist() == b.tolist()
+
+
+def test_store_routes_search_through_attached_index(tmp_path: Path) -> None:
+    data = _clustered(500, 8)
+    store = EmbeddingStore(dim=8)
+    store.add_many([(f"D{i}", 0) for i in range(500)], data, [f"t{i}" for i in range(500)])
+    store.attach_index(IVFFlatIndex(8, AnnConfig(backend="ivf", nlist=10)))
+
+    # Kept in sync on add/remove
+    store.remove("D0")
+    store.add("NEW", 1, data[0] * 3, "new")
+    hits = store.search(data[0], k=3, effort=10)
+    assert hits[0][0].document_id == "NEW"
+    assert all(rec.document_id != "D0" for rec, _ in hits)
+
+    store.save(tmp_path / "emb")
+    loaded = EmbeddingStore.open(tmp_path / "emb", dim=8)
+    assert loaded.ann_index is not None and len(loaded.ann_index) == len(loaded) == 500
+    assert loaded.search(data[0], k=1, effort=10)[0][0].document_id == "NEW"
+
+
+def test_store_save_logs_ann_changes_instead_of_rewriting(tmp_path: Path) -> None:
+    data = _clustered(500, 8)
+    store = EmbeddingStore(dim=8)
+    store.add_many([(f"D{i}", 0) for i in range(500)], data)
+    store.attach_index(IVFFlatIndex(8, AnnConfig(backend="ivf", nlist=10)))
+    store.save(tmp_path / "emb")
+    base = (tmp_path / "emb" / "ann" / "ivf.npz").read_bytes()
+
+    store.remove("D0")
+    store.add("NEW", 1, data[0] * 3)
+    store.save(tmp_path / "emb")
+    assert (tmp_path / "emb" / "ann" / "ivf.npz").read_bytes() == base
+    assert (tmp_path / "emb" / "ann" / "changes.log").exists()
+
+    loaded = EmbeddingStore.load(tmp_path / "emb")
+    assert loaded.ann_index is not None and len(loaded.ann_index) == len(loaded) == 500
+    hits = loaded.search(data[0], k=3, effort=10)
+    assert hits[0][0].document_id == "NEW" and all(rec.document_id != "D0" for rec, _ in hits)
+
+
+def test_quantized_store_ivf_scores_on_codes(tmp_path: Path) -> None:
+    data = _clustered(500, 16)
+    unit = data / np.linalg.norm(data, axis=1, keepdims=True)
+    store = EmbeddingStore(dim=16, quantization="int8")
+    store.add_many([(f"D{i}", 0) for i in range(500)], data)
+    index = IVFFlatIndex(16, AnnConfig(backend="ivf", nlist=10))
+    store.attach_index(index)
+    assert not index.has_vectors  # no float copy next to the codes
+
+    hits = store.search(data[3], k=5, effort=10)
+    assert hits[0][0].document_id == "D3" and hits[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert hits[1][1] == pytest.approx(float(np.sort(unit @ unit[3])[-2]), abs=1e-5)
+
+    store.save(tmp_path / "emb")
+    loaded = EmbeddingStore.load(tmp_path / "emb", quantization="int8")
+    assert loaded.ann_index is not None and not loaded.ann_index.has_vectors
+    assert loaded.search(data[3], k=1, effort=10)[0][0].document_id == "D3"
+    floats = EmbeddingStore.load(tmp_path / "emb")  # rebuilt with vectors for a float store
+    assert floats.ann_index is not None and floats.ann_index.has_vectors
+    assert floats.search(data[3], k=1, effort=10)[0][0].document_id == "D3"
+
+
+@pytest.mark.parametrize("backend", ["hnswlib", "faiss"])
+def test_optional_backends(backend: str, tmp_path: Path) -> None:
+    pytest.importorskip(backend)
+    data = _clustered(400, 8)
+    index = create_ann_index(8, AnnConfig(backend=backend, nlist=4))
+    index.build(list(range(400)), data)
+    index.remove([0])
+    index.add([1000], data[:1])
+    assert len(index) == 400
+    labels, scores = index.search(data[0], 3, effort=64)
+    assert labels[0] == 1000 and scores[0] == pytest.approx(1.0, abs=1e-4)
+    index.save(tmp_path / backend)
+    loaded = load_ann_index(tmp_path / backend)
+    assert len(loaded) == 400 and loaded.search(data[0], 1, effort=64)[0][0] == 1000
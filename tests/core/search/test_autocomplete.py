@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from src.core.search.autocomplete import PrefixIndex
+from src.core.search.vocabulary import Vocabulary
+
+
+def test_completions_ranked_by_weight_then_alphabetically() -> None:
+    idx = PrefixIndex(top_k=3, precompute_depth=2)
+    idx.update({"search": 5, "seal": 5, "second": 1, "banana": 9})
+    assert idx.complete("se", 3) == [("seal", 5), ("search", 5), ("second", 1)]
+    assert idx.complete("sea", 5) == [("seal", 5), ("search", 5)]
+    assert idx.complete("x") == []
+
+
+def test_updates_patch_cached_prefixes() -> None:
+    idx = PrefixIndex(top_k=2, precompute_depth=2)
+    idx.update({"alpha": 1, "alps": 2, "alto": 3})
+    assert [t for t, _ in idx.complete("al", 2)] == ["alto", "alps"]
+    idx.update({"alpha": 10})  # promoted into the cached list
+    assert [t for t, _ in idx.complete("al", 2)] == ["alpha", "alto"]
+    idx.update({"alpha": 0, "alto": 1})  # removal and demotion invalidate it
+    assert [t for t, _ in idx.complete("al", 2)] == ["alps", "alto"]
+
+
+def test_follows_vocabulary_changes() -> None:
+    vocab = Vocabulary()
+    vocab.add_text("graph graph grammar")
+    idx = PrefixIndex.from_vocabulary(vocab)
+    assert idx.complete("gra") == [("graph", 2), ("grammar", 1)]
+    vocab.add_text("grammar grammar")
+    assert idx.complete("gra")[0] == ("grammar", 3)
+
+
+def test_bulk_updates_merge_terms_in_one_pass() -> None:
+    idx = PrefixIndex(top_k=3)
+    idx.update({f"term{i:04d}": i for i in range(1000, 0, -1)})
+    assert idx._terms == sorted(idx._terms) and len(idx) == 1000
+    idx.update({"term0001": 0, "term0002": 5, **{f"extra{i:03d}": 1 for i in range(100)}, "Extra000": 0})
+    assert idx._terms == sorted(idx._terms) and len(idx) == 1098
+    assert idx.complete("term000", 3) == [("term0009", 9), ("term0008", 8), ("term0007", 7)]
+    assert idx.complete("extra000") == []
+
+
+def test_removed_documents_drop_their_completions() -> None:
+    vocab = Vocabulary()
+    vocab.add_text("graph grammar", document_id="a")
+    vocab.add_text("graph", document_id="b")
+    idx = PrefixIndex.from_vocabulary(vocab)
+    vocab.discard_document("a")
+    assert idx.complete("gra") == [("graph", 1)]
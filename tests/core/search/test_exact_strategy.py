@@ -46,3 +46,51 @@ def test_search_calls_es_with_built_query():
     assert body["query"]["bool"]["must"][0]["multi_match"]["query"] == "apple"
     assert body["query"]["bool"]["must"][1]["multi_match"]["query"] == "banana"
 
+
+
+def test_nested_chains_are_flattened_and_double_not_collapsed():
+    s = ExactSearchStrategy()
+    q = s.build_query("a AND (b AND (c AND NOT NOT d))")
+    assert [m["multi_match"]["query"] for m in q["bool"]["must"]] == ["a", "b", "c", "d"]
+
+    q = s.build_query("(a OR b) OR (c OR a)")
+    assert [m["multi_match"]["query"] for m in q["bool"]["should"]] == ["a", "b", "c"]
+
+    q = s.build_query("NOT (x OR y)")
+    assert [m["multi_match"]["query"] for m in q["bool"]["must_not"]] == ["x", "y"]
+
+
+def test_plans_are_cached_and_returned_as_copies(monkeypatch):
+    s = ExactSearchStrategy(plan_cache_size=4)
+    first = s.build_query("apple  AND banana")
+    first["bool"]["must"].clear()  # caller mutation must not leak into the cache
+
+    def _no_parse(expr):  # noqa: ANN001
+        raise AssertionError("cached expression was parsed again")
+
+    monkeypatch.setattr(s, "_parse", _no_parse)
+    again = s.build_query("apple AND   banana")
+    assert len(again["bool"]["must"]) == 2
+
+
+def test_phrase_proximity_field_and_prefix_clauses():
+    s = ExactSearchStrategy()
+    q = s.build_query('"binary tree"~2 AND title:graph AND path:docs/alg* AND content:"red black" AND heap*')
+    must = q["bool"]["must"]
+    assert must[0] == {"multi_match": {"query": "binary tree", "type": "phrase", "fields": ["title^2", "content"], "slop": 2}}
+    assert must[1] == {"match": {"title": "graph"}}
+    assert must[2] == {"prefix": {"file_path": {"value": "docs/alg", "case_insensitive": True}}}
+    assert must[3] == {"match_phrase": {"content": {"query": "red black"}}}
+    assert must[4]["multi_match"]["type"] == "bool_prefix"
+
+
+def test_quoted_operators_and_unknown_prefixes_are_terms():
+    s = ExactSearchStrategy()
+    assert s.build_query('"AND"')["multi_match"]["query"] == "AND"
+    assert s.build_query("http://example.org")["multi_match"]["query"] == "http://example.org"
+    assert s.build_query('topic:"algorithms/trees"') == {"term": {"metadata.topic_path.keyword": "algorithms/trees"}}
+    try:
+        s.build_query('nope:"x y"')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
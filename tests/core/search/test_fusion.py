@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pytest
+
+from src.core.models.search import MatchType, SearchResult
+from src.core.search.fusion import SearchRankWeights, fuse
+
+
+def _r(doc: str, score: float, mt: MatchType, page: int = 0) -> SearchResult:
+    return SearchResult(doc, doc, page, doc, score, mt, doc)
+
+
+def _legs():
+    return {
+        "exact": [_r("A", 1.0, MatchType.EXACT), _r("B", 0.4, MatchType.EXACT)],
+        "semantic": [_r("B", 0.9, MatchType.SEMANTIC), _r("C", 0.8, MatchType.SEMANTIC)],
+    }
+
+
+def test_rrf_rewards_agreement_between_legs() -> None:
+    out = fuse(_legs(), SearchRankWeights(exact=1.0, semantic=1.0), limit=3, method="rrf")
+    assert [r.document_id for r in out] == ["B", "A", "C"]
+    assert all(0.0 <= r.relevance_score <= 1.0 for r in out)
+    # B's best contribution came from its semantic rank 1
+    assert out[0].match_type == MatchType.SEMANTIC
+
+
+def test_minmax_and_zscore_are_scale_invariant() -> None:
+    legs = _legs()
+    scaled = {k: [_r(r.document_id, r.relevance_score / 10, r.match_type) for r in v] for k, v in legs.items()}
+    for method in ("minmax", "zscore"):
+        a = [r.document_id for r in fuse(legs, SearchRankWeights(), 3, method=method)]
+        b = [r.document_id for r in fuse(scaled, SearchRankWeights(), 3, method=method)]
+        assert a == b
+
+
+def test_max_keeps_best_weighted_score_and_dedupes_pages() -> None:
+    legs = {"exact": [_r("A", 0.5, MatchType.EXACT), _r("A", 0.4, MatchType.EXACT)], "fuzzy": [_r("A", 1.0, MatchType.FUZZY)]}
+    out = fuse(legs, SearchRankWeights(exact=1.0, fuzzy=0.7), limit=5, method="max")
+    assert len(out) == 1 and out[0].relevance_score == pytest.approx(0.7)
+    assert out[0].match_type == MatchType.FUZZY
+
+
+def test_limit_and_unknown_method() -> None:
+    assert len(fuse(_legs(), SearchRankWeights(), limit=1)) == 1
+    with pytest.raises(ValueError):
+        fuse(_legs(), SearchRankWeights(), limit=1, method="borda")
@@ -63,3 +63,19 @@ def test_search_invokes_es_with_fuzzy_query():
     assert body["size"] == 7
     assert "fuzziness" in body["query"]["multi_match"]
 
+
+
+def test_suggestions_from_vocabulary_skip_corpus_scan():
+    from src.core.search.vocabulary import Vocabulary
+
+    def _no_corpus():  # noqa: ANN202
+        raise AssertionError("corpus must not be materialised when a vocabulary is attached")
+
+    vocab = Vocabulary()
+    vocab.add_text("hello world banana bread elasticsearch")
+    cfg = ApplicationConfig(search_settings=SearchSettings(fuzzy_accuracy_target=0.6))
+    strat = FuzzySearchStrategy(app_config=cfg, corpus_provider=_no_corpus, vocabulary=vocab)
+
+    assert strat.suggest("elasticsaerch")[0][0] == "elasticsearch"
+    phrase, conf = strat.suggest("helo wrld")[0]
+    assert phrase == "hello world" and conf >= 0.6
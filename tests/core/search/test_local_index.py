@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from src.core.models.configuration import ApplicationConfig, SearchSettings
+from src.core.search import LocalIndex, SearchManager
+from src.core.search.segments import TieredMergePolicy
+from src.core.search.strategies import ExactSearchStrategy
+
+
+def _rec(doc: str, page: int, title: str, content: str, topic: str = "") -> tuple:
+    src = {
+        "document_id": doc,
+        "title": title,
+        "file_path": f"/docs/{doc}.pdf",
+        "page_number": page,
+        "chunk_index": 0,
+        "content": content,
+        "metadata": {"topic_path": topic},
+    }
+    return f"{doc}#p{page}c0", src
+
+
+def _index(tmp: Path | None = None) -> LocalIndex:
+    idx = LocalIndex(tmp)
+    idx.add(
+        [
+            _rec("a", 1, "Apple pie", "apple pie with banana bread on the side", "food/fruit"),
+            _rec("b", 1, "Bread", "banana and walnut bread recipe", "food/baking"),
+            _rec("c", 2, "Cherries", "cherry tart and apple crumble", "food/fruit"),
+            _rec("d", 1, "Engines", "internal combustion engine maintenance", "tech"),
+        ]
+    )
+    idx.commit()
+    return idx
+
+
+def _ids(resp: dict) -> list:
+    return [h["_source"]["document_id"] for h in resp["hits"]["hits"]]
+
+
+def test_bm25_ranks_title_boost_and_highlights():
+    idx = _index()
+    resp = idx.search(
+        query={"multi_match": {"query": "apple", "fields": ["title^2", "content"]}},
+        size=10,
+        highlight={"fields": {"content": {}}},
+    )
+    assert set(_ids(resp)) == {"a", "c"}
+    assert _ids(resp)[0] == "a"  # title match boosted
+    assert resp["hits"]["max_score"] == resp["hits"]["hits"][0]["_score"]
+    assert "<em>apple</em>" in resp["hits"]["hits"][0]["highlight"]["content"][0]
+
+
+def test_evaluates_exact_strategy_plans():
+    idx = _index()
+    s = ExactSearchStrategy()
+    assert set(_ids(s.search(idx, "documents", '(apple OR "banana bread") AND NOT cherry'))) == {"a"}
+    assert set(_ids(s.search(idx, "documents", '"apple pie"'))) == {"a"}
+    assert _ids(s.search(idx, "documents", '"apple banana"')) == []
+    assert set(_ids(s.search(idx, "documents", '"apple banana"~3'))) == {"a"}
+    assert set(_ids(s.search(idx, "documents", "title:bread"))) == {"b"}
+    assert set(_ids(s.search(idx, "documents", "engin*"))) == {"d"}
+    assert set(_ids(s.search(idx, "documents", "topic:food/fruit"))) == {"a", "c"}
+
+
+def test_topic_filter_and_search_after_paging():
+    idx = _index()
+    q = {"bool": {"must": [{"multi_match": {"query": "apple banana bread"}}], "filter": [{"term": {"metadata.topic_path.keyword": "food/fruit"}}]}}
+    first = idx.search(query=q, size=1, sort=[{"_score": "desc"}])
+    assert len(first["hits"]["hits"]) == 1
+    after = first["hits"]["hits"][0]["sort"]
+    second = idx.search(query=q, size=5, sort=[{"_score": "desc"}], search_after=after)
+    assert set(_ids(first) + _ids(second)) == {"a", "c"}
+    assert not set(_ids(first)) & set(_ids(second))
+
+
+def test_remove_replace_and_reopen_from_disk(tmp_path: Path):
+    idx = _index(tmp_path)
+    idx.remove("a")
+    idx.add([_rec("a", 1, "Apples", "only pears now")])
+    idx.commit()
+
+    reopened = LocalIndex.open(tmp_path)
+    assert len(reopened) == 4
+    match = {"multi_match": {"query": "pears"}}
+    assert _ids(reopened.search(query=match)) == ["a"]
+    assert set(_ids(reopened.search(query={"multi_match": {"query": "apple"}}))) == {"c"}
+    # The replacement went to a new segment; the old row is only tombstoned
+    assert reopened.segment_count == 2
+    reopened.force_merge()
+    assert len(list(tmp_path.glob("seg_*"))) == 1  # merged-away segments are cleaned up
+    assert set(_ids(LocalIndex.open(tmp_path).search(query={"match_all": {}}))) == {"a", "b", "c", "d"}
+
+
+def test_search_manager_falls_back_to_local_index():
+    class _DownES:
+        def search(self, **_body):  # noqa: ANN003
+            raise ConnectionError("no cluster")
+
+    cfg = ApplicationConfig(search_settings=SearchSettings(enable_ai_search=False))
+    sm = SearchManager(config=cfg, es_client=_DownES(), local_index=_index())
+    assert {r.document_id for r in sm.search("walnut")} == {"b"}
+
+    cfg = ApplicationConfig(search_settings=SearchSettings(exact_search_backend="elasticsearch", enable_ai_search=False))
+    sm = SearchManager(config=cfg, es_client=_DownES(), local_index=_index())
+    assert sm.search("walnut") == []
+
+
+def test_queries_are_fast_at_fast_search_scale():
+    idx = LocalIndex()
+    words = [f"w{i}" for i in range(500)]
+    idx.add(
+        _rec(f"d{i}", 1, f"doc {i}", " ".join(words[(i * 7 + j) % 500] for j in range(150)))
+        for i in range(1000)
+    )
+    idx.commit()
+    query = ExactSearchStrategy().build_query('(w1 OR w2) AND NOT w3 AND "w7 w8"')
+    idx.search(query=query, size=10)
+    started = time.perf_counter()
+    for _ in range(20):
+        idx.search(query=query, size=10)
+    assert (time.perf_counter() - started) / 20 < 0.05  # generous bound for CI noise
+
+
+def test_commits_add_segments_and_tiered_merges_bound_fan_out(tmp_path: Path):
+    policy = TieredMergePolicy(segments_per_tier=3, max_merge_at_once=3, floor_docs=2)
+    idx = LocalIndex(tmp_path, merge_policy=policy)
+    for i in range(12):
+        idx.add([_rec(f"d{i}", 1, f"doc {i}", f"shared token{i}")])
+        idx.commit()
+        assert idx.segment_count < 6
+    assert len(idx) == 12
+    resp = idx.search(query={"multi_match": {"query": "shared"}}, size=20)
+    assert resp["hits"]["total"]["value"] == 12
+    # Scores use index-wide stats, so identical docs in different segments tie
+    assert len({round(h["_score"], 6) for h in resp["hits"]["hits"]}) == 1
+
+    idx.remove("d3")
+    idx.commit()
+    reopened = LocalIndex.open(tmp_path, merge_policy=policy)
+    assert len(reopened) == 11
+    assert _ids(reopened.search(query={"multi_match": {"query": "token3"}})) == []
+
+
+def test_background_merge_keeps_concurrent_deletes():
+    policy = TieredMergePolicy(segments_per_tier=2, max_merge_at_once=2, floor_docs=1)
+    idx = LocalIndex(merge_policy=policy, background_merge=True)
+    try:
+        for i in range(8):
+            idx.add([_rec(f"d{i}", 1, f"doc {i}", "common words")])
+            idx.commit()
+            if i == 5:
+                idx.remove("d0")
+                idx.commit()
+        assert idx.wait_for_merges(timeout=5)
+        assert len(idx) == 7
+        assert "d0" not in _ids(idx.search(query={"match_all": {}}, size=20))
+        assert idx.segment_count <= 3
+    finally:
+        idx.close()
+
+
+def test_auto_mode_skips_unreachable_elasticsearch_for_a_back_off_window():
+    class _UnreachableES:
+        def __init__(self) -> None:
+            self.pings = self.searches = 0
+
+        def ping(self) -> bool:
+            self.pings += 1
+            return False
+
+        def search(self, **_body):  # noqa: ANN003
+            self.searches += 1
+            raise ConnectionError("no cluster")
+
+    cfg = ApplicationConfig(search_settings=SearchSettings(enable_ai_search=False))
+    es = _UnreachableES()
+    sm = SearchManager(config=cfg, local_index=_index())
+    sm._es = es  # what _get_es builds lazily: a client that never connected
+    for _ in range(3):
+        assert {r.document_id for r in sm.search("walnut")} == {"b"}
+    assert es.pings == 1 and es.searches == 0
+
+    # An injected client is used until a request fails, then backed off too
+    sm = SearchManager(config=cfg, es_client=es, local_index=_index())
+    for _ in range(3):
+        assert {r.document_id for r in sm.search("walnut")} == {"b"}
+    assert es.searches == 1
+    sm._es_down_until = 0.0  # back-off elapsed: probed again before use
+    sm.search("walnut")
+    assert es.pings == 2 and es.searches == 1
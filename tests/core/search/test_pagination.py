@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from typing import Any, List
+
+import pytest
+
+from src.core.models.configuration import ApplicationConfig, SearchSettings
+from src.core.search import SearchManager
+from src.core.search.pagination import SearchCursor
+
+
+class _PagingES:
+    """Serves 25 exact hits through PIT + search_after, recording request sizes."""
+
+    def __init__(self, n: int = 25) -> None:
+        self.docs = [(f"E{i:02d}", float(100 - i)) for i in range(n)]
+        self.sizes: List[int] = []
+        self.pits = 0
+        self.closed: List[str] = []
+
+    def open_point_in_time(self, index: str, keep_alive: str) -> dict:
+        self.pits += 1
+        return {"id": "pit-1"}
+
+    def close_point_in_time(self, id: str) -> dict:  # noqa: A002 - ES API compat
+        self.closed.append(id)
+        return {"succeeded": True}
+
+    def search(self, size: int, **body: Any) -> dict:  # noqa: ANN401
+        assert body["pit"]["id"] == "pit-1" and "index" not in body
+        self.sizes.append(size)
+        after = body.get("search_after")
+        rows = [d for d in self.docs if after is None or d[1] < after[0]][:size]
+        hits = [
+            {"_id": doc, "_score": score, "sort": [score, i], "_source": {"title": doc, "content": doc}}
+            for i, (doc, score) in enumerate(rows)
+        ]
+        return {"pit_id": "pit-1", "hits": {"hits": hits}}
+
+
+def _provider(q: str, n: int):  # noqa: ANN001
+    return [("F1", "hello world"), ("E03", "hello again")]
+
+
+def _manager(es: _PagingES) -> SearchManager:
+    cfg = ApplicationConfig(search_settings=SearchSettings(enable_ai_search=False, fuzzy_accuracy_target=0.0))
+    return SearchManager(config=cfg, es_client=es, candidate_provider=_provider)
+
+
+def test_cursor_walks_all_results_without_duplicates() -> None:
+    es = _PagingES()
+    sm = _manager(es)
+    seen: List[str] = []
+    page = sm.search_page("hello", size=10)
+    while True:
+        seen.extend(r.document_id for r in page.results)
+        if page.next_cursor is None:
+            break
+        page = sm.search_page("hello", size=10, cursor=page.next_cursor)
+    sm.close()
+
+    assert sorted(seen) == sorted({f"E{i:02d}" for i in range(25)} | {"F1"})
+    assert len(seen) == len(set(seen))
+    # Deep pages never ask Elasticsearch for more than one page worth of hits
+    assert es.pits == 1 and max(es.sizes) == 10
+    assert es.closed == ["pit-1"]  # closed once the exact leg ran out
+
+
+def test_replaying_a_cursor_returns_the_same_page() -> None:
+    sm = _manager(_PagingES())
+    first = sm.search_page("hello", size=5)
+    assert first.next_cursor is not None
+    a = sm.search_page("hello", size=5, cursor=first.next_cursor)
+    b = sm.search_page("hello", size=5, cursor=first.next_cursor)
+    sm.close()
+    assert [r.document_id for r in a.results] == [r.document_id for r in b.results]
+
+
+def test_invalid_or_unknown_cursor_rejected() -> None:
+    sm = _manager(_PagingES())
+    with pytest.raises(ValueError):
+        sm.search_page("hello", cursor="not a cursor!")
+    with pytest.raises(ValueError):
+        sm.search_page("hello", cursor=SearchCursor(session_id="missing").encode())
+
+
+def test_abandoned_sessions_release_their_pit(monkeypatch) -> None:
+    import time
+
+    monkeypatch.setattr(SearchManager, "SESSION_TTL_SECONDS", 0.01)
+    es = _PagingES()
+    sm = _manager(es)
+    assert sm.search_page("hello", size=5).next_cursor is not None and not es.closed
+    time.sleep(0.03)
+    sm.search_page("other", size=5)  # any request sweeps expired sessions
+    assert es.closed == ["pit-1"]
+    sm.close()
+    assert es.closed == ["pit-1", "pit-1"]  # close() releases the still-open one
+
+
+def test_concurrent_requests_on_one_cursor_are_serialised() -> None:
+    import threading
+
+    sm = _manager(_PagingES())
+    first = sm.search_page("hello", size=5)
+    assert first.next_cursor is not None
+    barrier = threading.Barrier(4)
+    pages: List[List[str]] = []
+
+    def fetch() -> None:
+        barrier.wait()
+        page = sm.search_page("hello", size=5, cursor=first.next_cursor)
+        pages.append([r.document_id for r in page.results])
+
+    threads = [threading.Thread(target=fetch) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sm.close()
+    assert len(pages) == 4 and all(p == pages[0] for p in pages)
+    assert not set(pages[0]) & {r.document_id for r in first.results}
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import pytest
+
+from src.core.models.configuration import ApplicationConfig, SearchSettings
+from src.core.search.quantization import QuantizedRows, hamming_distances, measure_recall, pack_signs
+from src.core.search.strategies.semantic import SemanticConfig, SemanticSearchStrategy
+from src.core.search.vector_store import EmbeddingStore
+
+
+def _corpus(n: int = 2000, dim: int = 128, clusters: int = 40, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Topic-clustered unit vectors (rows spread at varying distances) and 50 queries."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim))
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    spread = rng.uniform(0.2, 2.0, (n, 1))
+    mat = centres[rng.integers(0, clusters, n)] + spread * rng.standard_normal((n, dim)) / np.sqrt(dim)
+    queries = centres[rng.integers(0, clusters, 50)] + 0.3 * rng.standard_normal((50, dim)) / np.sqrt(dim)
+    return _unit(mat), _unit(queries)
+
+
+def _unit(mat: np.ndarray) -> np.ndarray:
+    return (mat / np.linalg.norm(mat, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _store(mat: np.ndarray, quantization: str = "none") -> EmbeddingStore:
+    store = EmbeddingStore(dim=mat.shape[1], quantization=quantization)
+    store.add_many([(f"D{i}", 0) for i in range(len(mat))], mat)
+    return store
+
+
+def test_hamming_distances_match_bit_count() -> None:
+    a = np.array([[1.0, -1.0, 1.0, 1.0, -1.0, -1.0, 1.0, -1.0, 1.0]])
+    b = np.array([1.0, 1.0, 1.0, -1.0, -1.0, -1.0, 1.0, 1.0, -1.0])
+    assert hamming_distances(pack_signs(a), pack_signs(b)).tolist() == [4]
+
+
+def test_quantized_rows_resize_and_move() -> None:
+    rows = QuantizedRows("int8", dim=4, capacity=1)
+    rows.resize(3)
+    rows.set([0, 2], np.array([[1.0, 0.0, 0.0, 0.0], [0.0, 0.5, 0.0, 0.0]]))
+    rows.move(2, 0)
+    assert rows.scores(np.array([0.0, 1.0, 0.0, 0.0]), 1)[0] == pytest.approx(0.5, abs=0.01)
+    with pytest.raises(ValueError):
+        QuantizedRows("pq", dim=4, capacity=1)
+
+
+@pytest.mark.parametrize(("mode", "bytes_per_vector", "floor"), [("int8", 132, 0.98), ("binary", 16, 0.95)])
+def test_rescored_recall_against_float_baseline(mode: str, bytes_per_vector: int, floor: float) -> None:
+    mat, queries = _corpus()
+    store = _store(mat, mode)
+    report = measure_recall(store, queries, k=10)
+    assert report.mode == mode and report.queries == 50
+    assert report.bytes_per_vector == bytes_per_vector and report.float_bytes_per_vector == 512
+    assert report.recall >= floor
+    # Rescoring returns exact float similarities
+    rec, score = store.search(queries[0], k=1)[0]
+    assert score == pytest.approx(float(mat[int(rec.document_id[1:])] @ queries[0]), abs=1e-5)
+    assert measure_recall(store, queries, k=10, rescore_multiplier=0).recall <= report.recall
+
+
+def test_saved_rows_are_rescored_from_disk(tmp_path: Path) -> None:
+    mat, _queries = _corpus(n=300, dim=32)
+    store = _store(mat, "binary")
+    assert len(store._pending) == 300
+    store.save(tmp_path / "emb")
+    assert not store._pending  # floats now live only in the memory-mapped segment
+    store.add("D0", 0, -mat[0])
+    assert len(store._pending) == 1
+
+    hits = store.search(-mat[0], k=1)
+    assert hits[0][0].document_id == "D0" and hits[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert store.remove("D5") == 1  # swaps the last row's codes into the hole
+    top = store.search(mat[299], k=1)[0]
+    assert top[0].document_id == "D299" and top[1] == pytest.approx(1.0, abs=1e-5)
+
+    store.save(tmp_path / "emb")
+    loaded = EmbeddingStore.load(tmp_path / "emb", quantization="int8")
+    assert loaded.quantization == "int8" and len(loaded) == 299 and not loaded._pending
+    assert loaded.search(mat[7], k=1)[0][0].document_id == "D7"
+    loaded.quantize("none")
+    order, expected = np.argsort(loaded.labels), np.argsort(store.labels)
+    assert np.allclose(loaded.matrix[order], store.matrix[expected])
+
+
+def test_quantized_load_stays_below_float_size(tmp_path: Path) -> None:
+    import tracemalloc
+
+    rng = np.random.default_rng(1)
+    mat = rng.standard_normal((10000, 512)).astype(np.float32)
+    _store(mat).save(tmp_path / "emb")
+    del mat
+
+    tracemalloc.start()
+    try:
+        loaded = EmbeddingStore.load(tmp_path / "emb", quantization="binary")
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(loaded) == 10000 and not loaded._pending
+    # Codes are built block by block from the mapped segments; the float matrix
+    # (20 MB here) is never materialised in memory
+    assert peak < 10000 * 512 * 4
+
+
+def test_semantic_config_selects_quantization(tmp_path: Path) -> None:
+    class _Model:
+        def encode(self, texts, normalize_embeddings=True, device="cpu"):  # noqa: ANN001
+            return [[1.0, 0.2, 0.0, 0.0] for _ in texts]
+
+    cfg = ApplicationConfig(search_settings=SearchSettings(semantic_similarity_threshold=0.0))
+    sem = SemanticConfig(threshold=0.0, quantization="int8", rescore_multiplier=2)
+    saved = EmbeddingStore(dim=4)
+    saved.add("D1", 0, [1.0, 0.0, 0.0, 0.0], "first")
+    saved.add("D2", 0, [0.0, 1.0, 0.0, 0.0], "second")
+    saved.save(tmp_path / "emb")
+
+    store = SemanticSearchStrategy.open_store(tmp_path / "emb", sem, dim=4)
+    assert store.quantization == "int8" and store.bytes_per_vector == 8
+    strat = SemanticSearchStrategy(app_config=cfg, model=_Model(), vector_store=store, sem_config=sem)
+    assert [doc_id for doc_id, _s, _t in strat.search("q", limit=2)] == ["D1", "D2"]
+    # A store handed in by the caller is never converted
+    SemanticSearchStrategy(app_config=cfg, model=_Model(), vector_store=saved, sem_config=sem)
+    assert saved.quantization == "none"
+    with pytest.raises(ValueError):
+        EmbeddingStore(dim=4, quantization="pq")
+
+
+def test_quantized_store_keeps_its_vectors_after_directory_swap(tmp_path: Path) -> None:
+    import os
+    import shutil
+
+    mat, queries = _corpus(n=200, dim=32)
+    live = tmp_path / "emb"
+    reference = _store(mat)
+    reference.save(live)
+    store = EmbeddingStore.load(live, quantization="binary")
+    before = reference.search(queries[0], k=5)
+
+    # A re-encode swap: the live directory is renamed and replaced by one whose
+    # segments have the same names but other vectors
+    os.replace(live, tmp_path / "emb.previous")
+    _store(-mat).save(live)
+    after = store.search(queries[0], k=5)
+    assert [r.document_id for r, _ in after] == [r.document_id for r, _ in before]
+    assert [s for _, s in after] == pytest.approx([s for _, s in before], abs=1e-5)
+
+    shutil.rmtree(tmp_path / "emb.previous")  # keep_previous=False
+    assert store.search(queries[0], k=5)[0][0].document_id == before[0][0].document_id
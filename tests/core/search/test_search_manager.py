@@ -66,3 +66,113 @@ def test_semantic_search_uses_model(monkeypatch):
     sm._model = _FakeModel()  # type: ignore[attr-defined]
     out = sm.search("x", limit=5)
     assert any(r.match_type == MatchType.SEMANTIC and r.document_id == "D3" for r in out)
+
+
+def test_semantic_search_prefers_vector_store() -> None:
+    from src.core.search.vector_store import EmbeddingStore
+
+    cfg = ApplicationConfig(
+        search_settings=SearchSettings(semantic_similarity_threshold=0.5, enable_spelling_correction=False)
+    )
+    store = EmbeddingStore(dim=4)
+    store.add("D7", 3, [1.0, 1.0, 1.0, 1.0], "stored page")
+    store.add("D8", 0, [-1.0, 0.0, 0.0, 0.0], "opposite")
+    sm = SearchManager(
+        config=cfg,
+        es_client=_FakeES(),
+        candidate_provider=_provider_from_texts([("D3", "semantic candidate")]),
+        vector_store=store,
+    )
+    sm._model = _FakeModel()  # type: ignore[attr-defined]
+    out = [r for r in sm.search("x", limit=5) if r.match_type == MatchType.SEMANTIC]
+    assert [(r.document_id, r.page_number) for r in out] == [("D7", 3)]
+
+
+class _KnnES:
+    def __init__(self) -> None:
+        self.requests: List[dict] = []
+
+    def search(self, index: str, size: int, **body: Any) -> dict:  # noqa: ANN401
+        self.requests.append(body)
+        if "knn" not in body:
+            return {"hits": {"hits": []}}
+        source = {"title": "Doc K", "content": "chunk text", "document_id": "/docs/k.pdf", "page_number": 4}
+        return {"hits": {"hits": [{"_id": "/docs/k.pdf#p4c0", "_score": 0.95, "_source": source}]}}
+
+
+def test_semantic_leg_uses_es_knn_without_encoding_candidates() -> None:
+    cfg = ApplicationConfig(
+        search_settings=SearchSettings(
+            semantic_similarity_threshold=0.5, enable_spelling_correction=False, knn_num_candidates=50
+        )
+    )
+    es = _KnnES()
+    encoded: List[list] = []
+
+    class _CountingModel(_FakeModel):
+        def encode(self, texts: list[str], normalize_embeddings: bool = True):  # noqa: ANN001
+            encoded.append(list(texts))
+            return super().encode(texts, normalize_embeddings)
+
+    sm = SearchManager(config=cfg, es_client=es, candidate_provider=_provider_from_texts([("D3", "never encoded")]))
+    sm._model = _CountingModel()  # type: ignore[attr-defined]
+    out = [r for r in sm.search("x", limit=5, topic_filter="ml") if r.match_type == MatchType.SEMANTIC]
+
+    assert [(r.document_id, r.page_number) for r in out] == [("/docs/k.pdf", 4)]
+    assert encoded == [["x"]]  # only the query is encoded
+    knn = next(req["knn"] for req in es.requests if "knn" in req)
+    assert knn["num_candidates"] == 50 and knn["k"] == 5
+    assert knn["filter"] == {"term": {"metadata.topic_path.keyword": "ml"}}
+
+
+def test_semantic_leg_falls_back_to_store_and_backs_off_failed_knn() -> None:
+    from src.core.search.vector_store import EmbeddingStore
+
+    class _DownES:
+        calls = 0
+
+        def search(self, **_body: Any) -> dict:  # noqa: ANN401
+            self.calls += 1
+            raise ConnectionError("cluster down")
+
+    cfg = ApplicationConfig(
+        search_settings=SearchSettings(
+            semantic_retrieval="elasticsearch", semantic_similarity_threshold=0.5, enable_spelling_correction=False
+        )
+    )
+    store = EmbeddingStore(dim=4)
+    store.add("D7", 3, [1.0, 1.0, 1.0, 1.0], "stored page")
+    es = _DownES()
+    sm = SearchManager(config=cfg, es_client=es, vector_store=store)
+    sm._model = _FakeModel()  # type: ignore[attr-defined]
+    semantic = sm._search_semantic("x", limit=5)
+    assert [(r.document_id, r.page_number) for r in semantic] == [("D7", 3)]
+    assert es.calls == 1
+    sm._search_semantic("x", limit=5)
+    assert es.calls == 1  # backed off: not contacted again until ES_RETRY_SECONDS pass
+
+
+def test_hybrid_mode_sends_query_and_knn_in_one_request() -> None:
+    cfg = ApplicationConfig(search_settings=SearchSettings(hybrid_search=True, enable_spelling_correction=False))
+    es = _KnnES()
+    sm = SearchManager(config=cfg, es_client=es)
+    sm._model = _FakeModel()  # type: ignore[attr-defined]
+    outcome = sm.search_detailed("lorem", limit=3)
+    assert len(es.requests) == 1
+    assert "query" in es.requests[0] and "knn" in es.requests[0]
+    assert outcome.results and outcome.results[0].page_number == 4
+
+
+def test_fuzzy_leg_scores_best_window_with_offset() -> None:
+    cfg = ApplicationConfig(
+        search_settings=SearchSettings(fuzzy_accuracy_target=0.8, enable_ai_search=False, fusion_method="max")
+    )
+    text = "An unrelated introduction about trees. Then the binary serach tree section follows."
+    items = [("D1", text), ("D2", "nothing to see here at all")]
+    sm = SearchManager(config=cfg, es_client=_KnnES(), candidate_provider=_provider_from_texts(items))
+    out = [r for r in sm.search("binary search tree", limit=5) if r.match_type == MatchType.FUZZY]
+    assert [r.document_id for r in out] == ["D1"]
+    hit = out[0]
+    assert hit.snippet == "binary serach tree" and hit.offset == text.index("binary")
+    assert "<em>binary serach tree</em>" in hit.highlighted_text
+    assert hit.relevance_score >= 0.8 * 0.7  # window score times the default fuzzy weight
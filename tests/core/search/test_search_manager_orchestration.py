@@ -36,3 +36,102 @@ def test_autocomplete_from_provider():
     # Expect tokens starting with 'he' ordered by frequency
     assert sugg and sugg[0].lower().startswith("he")
 
+
+
+def test_legs_run_concurrently_and_report_timeouts(monkeypatch) -> None:
+    from src.core.models.search import MatchType, SearchResult
+
+    cfg = ApplicationConfig(search_settings=SearchSettings(core_search_timeout_ms=300, search_timeout_seconds=2))
+    sm = SearchManager(config=cfg, es_client=_FakeES(), candidate_provider=_provider)
+
+    def _hit(doc: str, mt: MatchType) -> SearchResult:
+        return SearchResult(doc, doc, 0, "", 0.5, mt, "")
+
+    def _slow_exact(query, limit, topic_filter=None):  # noqa: ANN001
+        time.sleep(0.2)
+        return [_hit("E", MatchType.EXACT)]
+
+    def _stuck_fuzzy(query, limit):  # noqa: ANN001
+        time.sleep(1.0)
+        return [_hit("F", MatchType.FUZZY)]
+
+    def _slow_semantic(query, limit, topic_filter=None):  # noqa: ANN001
+        time.sleep(0.2)
+        return [_hit("S", MatchType.SEMANTIC)]
+
+    monkeypatch.setattr(sm, "_search_exact", _slow_exact)
+    monkeypatch.setattr(sm, "_search_fuzzy", _stuck_fuzzy)
+    monkeypatch.setattr(sm, "_search_semantic", _slow_semantic)
+
+    started = time.monotonic()
+    outcome = sm.search_detailed("hello", limit=5)
+    elapsed = time.monotonic() - started
+    sm.close()
+
+    assert elapsed < 0.6  # exact + semantic overlap; fuzzy abandoned at its 300 ms deadline
+    assert outcome.partial and outcome.timed_out_legs == ["fuzzy"]
+    assert sorted(r.document_id for r in outcome.results) == ["E", "S"]
+
+
+class _HitES(_FakeES):
+    def search(self, index: str, size: int, query: dict, highlight: dict):  # noqa: ANN001
+        self.calls += 1
+        return {"hits": {"hits": [{"_id": "X", "_score": 5.0, "_source": {"title": "X", "content": "hello"}}]}}
+
+
+def test_result_cache_keyed_by_query_and_invalidated_on_reindex() -> None:
+    from src.core.events import EventBus, IndexUpdated
+
+    cfg = ApplicationConfig(search_settings=SearchSettings(enable_spelling_correction=False, enable_ai_search=False))
+    es = _HitES()
+    bus = EventBus()
+    sm = SearchManager(config=cfg, es_client=es, cache_ttl_seconds=60, cache_max_entries=1, event_bus=bus)
+
+    sm.search("hello", limit=5)
+    sm.search("hello", limit=5)
+    assert es.calls == 1  # cached under the query key even when there are hits
+
+    sm.search("other", limit=5)  # capacity 1 -> evicts "hello"
+    sm.search("hello", limit=5)
+    assert es.calls == 3
+
+    bus.publish(IndexUpdated(index_name="documents", documents=1))
+    sm.search("hello", limit=5)
+    assert es.calls == 4
+    stats = sm.cache_stats()
+    assert stats.hits == 1 and stats.evictions >= 1 and stats.invalidations == 1
+
+
+def test_suggest_uses_prefix_index_without_provider() -> None:
+    from src.core.search import PrefixIndex
+
+    def _no_provider(q: str, n: int):  # noqa: ANN001
+        raise AssertionError("provider must not be scanned when a prefix index is attached")
+
+    idx = PrefixIndex()
+    idx.update({"helium": 3, "hello": 7, "world": 9})
+    sm = SearchManager(config=ApplicationConfig(), candidate_provider=_no_provider, autocomplete=idx)
+    assert sm.suggest("He", limit=2) == ["hello", "helium"]
+
+
+def test_results_computed_across_an_invalidation_are_not_cached() -> None:
+    from src.core.events import EventBus, IndexUpdated
+
+    bus = EventBus()
+
+    class _ReindexingES(_HitES):
+        def search(self, index: str, size: int, query: dict, highlight: dict):  # noqa: ANN001
+            resp = super().search(index, size, query, highlight)
+            if self.calls == 1:
+                # Index updated while the first search was still running
+                bus.publish(IndexUpdated(index_name="documents", documents=1))
+            return resp
+
+    cfg = ApplicationConfig(search_settings=SearchSettings(enable_spelling_correction=False, enable_ai_search=False))
+    es = _ReindexingES()
+    sm = SearchManager(config=cfg, es_client=es, cache_ttl_seconds=60, event_bus=bus)
+    sm.search("hello", limit=5)
+    sm.search("hello", limit=5)
+    assert es.calls == 2  # the pre-update result was dropped, not served
+    sm.search("hello", limit=5)
+    assert es.calls == 2
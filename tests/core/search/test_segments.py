@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from src.core.search.segments import TieredMergePolicy, load_tombstones, save_tombstones
+
+
+def test_tiered_policy_merges_smallest_of_a_full_tier():
+    policy = TieredMergePolicy(segments_per_tier=3, max_merge_at_once=2, floor_docs=10)
+    assert policy.select([5, 8], [5, 8]) == []
+    # Three segments below the floor share tier 0; the two smallest are merged
+    assert policy.select([5, 1000, 8, 3], [5, 1000, 8, 3]) == [0, 3]
+
+
+def test_tiered_policy_expunges_heavily_deleted_segment():
+    policy = TieredMergePolicy(segments_per_tier=10, deletes_pct_allowed=0.25)
+    assert policy.select([100, 60], [100, 100]) == [1]
+
+
+def test_tombstones_round_trip_packed(tmp_path: Path):
+    deleted = np.zeros(13, dtype=bool)
+    deleted[[0, 7, 12]] = True
+    save_tombstones(tmp_path / "d.npy", deleted)
+    assert (tmp_path / "d.npy").stat().st_size < 13 + 200  # one bit per row plus header
+    assert np.array_equal(load_tombstones(tmp_path / "d.npy", 13), deleted)
+    assert not load_tombstones(None, 4).any()
@@ -53,3 +53,24 @@ def test_device_detection_cpu(monkeypatch) -> None:
     s = SemanticSearchStrategy()
     assert s._detect_device() == "cpu"
 
+
+
+def test_vector_store_path_encodes_query_only() -> None:
+    from src.core.search.vector_store import EmbeddingStore
+
+    cfg = ApplicationConfig(search_settings=SearchSettings(semantic_similarity_threshold=0.0))
+    store = EmbeddingStore(dim=4)
+    store.add("D1", 0, [1.0, 0.0, 0.0, 0.0], "first")
+    store.add("D2", 5, [1.0, 1.0, 1.0, 1.0], "second")
+    model = _FakeModel()
+    provider_calls = []
+    strat = SemanticSearchStrategy(
+        app_config=cfg,
+        candidate_provider=lambda q, n: provider_calls.append(q) or _prov(),
+        model=model,
+        vector_store=store,
+    )
+    out = strat.search("abc", limit=2)
+    assert [doc_id for doc_id, _s, _t in out] == ["D2", "D1"]
+    assert out[0][2] == "second"
+    assert model.calls == 1 and not provider_calls
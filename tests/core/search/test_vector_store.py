@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.core.search.vector_store import EmbeddingStore
+
+
+def test_add_search_orders_by_cosine() -> None:
+    store = EmbeddingStore(dim=3, initial_capacity=1)
+    store.add("A", 0, [1.0, 0.0, 0.0], "alpha")
+    store.add("B", 0, [0.0, 1.0, 0.0], "beta")
+    store.add("C", 2, [1.0, 1.0, 0.0], "gamma")
+    assert len(store) == 3
+
+    hits = store.search([2.0, 0.1, 0.0], k=2)
+    assert [(r.document_id, r.page_number) for r, _ in hits] == [("A", 0), ("C", 2)]
+    assert hits[0][1] > hits[1][1]
+    # Rows are stored unit-normalised
+    assert np.allclose(np.linalg.norm(store.matrix, axis=1), 1.0)
+
+
+def test_upsert_and_remove_keep_matrix_dense() -> None:
+    store = EmbeddingStore(dim=2)
+    store.add_many([("A", 0), ("A", 1), ("B", 0)], np.eye(2, dtype=np.float32)[[0, 1, 0]], ["a0", "a1", "b0"])
+    store.add("A", 1, [1.0, 0.0], "a1 v2")
+    assert len(store) == 3
+    assert store.remove("A") == 2
+    assert len(store) == 1 and ("B", 0) in store
+    hits = store.search([1.0, 0.0], k=5)
+    assert [r.document_id for r, _ in hits] == ["B"]
+
+
+def test_dim_mismatch_raises() -> None:
+    store = EmbeddingStore(dim=4)
+    with pytest.raises(ValueError):
+        store.add("A", 0, [1.0, 0.0])
+
+
+def test_save_and_load_roundtrip(tmp_path: Path) -> None:
+    store = EmbeddingStore(dim=2)
+    store.add("A", 3, [0.6, 0.8], "hello")
+    store.save(tmp_path / "emb")
+
+    loaded = EmbeddingStore.open(tmp_path / "emb")
+    assert len(loaded) == 1 and loaded.dim == 2
+    rec, score = loaded.search([0.6, 0.8], k=1)[0]
+    assert (rec.document_id, rec.page_number, rec.text) == ("A", 3, "hello")
+    assert score == pytest.approx(1.0, abs=1e-6)
+    assert len(EmbeddingStore.open(tmp_path / "missing", dim=2)) == 0
+
+
+def test_incremental_saves_append_segments_and_tombstones(tmp_path: Path) -> None:
+    from src.core.search.segments import TieredMergePolicy
+
+    target = tmp_path / "emb"
+    policy = TieredMergePolicy(segments_per_tier=3, max_merge_at_once=3, floor_docs=4, deletes_pct_allowed=0.9)
+    store = EmbeddingStore(dim=2, merge_policy=policy)
+    store.add("a", 1, [1.0, 0.0], "alpha")
+    store.add("b", 1, [0.0, 1.0], "beta")
+    store.save(target)
+    first = sorted(p.name for p in target.glob("seg_*"))
+
+    # Second save writes only the new/changed rows; the overwritten row is tombstoned
+    store.add("a", 1, [0.6, 0.8], "alpha v2")
+    store.add("c", 1, [0.7, 0.7], "gamma")
+    store.save(target)
+    assert store.segment_count == 2 and set(first) < {p.name for p in target.glob("seg_*")}
+
+    store.remove("b")
+    store.save(target)
+    loaded = EmbeddingStore.load(target, merge_policy=policy)
+    assert len(loaded) == 2
+    assert {r.document_id: r.text for r, _ in loaded.search([0.6, 0.8], k=5)} == {"a": "alpha v2", "c": "gamma"}
+    assert not (target / "vectors.npy").exists()
+
+    # Enough small segments trigger a tiered merge on save
+    for i in range(4):
+        loaded.add(f"n{i}", 1, [float(i), 1.0])
+        loaded.save(target)
+    assert loaded.segment_count < 4
+    again = EmbeddingStore.open(target)
+    assert len(again) == 6 and ("n3", 1) in again
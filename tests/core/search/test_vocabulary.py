@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from src.core.search.vocabulary import Vocabulary, best_correction
+
+
+def test_candidates_are_trigram_neighbours_with_frequencies() -> None:
+    vocab = Vocabulary()
+    vocab.add_text("Elasticsearch indexes documents. Elastic search, elasticsearch!")
+    vocab.add_text("banana bread recipe")
+    assert vocab.frequency("elasticsearch") == 2
+    cands = dict(vocab.candidates("elasticsaerch", max_edits=2))
+    assert "elasticsearch" in cands and "banana" not in cands
+
+
+def test_best_correction_prefers_frequent_terms_on_ties() -> None:
+    vocab = Vocabulary()
+    vocab.add_terms(["cat"] * 5 + ["car"])
+    best = best_correction(vocab, "cax", max_edits=1)
+    assert best is not None and best[0] == "cat"
+
+
+def test_discard_and_roundtrip(tmp_path) -> None:
+    vocab = Vocabulary()
+    vocab.add_text("alpha beta beta")
+    vocab.discard_text("alpha")
+    assert "alpha" not in vocab and vocab.candidates("alpha") == []
+
+    path = tmp_path / "vocab.json"
+    vocab.save(path)
+    loaded = Vocabulary.open(path)
+    assert loaded.terms() == ["beta"] and loaded.frequency("beta") == 2
+
+
+def test_discard_document_subtracts_its_counts(tmp_path) -> None:
+    vocab = Vocabulary()
+    vocab.add_text("alpha beta beta", document_id="a")
+    vocab.add_text("beta gamma", document_id="b")
+    vocab.discard_document("a")
+    assert "alpha" not in vocab and vocab.frequency("beta") == 1
+
+    path = tmp_path / "vocab.json"
+    vocab.save(path)
+    loaded = Vocabulary.load(path)
+    loaded.discard_document("b")
+    assert loaded.terms() == []